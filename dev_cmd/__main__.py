@@ -3,7 +3,7 @@
 
 import sys
 
-from dev_cmd.run import main
+from dev_cmd.daemon import main
 
 if __name__ == "__main__":
     sys.exit(main())
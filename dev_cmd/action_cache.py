@@ -0,0 +1,121 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from dev_cmd import cache
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+# N.B.: This holds a running estimate of the total size of the cache entries so that adding an
+# entry does not need to walk the whole cache. Concurrent runs can lose each other's updates, but
+# the estimate only decides when to measure and every measurement resets it.
+_SIZE_FILE = ".size"
+
+
+def parse_size(value: int | str) -> int:
+    if isinstance(value, int):
+        if value < 0:
+            raise ValueError(f"A size must be non-negative; given: {value}")
+        return value
+    match = re.match(r"^\s*(?P<amount>\d+(?:\.\d+)?)\s*(?P<unit>[KMGT]?)(?:i?B)?\s*$", value, re.I)
+    if not match:
+        raise ValueError(f"A size must be a number of bytes with an optional unit; given: {value}")
+    return int(float(match["amount"]) * _SIZE_UNITS[match["unit"].upper()])
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    returncode: int
+    output: bytes
+
+
+@dataclass(frozen=True)
+class ActionCache:
+    @classmethod
+    def create(cls, max_size: int = DEFAULT_MAX_SIZE) -> ActionCache:
+        return cls(cache_dir=cache.ensure_cache_dir() / "action-cache", max_size=max_size)
+
+    cache_dir: Path
+    max_size: int
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key: str) -> CachedResult | None:
+        if self.max_size == 0:
+            return None
+
+        entry = self._entry(key)
+        try:
+            with entry.open("rb") as fp:
+                returncode = int(fp.readline())
+                output = zlib.decompress(fp.read())
+        except (OSError, ValueError, zlib.error):
+            return None
+
+        # N.B.: The entry mtime records last use for LRU eviction.
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return CachedResult(returncode=returncode, output=output)
+
+    def put(self, key: str, returncode: int, output: bytes) -> None:
+        if self.max_size == 0:
+            self.evict()
+            return
+
+        entry = self._entry(key)
+        try:
+            replaced_size = entry.stat().st_size
+        except OSError:
+            replaced_size = 0
+        data = b"%d\n" % returncode + zlib.compress(output)
+        cache.atomic_write(entry, data)
+        if self._estimate_size(added=len(data) - replaced_size) > self.max_size:
+            self.evict()
+
+    def _estimate_size(self, added: int) -> float:
+        size_file = self.cache_dir / _SIZE_FILE
+        try:
+            size = int(size_file.read_bytes()) + added
+        except (OSError, ValueError):
+            return math.inf
+        cache.atomic_write(size_file, b"%d" % size)
+        return size
+
+    def evict(self) -> None:
+        entries: list[tuple[float, int, Path]] = []
+        total_size = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for f in files:
+                if f.startswith("."):
+                    continue
+                path = Path(root) / f
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+        cache.atomic_write(self.cache_dir / _SIZE_FILE, b"%d" % total_size)
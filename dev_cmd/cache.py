@@ -0,0 +1,137 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import mmap
+import os
+import time
+from contextlib import contextmanager
+from os import fspath
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import IO, Any, Iterator, Sequence
+
+# N.B.: Files at least this big are hashed through a memory map and, when there are several to hash,
+# in parallel. Hashing releases the GIL for large buffers, but for small files thread hand-off
+# costs more than it saves.
+_LARGE_FILE_SIZE = 1024 * 1024
+
+# N.B.: A file modified again within the same mtime granule as its last hash would keep the same
+# stat key; so we only index files whose mtime is older than this.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _encode(digest: bytes) -> str:
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def fingerprint(data: bytes) -> str:
+    return _encode(hashlib.sha256(data).digest())
+
+
+def fingerprint_file(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size < _LARGE_FILE_SIZE:
+            for chunk in iter(lambda: fp.read(_LARGE_FILE_SIZE), b""):
+                digest.update(chunk)
+        else:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                for offset in range(0, len(view), 64 * _LARGE_FILE_SIZE):
+                    digest.update(view[offset : offset + 64 * _LARGE_FILE_SIZE])
+    return _encode(digest.digest())
+
+
+def fingerprint_files(paths: Sequence[str | Path]) -> list[str]:
+    """Fingerprints files, only re-hashing those whose stat has changed since they were last hashed.
+
+    The fingerprints are returned in the same order as the given paths.
+    """
+    index_file = ensure_cache_dir() / "fingerprints.json"
+    try:
+        index: dict[str, list[Any]] = json.loads(index_file.read_bytes())
+    except (OSError, ValueError):
+        index = {}
+
+    fingerprints: dict[str, str] = {}
+    keys: dict[str, list[int]] = {}
+    small: list[str] = []
+    large: list[str] = []
+    for path in map(os.path.abspath, paths):
+        stat = os.stat(path)
+        key = [stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]
+        entry = index.get(path)
+        if entry and entry[:-1] == key:
+            fingerprints[path] = entry[-1]
+            continue
+        keys[path] = key
+        (large if stat.st_size >= _LARGE_FILE_SIZE else small).append(path)
+
+    fingerprints.update(zip(small, map(fingerprint_file, small)))
+    if len(large) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        from dev_cmd import jobs
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(large), jobs.available_cpu_count()),
+            thread_name_prefix="dev-cmd fingerprint",
+        ) as executor:
+            fingerprints.update(zip(large, executor.map(fingerprint_file, large)))
+    else:
+        fingerprints.update(zip(large, map(fingerprint_file, large)))
+
+    if keys:
+        racy = time.time_ns() - _RACY_WINDOW_NS
+        index.update(
+            (path, [*key, fingerprints[path]]) for path, key in keys.items() if key[2] < racy
+        )
+        # N.B.: Concurrent runs may race to write the index; the loser's new entries are just
+        # re-hashed by some later run.
+        atomic_write(
+            index_file,
+            json.dumps(
+                {path: entry for path, entry in index.items() if os.path.exists(path)}
+            ).encode(),
+        )
+    return [fingerprints[os.path.abspath(path)] for path in paths]
+
+
+@contextmanager
+def named_temporary_file(
+    tmp_dir: str | None = None, prefix: str | None = None
+) -> Iterator[IO[bytes]]:
+    # Work around Windows issue with auto-delete: https://bugs.python.org/issue14243
+    fp = NamedTemporaryFile(dir=tmp_dir, prefix=prefix, delete=False)
+    try:
+        with fp:
+            yield fp
+    finally:
+        try:
+            os.remove(fp.name)
+        except FileNotFoundError:
+            pass
+
+
+def ensure_cache_dir() -> Path:
+    cache_dir = Path(os.path.abspath(os.environ.get("DEV_CMD_WORKSPACE_CACHE_DIR", ".dev-cmd")))
+    gitignore = cache_dir / ".gitignore"
+    if not gitignore.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with named_temporary_file(tmp_dir=fspath(cache_dir), prefix=".gitignore.") as gitignore_fp:
+            gitignore_fp.write(b"*\n")
+            gitignore_fp.close()
+            os.rename(gitignore_fp.name, gitignore)
+    return cache_dir
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with named_temporary_file(tmp_dir=fspath(path.parent), prefix=f".{path.name}.") as fp:
+        fp.write(data)
+        fp.close()
+        os.replace(fp.name, path)
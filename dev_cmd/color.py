@@ -6,17 +6,18 @@ from __future__ import annotations
 import os
 import sys
 from enum import Enum
-from typing import Tuple, Union
+from typing import TYPE_CHECKING, Tuple, Union
 
-import colors
-from typing_extensions import TypeAlias
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
 
-try:
-    import colorama
-except ImportError:
-    pass
-else:
-    colorama.just_fix_windows_console()
+if sys.platform == "win32":
+    try:
+        import colorama
+    except ImportError:
+        pass
+    else:
+        colorama.just_fix_windows_console()
 
 
 def _use_color() -> bool:
@@ -63,29 +64,35 @@ def set_color(choice: ColorChoice) -> None:
 
 
 def cyan(text: str) -> str:
-    return colors.cyan(text) if USE_COLOR else text
+    return color(text, fg="cyan")
 
 
 def magenta(text: str) -> str:
-    return colors.magenta(text) if USE_COLOR else text
+    return color(text, fg="magenta")
 
 
 def yellow(text: str) -> str:
-    return colors.yellow(text) if USE_COLOR else text
+    return color(text, fg="yellow")
 
 
 def red(text: str) -> str:
-    return colors.red(text) if USE_COLOR else text
+    return color(text, fg="red")
 
 
 def bold(text: str) -> str:
-    return colors.bold(text) if USE_COLOR else text
+    return color(text, style="bold")
 
 
-ColorSpec: TypeAlias = Union[str, int, Tuple[int, int, int]]
+ColorSpec: TypeAlias = "Union[str, int, Tuple[int, int, int]]"
 
 
 def color(
     text: str, fg: ColorSpec | None = None, bg: ColorSpec | None = None, style: str | None = None
 ) -> str:
-    return colors.color(text, fg=fg, bg=bg, style=style) if USE_COLOR else text
+    if not USE_COLOR:
+        return text
+
+    # N.B.: Most runs print little in color; so we only import colors when it's needed.
+    import colors
+
+    return colors.color(text, fg=fg, bg=bg, style=style)
@@ -1,12 +1,109 @@
 # Copyright 2024 John Sirois.
 # Licensed under the Apache License, Version 2.0 (see LICENSE).
 
+from __future__ import annotations
+
+import atexit
+import itertools
 import os
 import sys
+import threading
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, TextIO
+from typing import Any, AsyncIterator, TextIO
+
+# N.B.: This bounds the text (in characters) queued for a slow stream; e.g.: when replaying a
+# large log.
+_MAX_PENDING = 1024 * 1024
+
+
+class _Writer:
+    """Writes console output from a background thread.
+
+    Writers only block on a slow terminal or pipe once the queued text exceeds a bound; otherwise
+    they just queue their text. Text queued while the thread is busy writing is coalesced into a
+    single write and flush per stream.
+    """
+
+    def __init__(self, max_pending: int = _MAX_PENDING) -> None:
+        self._max_pending = max_pending
+        self._condition = threading.Condition()
+        self._pending: list[tuple[str, str]] = []
+        self._pending_size = 0
+        self._busy = False
+        self._thread: threading.Thread | None = None
+
+    def write(self, stream: str, text: str) -> bool:
+        """Queues the text for writing and returns `True` if the writer is now backlogged."""
+        with self._condition:
+            self._pending.append((stream, text))
+            self._pending_size += len(text)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="dev-cmd console writer", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+            return self._pending_size > self._max_pending
+
+    @property
+    def idle(self) -> bool:
+        with self._condition:
+            return not self._pending and not self._busy
+
+    def drain(self) -> None:
+        with self._condition:
+            while self._pending or self._busy:
+                self._condition.wait()
+
+    def catch_up(self) -> None:
+        with self._condition:
+            while self._pending_size > self._max_pending:
+                self._condition.wait()
 
-import aioconsole
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                pending, self._pending = self._pending, []
+                self._pending_size = 0
+                self._busy = True
+                self._condition.notify_all()
+            try:
+                # N.B.: We preserve the relative order of writes to stdout and stderr; so only runs
+                # of writes to the same stream are coalesced.
+                for stream, writes in itertools.groupby(pending, key=lambda write: write[0]):
+                    out: TextIO = getattr(sys, stream)
+                    try:
+                        out.write("".join(text for _, text in writes))
+                        out.flush()
+                    except (OSError, ValueError):
+                        # The stream was closed out from under us (a broken pipe, say); there is
+                        # nowhere left to write to.
+                        pass
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def reset(self) -> None:
+        # N.B.: The writer thread does not survive a fork.
+        self._condition = threading.Condition()
+        self._pending.clear()
+        self._pending_size = 0
+        self._busy = False
+        self._thread = None
+
+
+_WRITER = _Writer()
+atexit.register(_WRITER.drain)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_WRITER.reset)
+
+
+def flush() -> None:
+    _WRITER.drain()
 
 
 @dataclass(frozen=True)
@@ -19,22 +116,39 @@ class Console:
         sep: str = " ",
         end: str = os.linesep,
         flush: bool = True,
-        file: TextIO = sys.stdout,
+        file: TextIO | None = None,
         force: bool = False,
     ) -> None:
         if self.quiet and not force:
             return
-        print(*values, sep=sep, end=end, flush=flush, file=file)
+        # N.B.: Output written with `aprint` must land before this output.
+        _WRITER.drain()
+        print(*values, sep=sep, end=end, flush=flush, file=file or sys.stdout)
 
     async def aprint(
         self,
         *values: Any,
         sep: str = " ",
         end: str = os.linesep,
-        flush: bool = True,
         use_stderr: bool = False,
         force: bool = False,
     ) -> None:
         if self.quiet and not force:
             return
-        await aioconsole.aprint(*values, sep=sep, end=end, flush=flush, use_stderr=use_stderr)
+        if _WRITER.write("stderr" if use_stderr else "stdout", sep.join(map(str, values)) + end):
+            import asyncio
+
+            await asyncio.to_thread(_WRITER.catch_up)
+
+    async def aflush(self) -> None:
+        if not _WRITER.idle:
+            import asyncio
+
+            await asyncio.to_thread(_WRITER.drain)
+
+    @asynccontextmanager
+    async def flushed(self) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            await self.aflush()
@@ -0,0 +1,288 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+from typing import Any, Callable
+
+from dev_cmd import __version__
+
+# N.B.: The client half of this module runs on every `dev-cmd` invocation; so this module must only
+# import what the client needs from the standard library at the top level.
+
+ENV_VAR = "DEV_CMD_DAEMON"
+IDLE_TIMEOUT = 15 * 60
+
+_LENGTH = struct.Struct("!I")
+_INT = struct.Struct("!i")
+
+
+def enabled() -> bool:
+    return (
+        os.environ.get(ENV_VAR, "").lower() in ("1", "true")
+        and hasattr(socket, "send_fds")
+        and hasattr(os, "fork")
+    )
+
+
+def _cache_dir() -> str:
+    return os.environ.get("DEV_CMD_WORKSPACE_CACHE_DIR", ".dev-cmd")
+
+
+def _socket_path() -> str:
+    # N.B.: Unix socket paths are limited to around 100 bytes; so we use a relative path.
+    return os.path.join(os.path.relpath(_cache_dir()), "daemon.sock")
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes | None:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _recv_int(sock: socket.socket) -> int | None:
+    data = _recv_exactly(sock, _INT.size)
+    return _INT.unpack(data)[0] if data else None
+
+
+def _identity() -> dict[str, str]:
+    return {"version": __version__, "python": sys.executable}
+
+
+def _run_locally() -> Any:
+    from dev_cmd.run import main
+
+    return main()
+
+
+def _spawn_server() -> None:
+    import subprocess
+
+    cache_dir = _cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, "daemon.log"), "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "dev_cmd.daemon"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+
+def _forward(sock: socket.socket) -> int | None:
+    try:
+        sock.connect(_socket_path())
+        request = json.dumps(
+            {**_identity(), "argv": sys.argv, "env": dict(os.environ), "cwd": os.getcwd()}
+        ).encode()
+        socket.send_fds(sock, [_LENGTH.pack(len(request)) + request], [0, 1, 2])
+        pid = _recv_int(sock)
+    except OSError:
+        return None
+    if not pid:
+        return None
+
+    def forward(signum: int, _frame: Any) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, forward)
+
+    exit_code = _recv_int(sock)
+    return 1 if exit_code is None else exit_code
+
+
+def main() -> Any:
+    if not enabled():
+        return _run_locally()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        exit_code = _forward(sock)
+    if exit_code is not None:
+        return exit_code
+
+    # N.B.: There is either no daemon running yet or else it was started by a different `dev-cmd`
+    # and has now shut down. Either way, we start a fresh daemon for the next run to use.
+    _spawn_server()
+    return _run_locally()
+
+
+def _exit_code(run: Callable[[], Any]) -> int:
+    # N.B.: This mirrors how `sys.exit` treats the result of a console script's `main`.
+    try:
+        result = run()
+    except SystemExit as e:
+        result = e.code
+    if result is None:
+        return 0
+    if isinstance(result, int):
+        return result
+    print(result, file=sys.stderr)
+    return 1
+
+
+def _run_request(
+    conn: socket.socket, fds: list[int], request: dict[str, Any], memo_fd: int
+) -> None:
+    import pickle
+    import traceback
+
+    from dev_cmd import console, memo, run
+
+    exit_code = 1
+    try:
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = request["argv"]
+        sys.stdin = open(0, closefd=False)
+        sys.stdout = open(1, "w", closefd=False, buffering=1 if os.isatty(1) else -1)
+        sys.stderr = open(2, "w", closefd=False, buffering=1)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+
+        conn.sendall(_INT.pack(os.getpid()))
+        exit_code = _exit_code(run.main)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            console.flush()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.sendall(_INT.pack(exit_code))
+            with os.fdopen(memo_fd, "wb") as fp:
+                pickle.dump(memo.updates(), fp)
+        finally:
+            os._exit(0)
+
+
+def _accept(server: socket.socket, path: str) -> tuple[int, int] | None:
+    """Runs a client request in a forked child and returns the child pid and its memo pipe.
+
+    Returns `None` if the client is from a different `dev-cmd`, in which case we should shut down.
+    """
+    conn, _ = server.accept()
+    fds: list[int] = []
+    try:
+        conn.settimeout(5.0)
+        data, fds, _, _ = socket.recv_fds(conn, _LENGTH.size, 3)
+        if len(data) < _LENGTH.size:
+            data += _recv_exactly(conn, _LENGTH.size - len(data)) or b""
+        payload = _recv_exactly(conn, _LENGTH.unpack(data)[0]) if len(fds) == 3 else None
+        request = json.loads(payload) if payload else None
+        if not request:
+            return 0, -1
+        if {key: request.get(key) for key in _identity()} != _identity():
+            # N.B.: We give up our socket before replying so the client can start a new daemon.
+            os.unlink(path)
+            conn.sendall(_INT.pack(0))
+            return None
+        conn.settimeout(None)
+
+        memo_read_fd, memo_write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            os.close(memo_read_fd)
+            _run_request(conn, fds, request, memo_write_fd)
+        os.close(memo_write_fd)
+        return pid, memo_read_fd
+    except (OSError, ValueError):
+        return 0, -1
+    finally:
+        conn.close()
+        for fd in fds:
+            os.close(fd)
+
+
+def serve() -> None:
+    import pickle
+    import selectors
+
+    # N.B.: Importing everything up front is much of the point; each forked run starts warm.
+    from dev_cmd import memo, run  # noqa: F401
+
+    path = _socket_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    except OSError:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            server.bind(path)
+        else:
+            # Another daemon beat us to it.
+            return
+        finally:
+            probe.close()
+    server.listen()
+    bound = os.stat(path).st_ino
+
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    children: dict[int, tuple[int, bytearray]] = {}
+    try:
+        while True:
+            events = selector.select(timeout=None if children else IDLE_TIMEOUT)
+            if not events:
+                return
+            for key, _ in events:
+                if key.fileobj is server:
+                    child = _accept(server, path)
+                    if child is None:
+                        return
+                    pid, memo_fd = child
+                    if pid:
+                        children[memo_fd] = pid, bytearray()
+                        selector.register(memo_fd, selectors.EVENT_READ)
+                    continue
+
+                memo_fd = key.fd
+                pid, data = children[memo_fd]
+                chunk = os.read(memo_fd, 64 * 1024)
+                if chunk:
+                    data.extend(chunk)
+                    continue
+                selector.unregister(memo_fd)
+                os.close(memo_fd)
+                del children[memo_fd]
+                os.waitpid(pid, 0)
+                try:
+                    memo.merge(pickle.loads(data))
+                except Exception:
+                    # The run died before reporting what it learned; we just don't learn it.
+                    pass
+    finally:
+        server.close()
+        try:
+            if os.stat(path).st_ino == bound:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,69 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Container
+
+from dev_cmd import cache
+from dev_cmd.model import Command, Group, Task
+
+# N.B.: Each new duration is blended with the history so that a single unusually fast or slow run
+# does not upend the dispatch order.
+_SMOOTHING = 0.5
+
+
+def _read(path: Path) -> dict[str, float]:
+    try:
+        with path.open() as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        name: float(duration)
+        for name, duration in data.items()
+        if isinstance(duration, (int, float)) and not isinstance(duration, bool)
+    }
+
+
+@dataclass
+class Durations:
+    @classmethod
+    def load(cls) -> Durations:
+        path = cache.ensure_cache_dir() / "durations.json"
+        return cls(path=path, history=_read(path))
+
+    path: Path
+    history: dict[str, float]
+    _recorded: dict[str, float] = field(default_factory=dict, init=False)
+
+    def estimate(
+        self, item: Command | Task | Group, skips: Container[str] = (), serial: bool = True
+    ) -> float:
+        if isinstance(item, Command):
+            return 0.0 if item.name in skips else self.history.get(item.name, 0.0)
+        if isinstance(item, Task):
+            return 0.0 if item.name in skips else self.estimate(item.steps, skips, serial=True)
+        estimates = [self.estimate(member, skips, serial=not serial) for member in item.members]
+        return sum(estimates) if serial else max(estimates, default=0.0)
+
+    def record(self, command: Command, elapsed: float) -> None:
+        previous = self.history.get(command.name)
+        if previous is not None:
+            elapsed = _SMOOTHING * elapsed + (1 - _SMOOTHING) * previous
+        self.history[command.name] = elapsed
+        self._recorded[command.name] = elapsed
+
+    def save(self) -> None:
+        if not self._recorded:
+            return
+        # N.B.: Other `dev-cmd` runs may have recorded durations for other commands since we loaded.
+        history = _read(self.path)
+        history.update(self._recorded)
+        cache.atomic_write(self.path, json.dumps(history, sort_keys=True).encode())
+        self._recorded.clear()
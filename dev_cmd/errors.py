@@ -50,6 +50,14 @@ class ExecutionError(Exception):
             exit_code=exit_code,
         )
 
+    @classmethod
+    def from_timed_out_cmd(cls, cmd: Command, timeout: float, exit_code: int) -> ExecutionError:
+        return cls(
+            step_name=cmd.name,
+            message=f"Command `{shlex.join(cmd.args)}` timed out after {timeout:.2f}s",
+            exit_code=exit_code or 1,
+        )
+
     @classmethod
     def from_errors(
         cls,
@@ -0,0 +1,175 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from dev_cmd import cache
+from dev_cmd.model import Rusage
+
+if TYPE_CHECKING:
+    from filelock import FileLock
+
+# N.B.: Once the history grows past this size, it is compacted down to its most recent half.
+_MAX_SIZE = 8 * 1024 * 1024
+
+
+def new_run_id() -> str:
+    # N.B.: Run ids sort in the order the runs were started, even for runs started in the same
+    # second or across daylight saving time changes.
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    return f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(seconds))}.{nanos:09d}Z-{os.getpid()}"
+
+
+class Kind(Enum):
+    COMMAND = "command"
+    TASK = "task"
+
+
+@dataclass(frozen=True)
+class Record:
+    run: str
+    kind: Kind
+    name: str
+    start: float
+    end: float
+    exit_code: int
+    python: str | None = None
+    factors: str | None = None
+    rusage: Rusage | None = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_json(self) -> str:
+        data: dict[str, str | float | int | dict[str, float | int]] = {
+            "run": self.run,
+            "kind": self.kind.value,
+            "name": self.name,
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "exit": self.exit_code,
+        }
+        if self.python:
+            data["python"] = self.python
+        if self.factors:
+            data["factors"] = self.factors
+        if self.rusage:
+            data["rusage"] = asdict(self.rusage)
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> Record | None:
+        try:
+            data = json.loads(line)
+            return cls(
+                run=data["run"],
+                kind=Kind(data["kind"]),
+                name=data["name"],
+                start=float(data["start"]),
+                end=float(data["end"]),
+                exit_code=int(data["exit"]),
+                python=data.get("python"),
+                factors=data.get("factors"),
+                rusage=Rusage(**data["rusage"]) if "rusage" in data else None,
+            )
+        except (ValueError, TypeError, KeyError):
+            return None
+
+
+def percentile(durations: list[float], pct: int) -> float:
+    # N.B.: This is the nearest-rank percentile; durations must be sorted.
+    return durations[max(0, math.ceil(pct / 100 * len(durations)) - 1)]
+
+
+@dataclass(frozen=True)
+class Summary:
+    kind: Kind
+    name: str
+    runs: int
+    failures: int
+    p50: float
+    p95: float
+    max: float
+    trend: tuple[float, ...]
+
+
+@dataclass(frozen=True)
+class History:
+    @classmethod
+    def create(cls, run_id: str | None = None) -> History:
+        return cls(path=cache.ensure_cache_dir() / "history.jsonl", run_id=run_id or new_run_id())
+
+    path: Path
+    run_id: str
+
+    def _lock(self) -> FileLock:
+        from filelock import FileLock
+
+        return FileLock(f"{self.path}.lck")
+
+    def append(self, record: Record) -> None:
+        # N.B.: Concurrent `dev-cmd` runs append to the same history; so appends and compaction are
+        # serialized to keep a compaction from dropping records appended while it rewrites.
+        with self._lock():
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, f"{record.to_json()}\n".encode())
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size > _MAX_SIZE:
+                self._compact()
+
+    def compact(self) -> None:
+        with self._lock():
+            self._compact()
+
+    def _compact(self) -> None:
+        lines = self.path.read_bytes().splitlines(keepends=True)
+        cache.atomic_write(self.path, b"".join(lines[len(lines) // 2 :]))
+
+    def records(self) -> Iterator[Record]:
+        try:
+            with self.path.open() as fp:
+                for line in fp:
+                    if record := Record.from_json(line):
+                        yield record
+        except FileNotFoundError:
+            return
+
+    def summarize(self, trend_runs: int, names: Iterable[str] = ()) -> list[Summary]:
+        selected = frozenset(names)
+        records: dict[tuple[Kind, str], list[Record]] = {}
+        for record in self.records():
+            if selected and record.name not in selected:
+                continue
+            records.setdefault((record.kind, record.name), []).append(record)
+
+        summaries: list[Summary] = []
+        for (kind, name), runs in records.items():
+            # N.B.: Failed runs often end early; so only successful runs inform the durations.
+            successes = [run.duration for run in runs if run.exit_code == 0]
+            ordered = sorted(successes)
+            summaries.append(
+                Summary(
+                    kind=kind,
+                    name=name,
+                    runs=len(runs),
+                    failures=len(runs) - len(successes),
+                    p50=percentile(ordered, 50) if ordered else math.nan,
+                    p95=percentile(ordered, 95) if ordered else math.nan,
+                    max=ordered[-1] if ordered else math.nan,
+                    trend=tuple(successes[-trend_runs:]),
+                )
+            )
+        return summaries
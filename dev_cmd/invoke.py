@@ -4,24 +4,59 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
 import os
 import shlex
 import sys
 import time
 from asyncio import CancelledError
-from asyncio.subprocess import Process
 from asyncio.tasks import Task as AsyncTask
+from collections import defaultdict
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterator, Container, Iterator, Mapping
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Container,
+    DefaultDict,
+    Iterable,
+    Iterator,
+    Mapping,
+    TypeVar,
+    Union,
+)
 
-from dev_cmd import color
-from dev_cmd.color import USE_COLOR
+from dev_cmd import color, pressure, process, trace
+from dev_cmd.action_cache import ActionCache, CachedResult
 from dev_cmd.console import Console
+from dev_cmd.durations import Durations
 from dev_cmd.errors import ExecutionError, InvalidArgumentError, InvalidModelError
-from dev_cmd.model import Command, ExitStyle, Group, Task, VenvConfig
+from dev_cmd.history import History, Kind, Record
+from dev_cmd.locks import ResourceLocks
+from dev_cmd.logs import Logs, tail
+from dev_cmd.model import (
+    Admission,
+    Command,
+    ExitStyle,
+    Group,
+    OutputStyle,
+    Rusage,
+    Task,
+    VenvConfig,
+)
+from dev_cmd.stamps import Stamp
 from dev_cmd.venv import Venv
 
+_Item = TypeVar("_Item", bound=Union[Command, Task, Group])
+
+# N.B.: This also bounds the length of a streamed line; longer lines are split.
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# N.B.: The output of a failed command spooled to a log is replayed from here on; the full log is
+# left on disk.
+_LOG_TAIL_LINES = 50
+
 
 def _step_prefix(step_name: str | None, serial: bool) -> str:
     if serial and not step_name:
@@ -40,6 +75,47 @@ async def _guarded_stdin() -> AsyncIterator[None]:
         sys.stdin = sys.__stdin__
 
 
+def _timing(elapsed: float, rusage: Rusage | None) -> str:
+    if rusage is None:
+        return f"took {elapsed:.3f}s"
+    return f"took {elapsed:.3f}s ({rusage.render()})"
+
+
+def _command_error(
+    command: Command, returncode: int, timed_out: float | None = None
+) -> ExecutionError | None:
+    if timed_out is not None:
+        return ExecutionError.from_timed_out_cmd(command, timed_out, returncode)
+    if returncode != 0:
+        return ExecutionError.from_failed_cmd(command, returncode)
+    return None
+
+
+@dataclass
+class _Watchdog:
+    timeout: float | None
+    timed_out: bool = False
+
+    @property
+    def expired(self) -> float | None:
+        return self.timeout if self.timed_out else None
+
+
+@dataclass(frozen=True)
+class _CapturedResult:
+    command: Command
+    returncode: int
+    output: bytes | None
+    elapsed: float
+    cached: bool = False
+    rusage: Rusage | None = None
+    timed_out: float | None = None
+    log: Path | None = None
+
+    def error(self) -> ExecutionError | None:
+        return _command_error(self.command, self.returncode, self.timed_out)
+
+
 @dataclass
 class Invocation:
     @classmethod
@@ -51,6 +127,16 @@ class Invocation:
         extra_args: tuple[str, ...] | None = None,
         timings: bool = False,
         console: Console = Console(),
+        jobs: int | None = None,
+        output_style: OutputStyle = OutputStyle.BUFFERED,
+        force: bool = False,
+        action_cache: ActionCache | None = None,
+        durations: Durations | None = None,
+        history: History | None = None,
+        admission: Admission | None = None,
+        timeout: float | None = None,
+        logs: Logs | None = None,
+        known_names: Container[str] | None = None,
     ) -> Invocation:
         if extra_args:
             accepts_extra_args: Command | None = None
@@ -89,6 +175,16 @@ class Invocation:
             timings=timings,
             venvs={},
             console=console,
+            jobs=jobs,
+            output_style=output_style,
+            force=force,
+            action_cache=action_cache,
+            durations=durations,
+            history=history,
+            admission=admission,
+            timeout=timeout,
+            logs=logs,
+            known_names=known_names,
         )
 
     steps: tuple[Command | Task, ...]
@@ -97,7 +193,25 @@ class Invocation:
     timings: bool
     venvs: Mapping[VenvConfig, Venv]
     console: Console
-    _in_flight_processes: dict[Process, Command] = field(default_factory=dict, init=False)
+    jobs: int | None = None
+    output_style: OutputStyle = OutputStyle.BUFFERED
+    force: bool = False
+    action_cache: ActionCache | None = None
+    durations: Durations | None = None
+    history: History | None = None
+    admission: Admission | None = None
+    timeout: float | None = None
+    logs: Logs | None = None
+    known_names: Container[str] | None = None
+    _in_flight_processes: dict[process.Process, Command] = field(default_factory=dict, init=False)
+    _job_slots: asyncio.Semaphore | None = field(default=None, init=False)
+    _admitted_count: int = field(default=0, init=False)
+    _resource_locks: ResourceLocks = field(default_factory=ResourceLocks, init=False)
+    _slot_lanes: trace.Lanes = field(default_factory=lambda: trace.Lanes("slot"), init=False)
+    _step_lanes: trace.Lanes = field(default_factory=lambda: trace.Lanes("steps"), init=False)
+    _outcomes: dict[Command, asyncio.Future[ExecutionError | None]] = field(
+        default_factory=dict, init=False
+    )
 
     def iter_commands(self) -> Iterator[Command]:
         for step in self.steps:
@@ -117,16 +231,67 @@ class Invocation:
             await self._terminate_in_flight_processes()
             raise
 
+    @asynccontextmanager
+    async def _job_slot(self, prefix: str, command: Command) -> AsyncIterator[None]:
+        # N.B.: Only commands occupy job slots; so nested groups can never deadlock waiting on
+        # slots held by their own members. Resource locks are taken before a job slot so that
+        # commands blocked on a conflicting command do not tie up a slot.
+        async with self._resource_locks.hold(command):
+            if self.jobs is None:
+                async with self._admitted(prefix, command):
+                    yield
+                return
+            if self._job_slots is None:
+                self._job_slots = asyncio.Semaphore(self.jobs)
+            async with self._job_slots, self._admitted(prefix, command):
+                yield
+
+    @asynccontextmanager
+    async def _admitted(self, prefix: str, command: Command) -> AsyncIterator[None]:
+        await self._admit(prefix, command)
+        self._admitted_count += 1
+        try:
+            with self._slot_lanes.span(command.name, "command"):
+                yield
+        finally:
+            self._admitted_count -= 1
+
+    async def _admit(self, prefix: str, command: Command) -> None:
+        if not self.admission:
+            return
+
+        start = time.time()
+        held = False
+        while True:
+            exceeded = pressure.Sample.take().exceeded(self.admission)
+            # N.B.: Holding back a command can only relieve pressure we are contributing to; so a
+            # command is always admitted when none of ours are running.
+            if not exceeded or not self._admitted_count:
+                if held and self.timings:
+                    message = (
+                        f"Admitting {color.bold(command.name)} after holding it back for "
+                        f"{time.time() - start:.3f}s."
+                    )
+                    await self.console.aprint(
+                        f"{prefix} {color.color(message, fg='gray')}", use_stderr=True
+                    )
+                return
+            if not held and self.timings:
+                message = f"Holding back {color.bold(command.name)}: {', '.join(exceeded)}."
+                await self.console.aprint(
+                    f"{prefix} {color.color(message, fg='gray')}", use_stderr=True
+                )
+            held = True
+            await asyncio.sleep(pressure.POLL_INTERVAL)
+
     async def invoke(self, *extra_args: str, exit_style: ExitStyle = ExitStyle.AFTER_STEP) -> None:
-        async with _guarded_stdin(), self._guarded_ctrl_c():
+        async with _guarded_stdin(), self.console.flushed(), self._guarded_ctrl_c():
             errors: list[ExecutionError] = []
             for task in self.steps:
                 if isinstance(task, Command):
                     error = await self._invoke_command_sync(task, *extra_args)
                 else:
-                    error = await self._invoke_group(
-                        task.name, task.steps, *extra_args, serial=True, exit_style=exit_style
-                    )
+                    error = await self._invoke_task(task, *extra_args, exit_style=exit_style)
                 if error is None:
                     continue
                 if exit_style in (ExitStyle.IMMEDIATE, ExitStyle.AFTER_STEP):
@@ -149,38 +314,229 @@ class Invocation:
     async def invoke_parallel(
         self, *extra_args: str, exit_style: ExitStyle = ExitStyle.AFTER_STEP
     ) -> None:
-        async with _guarded_stdin(), self._guarded_ctrl_c():
+        async with _guarded_stdin(), self.console.flushed(), self._guarded_ctrl_c():
             if error := await self._invoke_group(
                 None, Group(members=self.steps), *extra_args, serial=False, exit_style=exit_style
             ):
                 await self._terminate_in_flight_processes()
                 raise error
 
+    def _dispatch_order(self, items: Iterable[_Item], serial: bool) -> list[_Item]:
+        # N.B.: Starting the historically longest running items first shortens the overall run when
+        # job slots are bounded. Items with no history sort last, in their declared order.
+        if not self.durations:
+            return list(items)
+        durations = self.durations
+        return sorted(items, key=lambda item: -durations.estimate(item, self.skips, serial=serial))
+
+    def _command_graph(self, parallel: bool) -> tuple[dict[Command, set[Command]], bool]:
+        # N.B.: The serial barriers implied by task structure become edges from every command in a
+        # serial step to every command in the steps preceding it. Explicit `needs` then add edges
+        # from the named commands and tasks that are part of this invocation.
+        predecessors: dict[Command, set[Command]] = {}
+        needs: DefaultDict[Command, set[str]] = defaultdict(set)
+        commands_by_name: DefaultDict[str, set[Command]] = defaultdict(set)
+
+        def add(
+            item: Command | Task | Group,
+            serial: bool,
+            after: frozenset[Command],
+            inherited_needs: tuple[str, ...],
+        ) -> frozenset[Command]:
+            if isinstance(item, Command):
+                if item.name in self.skips:
+                    return frozenset()
+                # N.B.: A command reached more than once only runs once, where it is 1st reached.
+                if item not in predecessors:
+                    predecessors[item] = set(after)
+                needs[item].update(item.needs, inherited_needs)
+                commands_by_name[item.name].add(item)
+                if item.base:
+                    commands_by_name[item.base.name].add(item)
+                return frozenset([item])
+
+            if isinstance(item, Task):
+                if item.name in self.skips:
+                    return frozenset()
+                task_commands = add(
+                    item.steps,
+                    serial=True,
+                    after=after,
+                    inherited_needs=inherited_needs + item.needs,
+                )
+                commands_by_name[item.name].update(task_commands)
+                return task_commands
+
+            group_commands: frozenset[Command] = frozenset()
+            preceding = after
+            for member in item.members:
+                group_commands |= add(
+                    member, serial=not serial, after=preceding, inherited_needs=inherited_needs
+                )
+                if serial:
+                    preceding = after | group_commands
+            return group_commands
+
+        add(Group(members=self.steps), serial=not parallel, after=frozenset(), inherited_needs=())
+
+        needs_applied = False
+        for command, command_needs in needs.items():
+            for need in command_needs:
+                if needed := commands_by_name.get(need):
+                    predecessors[command].update(needed)
+                    needs_applied = True
+                elif self.known_names is not None and need not in self.known_names:
+                    # N.B.: Needs that name steps outside this run are just ordering hints with
+                    # nothing to order; needs that name no step at all are errors.
+                    raise InvalidModelError(
+                        f"The command {command.name!r} needs {need!r} which is not the name of a "
+                        f"defined command or task."
+                    )
+
+        remaining = {command: set(preds) for command, preds in predecessors.items()}
+        while remaining:
+            ready = [command for command, preds in remaining.items() if not preds]
+            if not ready:
+                raise InvalidModelError(
+                    f"The `needs` of the following commands form a cycle or depend on one: "
+                    f"{' '.join(sorted(command.name for command in remaining))}"
+                )
+            for command in ready:
+                del remaining[command]
+            for preds in remaining.values():
+                preds.difference_update(ready)
+
+        return predecessors, needs_applied
+
+    def has_needs(self, parallel: bool = False) -> bool:
+        _, needs_applied = self._command_graph(parallel=parallel)
+        return needs_applied
+
+    async def invoke_dag(
+        self,
+        *extra_args: str,
+        parallel: bool = False,
+        exit_style: ExitStyle = ExitStyle.AFTER_STEP,
+    ) -> None:
+        predecessors, _ = self._command_graph(parallel=parallel)
+        async with _guarded_stdin(), self.console.flushed(), self._guarded_ctrl_c():
+            prefix = _step_prefix(step_name=None, serial=False)
+            message = (
+                f"Executing {color.bold(str(len(predecessors)))} commands as their needs are met..."
+            )
+            await self.console.aprint(f"{prefix} {color.magenta(message)}", use_stderr=True)
+            start = time.time()
+
+            pending = dict(predecessors)
+            succeeded: set[Command] = set()
+            running: dict[AsyncTask[_CapturedResult | ExecutionError | None], Command] = {}
+            errors: list[ExecutionError] = []
+            while True:
+                if not errors or exit_style is ExitStyle.END:
+                    for command in self._dispatch_order(tuple(pending), serial=False):
+                        if pending[command] <= succeeded:
+                            del pending[command]
+                            running[
+                                asyncio.create_task(
+                                    self._invoke_command_captured(prefix, command, *extra_args)
+                                )
+                            ] = command
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(tuple(running), return_when=asyncio.FIRST_COMPLETED)
+                for invoked in done:
+                    command = running.pop(invoked)
+                    result = invoked.result()
+                    if result is None or isinstance(result, ExecutionError):
+                        error = result
+                    else:
+                        error = await self._report_captured(prefix, result)
+                    if error is None:
+                        succeeded.add(command)
+                        continue
+                    if exit_style is ExitStyle.IMMEDIATE:
+                        await self._terminate_in_flight_processes()
+                        raise error
+                    errors.append(error)
+
+            if pending:
+                not_run = " ".join(command.name for command in pending)
+                await self.console.aprint(
+                    f"{prefix} {color.yellow(f'Did not execute {not_run} due to earlier failures.')}",
+                    use_stderr=True,
+                )
+
+            if self.timings:
+                timing = color.color(f"took {time.time() - start:.3f}s", fg="gray")
+                await self.console.aprint(f"{prefix} {timing}")
+
+            if len(errors) == 1:
+                raise errors[0]
+
+            if errors:
+                raise ExecutionError.from_errors(
+                    step_name=f"dev-cmd {' '.join(step.name for step in self.steps)}",
+                    total_count=len(predecessors),
+                    errors=errors,
+                    parallel=True,
+                )
+
     async def _terminate_in_flight_processes(self) -> None:
         while self._in_flight_processes:
-            process, command = self._in_flight_processes.popitem()
+            child, command = self._in_flight_processes.popitem()
             await self.console.aprint(
                 color.color(
-                    f"Terminating in-flight process {process.pid} of {command.name}...", fg="gray"
+                    f"Terminating in-flight process {child.pid} of {command.name}...", fg="gray"
                 )
             )
-            if self.grace_period <= 0:
-                process.kill()
-                await process.wait()
-            else:
-                process.terminate()
-                _, pending = await asyncio.wait(
-                    [asyncio.create_task(process.wait())], timeout=self.grace_period
-                )
-                if pending:
-                    await self.console.aprint(
-                        color.yellow(
-                            f"Process {process.pid} has not responded to a termination request after "
-                            f"{self.grace_period:.2f}s, killing..."
-                        )
+            await self._terminate_process(child)
+
+    async def _terminate_process(self, child: process.Process) -> None:
+        if self.grace_period <= 0:
+            child.kill()
+            await child.wait()
+        else:
+            child.terminate()
+            _, pending = await asyncio.wait(
+                [asyncio.create_task(child.wait())], timeout=self.grace_period
+            )
+            if pending:
+                await self.console.aprint(
+                    color.yellow(
+                        f"Process {child.pid} has not responded to a termination request after "
+                        f"{self.grace_period:.2f}s, killing..."
                     )
-                    process.kill()
-                    await process.wait()
+                )
+                child.kill()
+                await child.wait()
+
+    @asynccontextmanager
+    async def _watchdog(
+        self, prefix: str, command: Command, child: process.Process
+    ) -> AsyncIterator[_Watchdog]:
+        timeout = self.timeout if self.timeout is not None else command.timeout
+        watchdog = _Watchdog(timeout=timeout)
+        if timeout is None:
+            yield watchdog
+            return
+
+        async def expire() -> None:
+            await asyncio.sleep(timeout)
+            watchdog.timed_out = True
+            self._in_flight_processes.pop(child, None)
+            message = (
+                f"{color.bold(command.name)} timed out after {timeout:.2f}s, terminating process "
+                f"{child.pid}..."
+            )
+            await self.console.aprint(f"{prefix} {color.yellow(message)}", use_stderr=True)
+            await self._terminate_process(child)
+
+        expiry = asyncio.create_task(expire())
+        try:
+            yield watchdog
+        finally:
+            expiry.cancel()
 
     def _python_for_command(self, command: Command) -> str:
         if command.python:
@@ -189,22 +545,98 @@ class Invocation:
             ].python
         return sys.executable
 
+    def _command_args(self, command: Command, *extra_args: str) -> list[str]:
+        args = list(command.args)
+        if extra_args and command.accepts_extra_args:
+            args.extend(extra_args)
+
+        if args[0].endswith(".py"):
+            args.insert(0, self._python_for_command(command))
+        elif "python" == args[0]:
+            args[0] = self._python_for_command(command)
+        return args
+
+    async def _up_to_date_stamp(
+        self, prefix: str, command: Command, *extra_args: str
+    ) -> tuple[bool, Stamp | None]:
+        if not command.inputs:
+            return False, None
+
+        stamp = await asyncio.to_thread(
+            Stamp.calculate,
+            command,
+            args=self._command_args(command, *extra_args),
+            python=self._python_for_command(command),
+        )
+        # N.B.: Cached commands replay their output instead of being silently skipped.
+        if (
+            stamp
+            and not command.cache
+            and not self.force
+            and await asyncio.to_thread(stamp.is_up_to_date)
+        ):
+            await self.console.aprint(
+                f"{prefix} {color.color(f'{color.bold(command.name)} is up to date.', fg='gray')}",
+                use_stderr=True,
+            )
+            return True, stamp
+        return False, stamp
+
+    def _record_command(
+        self,
+        command: Command,
+        start: float,
+        exit_code: int,
+        rusage: Rusage | None = None,
+    ) -> None:
+        if not self.history:
+            return
+        factors: str | None = None
+        if command.base and command.name != command.base.name:
+            factors = command.name[len(command.base.name) + 1 :]
+        self.history.append(
+            Record(
+                run=self.history.run_id,
+                kind=Kind.COMMAND,
+                name=command.name,
+                start=start,
+                end=time.time(),
+                exit_code=exit_code,
+                python=str(command.python) if command.python else None,
+                factors=factors,
+                rusage=rusage,
+            )
+        )
+
+    def _caches(self, command: Command) -> bool:
+        return command.cache and self.action_cache is not None
+
+    async def _cached_result(self, command: Command, stamp: Stamp | None) -> CachedResult | None:
+        if not stamp or self.force or not self.action_cache or not command.cache:
+            return None
+        return await asyncio.to_thread(self.action_cache.get, stamp.fingerprint)
+
+    async def _cache_result(
+        self, command: Command, stamp: Stamp | None, returncode: int, output: bytes
+    ) -> None:
+        if stamp and self.action_cache and command.cache:
+            await asyncio.to_thread(self.action_cache.put, stamp.fingerprint, returncode, output)
+
     async def _invoke_command(
         self, command: Command, *extra_args, **subprocess_kwargs: Any
-    ) -> Process | ExecutionError:
+    ) -> process.Process | ExecutionError:
         if command.cwd and not os.path.exists(command.cwd):
             return ExecutionError(
                 command.name,
                 f"The `cwd` for command {command.name!r} does not exist: {command.cwd}",
             )
 
-        args = list(command.args)
-        if extra_args and command.accepts_extra_args:
-            args.extend(extra_args)
-
+        args = self._command_args(command, *extra_args)
         env = os.environ.copy()
         env.update(command.extra_env)
-        if USE_COLOR and not any(color_env in env for color_env in ("PYTHON_COLORS", "NO_COLOR")):
+        if color.USE_COLOR and not any(
+            color_env in env for color_env in ("PYTHON_COLORS", "NO_COLOR")
+        ):
             env.setdefault("FORCE_COLOR", "1")
         if command.python:
             self.venvs[
@@ -214,49 +646,327 @@ class Invocation:
                 )
             ].update_path(env)
 
-        if args[0].endswith(".py"):
-            args.insert(0, self._python_for_command(command))
-        elif "python" == args[0]:
-            args[0] = self._python_for_command(command)
+        if "stdout" not in subprocess_kwargs:
+            # N.B.: The child writes straight to our stdout and stderr; so anything we've printed
+            # so far needs to land first.
+            await self.console.aflush()
+        child = await process.spawn(args, cwd=command.cwd, env=env, **subprocess_kwargs)
+        self._in_flight_processes[child] = command
+        return child
+
+    async def _tee_output(self, stream: asyncio.StreamReader) -> bytes:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        chunks: list[bytes] = []
+        while chunk := await stream.read(_STREAM_CHUNK_SIZE):
+            chunks.append(chunk)
+            await self.console.aprint(decoder.decode(chunk), end="", force=True)
+        if remaining := decoder.decode(b"", final=True):
+            await self.console.aprint(remaining, end="", force=True)
+        return b"".join(chunks)
+
+    async def _stream_output(
+        self, command: Command, stream: asyncio.StreamReader, capture: bool = False
+    ) -> bytes | None:
+        prefix = _step_prefix(command.name, serial=False)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        chunks: list[bytes] | None = [] if capture else None
+
+        async def emit(line: str) -> None:
+            line = line.rstrip("\r")
+            await self.console.aprint(f"{prefix} {line}", use_stderr=True, force=True)
+
+        pending = ""
+        while chunk := await stream.read(_STREAM_CHUNK_SIZE):
+            if chunks is not None:
+                chunks.append(chunk)
+            lines = (pending + decoder.decode(chunk)).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                await emit(line)
+            if len(pending) >= _STREAM_CHUNK_SIZE:
+                await emit(pending)
+                pending = ""
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            await emit(pending)
+        return b"".join(chunks) if chunks is not None else None
+
+    async def _await_outcome(self, prefix: str, command: Command) -> None:
+        # N.B.: A failure is only reported by the reference that ran the command; later references
+        # are skipped so the failure is not counted once per reference.
+        if await asyncio.shield(self._outcomes[command]):
+            message = (
+                f"Skipping {color.bold(command.name)}, which already failed in this invocation."
+            )
+            await self.console.aprint(f"{prefix} {color.yellow(message)}", use_stderr=True)
+        else:
+            message = f"{color.bold(command.name)} was already run in this invocation."
+            await self.console.aprint(
+                f"{prefix} {color.color(message, fg='gray')}", use_stderr=True
+            )
+
+    def _record_outcome(self, command: Command) -> asyncio.Future[ExecutionError | None]:
+        outcome = asyncio.get_running_loop().create_future()
+        self._outcomes[command] = outcome
+        return outcome
+
+    async def _invoke_command_captured(
+        self, prefix: str, command: Command, *extra_args: str
+    ) -> _CapturedResult | ExecutionError | None:
+        # N.B.: The same command can be reached through several tasks in one invocation; it only
+        # runs once and later references share the outcome of that run.
+        if command in self._outcomes:
+            await self._await_outcome(prefix, command)
+            return None
+
+        outcome = self._record_outcome(command)
+        try:
+            result = await self._execute_command_captured(prefix, command, *extra_args)
+        except BaseException:
+            outcome.cancel()
+            raise
+        if isinstance(result, _CapturedResult):
+            outcome.set_result(result.error())
+        else:
+            outcome.set_result(result)
+        return result
+
+    async def _execute_command_captured(
+        self, prefix: str, command: Command, *extra_args: str
+    ) -> _CapturedResult | ExecutionError | None:
+        async with self._job_slot(prefix, command):
+            up_to_date, stamp = await self._up_to_date_stamp(prefix, command, *extra_args)
+            if up_to_date:
+                return None
+
+            start = time.time()
+            if cached := await self._cached_result(command, stamp):
+                return _CapturedResult(
+                    command=command,
+                    returncode=cached.returncode,
+                    output=cached.output,
+                    elapsed=time.time() - start,
+                    cached=True,
+                )
+
+            log: Path | None = None
+            if self.logs and self.output_style is OutputStyle.BUFFERED:
+                # N.B.: The command writes straight to its log file; so buffered output does not
+                # accumulate in memory no matter how much of it there is.
+                log = self.logs.path(command)
+                with log.open("wb") as fp:
+                    proc_or_error = await self._invoke_command(
+                        command, *extra_args, stdout=fp.fileno(), stderr=asyncio.subprocess.STDOUT
+                    )
+            else:
+                proc_or_error = await self._invoke_command(
+                    command,
+                    *extra_args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+            if isinstance(proc_or_error, ExecutionError):
+                return proc_or_error
+
+            output: bytes | None = None
+            async with self._watchdog(prefix, command, proc_or_error) as watchdog:
+                if self.output_style is OutputStyle.STREAMED:
+                    assert proc_or_error.stdout is not None
+                    streamed_output = await self._stream_output(
+                        command, proc_or_error.stdout, capture=self._caches(command)
+                    )
+                else:
+                    output = await proc_or_error.communicate()
+                    streamed_output = None
+                elapsed = time.time() - start
+                self._in_flight_processes.pop(proc_or_error, None)
+                returncode = await proc_or_error.wait()
+            self._record_command(command, start, returncode, proc_or_error.rusage)
+            succeeded = returncode == 0 and not watchdog.timed_out
+            if self.durations and succeeded:
+                self.durations.record(command, elapsed)
+            if stamp:
+                if succeeded:
+                    await asyncio.to_thread(stamp.record)
+                else:
+                    stamp.invalidate()
+            if not watchdog.timed_out and self._caches(command):
+                if log:
+                    output_to_cache = await asyncio.to_thread(log.read_bytes)
+                elif output is not None:
+                    output_to_cache = output
+                else:
+                    output_to_cache = streamed_output or b""
+                await self._cache_result(command, stamp, returncode, output_to_cache)
+            return _CapturedResult(
+                command=command,
+                returncode=returncode,
+                output=output,
+                elapsed=elapsed,
+                rusage=proc_or_error.rusage,
+                timed_out=watchdog.expired,
+                log=log,
+            )
+
+    async def _report_captured(self, prefix: str, result: _CapturedResult) -> ExecutionError | None:
+        cmd_name = color.color(
+            result.command.name, fg="red" if result.error() else "magenta", style="bold"
+        )
+        # N.B.: Streamed output has already been emitted line by line; so we just report the
+        # command completed.
+        header_end = ":" if result.output is not None or result.log else ""
+        if result.cached:
+            cmd_name = f"{cmd_name} {color.color('(cached)', fg='gray')}"
+        if self.timings:
+            timing = color.color(_timing(result.elapsed, result.rusage), fg="gray")
+            await self.console.aprint(f"{prefix} {cmd_name} {timing}{header_end}", use_stderr=True)
+        else:
+            await self.console.aprint(f"{prefix} {cmd_name}{header_end}", use_stderr=True)
+        if result.output is not None:
+            await self.console.aprint(
+                result.output.decode(errors="replace"), end="", use_stderr=True, force=True
+            )
+        elif result.log and result.error():
+            await self._replay_log_tail(result.log)
+        elif result.log:
+            await self._replay_log(result.log)
+        return result.error()
 
-        process = await asyncio.create_subprocess_exec(
-            args[0],
-            *args[1:],
-            cwd=command.cwd,
-            env=env,
-            **subprocess_kwargs,
+    async def _replay_log_tail(self, log: Path) -> None:
+        output, truncated = await asyncio.to_thread(tail, log, _LOG_TAIL_LINES)
+        if truncated:
+            await self.console.aprint(
+                color.color(
+                    f"... showing the last {_LOG_TAIL_LINES} lines; the full log is at {log}",
+                    fg="gray",
+                ),
+                use_stderr=True,
+                force=True,
+            )
+        await self.console.aprint(
+            output.decode(errors="replace"), end="", use_stderr=True, force=True
         )
-        self._in_flight_processes[process] = command
-        return process
+
+    async def _replay_log(self, log: Path) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with log.open("rb") as fp:
+            while chunk := fp.read(_STREAM_CHUNK_SIZE):
+                await self.console.aprint(
+                    decoder.decode(chunk), end="", use_stderr=True, force=True
+                )
+        if remaining := decoder.decode(b"", final=True):
+            await self.console.aprint(remaining, end="", use_stderr=True, force=True)
 
     async def _invoke_command_sync(
         self, command: Command, *extra_args, prefix: str | None = None
     ) -> ExecutionError | None:
         prefix = prefix or _step_prefix(step_name=None, serial=True)
-        await self.console.aprint(
-            f"{prefix} {color.magenta(f'Executing {color.bold(command.name)}...')}",
-            use_stderr=True,
-        )
-        start = time.time()
-        command_name_color = "red"
+        if command in self._outcomes:
+            await self._await_outcome(prefix, command)
+            return None
+
+        outcome = self._record_outcome(command)
         try:
-            process_or_error = await self._invoke_command(command, *extra_args)
-            if isinstance(process_or_error, ExecutionError):
-                return process_or_error
-
-            returncode = await process_or_error.wait()
-            self._in_flight_processes.pop(process_or_error, None)
-            if returncode == 0:
-                command_name_color = "magenta"
+            error = await self._execute_command_sync(prefix, command, *extra_args)
+        except BaseException:
+            outcome.cancel()
+            raise
+        outcome.set_result(error)
+        return error
+
+    async def _execute_command_sync(
+        self, prefix: str, command: Command, *extra_args
+    ) -> ExecutionError | None:
+        async with self._job_slot(prefix, command):
+            up_to_date, stamp = await self._up_to_date_stamp(prefix, command, *extra_args)
+            if up_to_date:
                 return None
 
-            return ExecutionError.from_failed_cmd(command, returncode)
-        finally:
-            if self.timings:
-                timing = color.color(f"took {time.time() - start:.3f}s", fg="gray")
+            if cached := await self._cached_result(command, stamp):
+                cmd_name = color.color(
+                    command.name, fg="magenta" if cached.returncode == 0 else "red", style="bold"
+                )
+                await self.console.aprint(
+                    f"{prefix} {cmd_name} {color.color('(cached)', fg='gray')}:", use_stderr=True
+                )
                 await self.console.aprint(
-                    f"{prefix} {color.color(f'{color.bold(command.name)} {timing}', fg=command_name_color)}"
+                    cached.output.decode(errors="replace"), end="", force=True
+                )
+                if cached.returncode != 0:
+                    return ExecutionError.from_failed_cmd(command, cached.returncode)
+                return None
+
+            await self.console.aprint(
+                f"{prefix} {color.magenta(f'Executing {color.bold(command.name)}...')}",
+                use_stderr=True,
+            )
+            start = time.time()
+            command_name_color = "red"
+            rusage: Rusage | None = None
+            try:
+                if self._caches(command):
+                    process_or_error = await self._invoke_command(
+                        command,
+                        *extra_args,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT,
+                    )
+                else:
+                    process_or_error = await self._invoke_command(command, *extra_args)
+                if isinstance(process_or_error, ExecutionError):
+                    return process_or_error
+
+                async with self._watchdog(prefix, command, process_or_error) as watchdog:
+                    if process_or_error.stdout:
+                        output = await self._tee_output(process_or_error.stdout)
+                    returncode = await process_or_error.wait()
+                rusage = process_or_error.rusage
+                self._in_flight_processes.pop(process_or_error, None)
+                self._record_command(command, start, returncode, rusage)
+                if watchdog.timed_out:
+                    if stamp:
+                        stamp.invalidate()
+                    return _command_error(command, returncode, watchdog.expired)
+                if process_or_error.stdout:
+                    await self._cache_result(command, stamp, returncode, output)
+                if returncode == 0:
+                    command_name_color = "magenta"
+                    if self.durations:
+                        self.durations.record(command, time.time() - start)
+                    if stamp:
+                        await asyncio.to_thread(stamp.record)
+                    return None
+
+                if stamp:
+                    stamp.invalidate()
+                return ExecutionError.from_failed_cmd(command, returncode)
+            finally:
+                if self.timings:
+                    timing = _timing(time.time() - start, rusage)
+                    await self.console.aprint(
+                        f"{prefix} {color.color(f'{color.bold(command.name)} {timing}', fg=command_name_color)}"
+                    )
+
+    async def _invoke_task(
+        self, task: Task, *extra_args: str, exit_style: ExitStyle
+    ) -> ExecutionError | None:
+        start = time.time()
+        with self._step_lanes.span(task.name, "task"):
+            error = await self._run_group(
+                task.name, task.steps, *extra_args, serial=True, exit_style=exit_style
+            )
+        if self.history:
+            self.history.append(
+                Record(
+                    run=self.history.run_id,
+                    kind=Kind.TASK,
+                    name=task.name,
+                    start=start,
+                    end=time.time(),
+                    exit_code=error.exit_code if error else 0,
                 )
+            )
+        return error
 
     async def _invoke_group(
         self,
@@ -265,6 +975,21 @@ class Invocation:
         *extra_args: str,
         serial: bool,
         exit_style: ExitStyle = ExitStyle.AFTER_STEP,
+    ) -> ExecutionError | None:
+        with self._step_lanes.span(
+            task_name or "*", "serial group" if serial else "parallel group"
+        ):
+            return await self._run_group(
+                task_name, group, *extra_args, serial=serial, exit_style=exit_style
+            )
+
+    async def _run_group(
+        self,
+        task_name: str | None,
+        group: Group,
+        *extra_args: str,
+        serial: bool,
+        exit_style: ExitStyle = ExitStyle.AFTER_STEP,
     ) -> ExecutionError | None:
         prefix = _step_prefix(task_name, serial)
         start = time.time()
@@ -278,9 +1003,7 @@ class Invocation:
                 elif isinstance(member, Task):
                     if member.name in self.skips:
                         continue
-                    error = await self._invoke_group(
-                        member.name, member.steps, *extra_args, serial=True, exit_style=exit_style
-                    )
+                    error = await self._invoke_task(member, *extra_args, exit_style=exit_style)
                 else:
                     group_serial = not serial
                     group_name: str | None = None
@@ -313,36 +1036,18 @@ class Invocation:
 
             return None
 
-        async def invoke_command_captured(
-            command: Command,
-        ) -> tuple[Command, int, bytes, float] | ExecutionError:
-            command_start = time.time()
-            proc_or_error = await self._invoke_command(
-                command,
-                *extra_args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.STDOUT,
-            )
-            if isinstance(proc_or_error, ExecutionError):
-                return proc_or_error
-
-            command_output, _ = await proc_or_error.communicate()
-            command_elapsed = time.time() - command_start
-            self._in_flight_processes.pop(proc_or_error, None)
-            return command, await proc_or_error.wait(), command_output, command_elapsed
-
         async def iter_tasks(
             item: Command | Task | Group,
-        ) -> AsyncIterator[AsyncTask[tuple[Command, int, bytes, float] | ExecutionError | None]]:
+        ) -> AsyncIterator[AsyncTask[_CapturedResult | ExecutionError | None]]:
             if isinstance(item, Command):
                 if item.name not in self.skips:
-                    yield asyncio.create_task(invoke_command_captured(item))
+                    yield asyncio.create_task(
+                        self._invoke_command_captured(prefix, item, *extra_args)
+                    )
             elif isinstance(item, Task):
                 if item.name not in self.skips:
                     yield asyncio.create_task(
-                        self._invoke_group(
-                            item.name, item.steps, *extra_args, serial=True, exit_style=exit_style
-                        )
+                        self._invoke_task(item, *extra_args, exit_style=exit_style)
                     )
             else:
                 async_group_serial = not serial
@@ -370,7 +1075,11 @@ class Invocation:
 
         errors: list[ExecutionError] = []
         for invoked in asyncio.as_completed(
-            [r for m in group.members async for r in iter_tasks(m)]
+            [
+                r
+                for m in self._dispatch_order(group.members, serial=not serial)
+                async for r in iter_tasks(m)
+            ]
         ):
             result = await invoked
             if result is None:
@@ -382,22 +1091,7 @@ class Invocation:
                 errors.append(result)
                 continue
 
-            cmd, returncode, output, elapsed = result
-            cmd_name = color.color(
-                cmd.name, fg="magenta" if returncode == 0 else "red", style="bold"
-            )
-            if self.timings:
-                await self.console.aprint(
-                    f"{prefix} {cmd_name} {color.color(f'took {elapsed:.3f}s', fg='gray')}:",
-                    use_stderr=True,
-                )
-            else:
-                await self.console.aprint(f"{prefix} {cmd_name}:", use_stderr=True)
-            await self.console.aprint(
-                output.decode(errors="replace"), end="", use_stderr=True, force=True
-            )
-            if returncode != 0:
-                error = ExecutionError.from_failed_cmd(cmd, returncode)
+            if error := await self._report_captured(prefix, result):
                 if exit_style is ExitStyle.IMMEDIATE:
                     return error
                 errors.append(error)
@@ -0,0 +1,77 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+
+AUTO = "auto"
+
+
+def _cgroup_v2_cpu_limit(cgroup_root: Path) -> float | None:
+    try:
+        with open("/proc/self/cgroup") as fp:
+            for line in fp:
+                hierarchy_id, _, path = line.rstrip("\n").split(":", 2)
+                if hierarchy_id == "0":
+                    break
+            else:
+                return None
+    except OSError:
+        return None
+
+    # N.B.: The quota can be set at any level of the hierarchy; the tightest one wins.
+    limit: float | None = None
+    cgroup_dir = cgroup_root / path.lstrip("/")
+    while True:
+        try:
+            quota, period = (cgroup_dir / "cpu.max").read_text().split()
+        except (OSError, ValueError):
+            pass
+        else:
+            if quota != "max":
+                level_limit = int(quota) / int(period)
+                limit = level_limit if limit is None else min(limit, level_limit)
+        if cgroup_dir == cgroup_root or cgroup_dir.parent == cgroup_dir:
+            return limit
+        cgroup_dir = cgroup_dir.parent
+
+
+def _cgroup_v1_cpu_limit(cgroup_root: Path) -> float | None:
+    cpu_dir = cgroup_root / "cpu"
+    try:
+        quota = int((cpu_dir / "cpu.cfs_quota_us").read_text())
+        period = int((cpu_dir / "cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
+
+
+def available_cpu_count(cgroup_root: Path = Path("/sys/fs/cgroup")) -> int:
+    # N.B.: Both the CPU affinity mask and any cgroup CPU quota can be much smaller than the number
+    # of CPUs on the machine in containerized CI environments.
+    if hasattr(os, "sched_getaffinity"):
+        cpu_count = len(os.sched_getaffinity(0))
+    else:
+        cpu_count = os.cpu_count() or 1
+
+    cpu_limit = _cgroup_v2_cpu_limit(cgroup_root)
+    if cpu_limit is None:
+        cpu_limit = _cgroup_v1_cpu_limit(cgroup_root)
+    if cpu_limit is not None:
+        cpu_count = min(cpu_count, math.ceil(cpu_limit))
+
+    return max(1, cpu_count)
+
+
+def parse_jobs(value: str | int) -> int:
+    if value == AUTO:
+        return available_cpu_count()
+    jobs = int(value)
+    if jobs < 1:
+        raise ValueError(f"The number of jobs must be a positive integer; given: {value}")
+    return jobs
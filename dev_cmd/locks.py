@@ -0,0 +1,48 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from dev_cmd.model import Command
+
+
+@dataclass
+class ResourceLocks:
+    _exclusive: set[str] = field(default_factory=set, init=False)
+    _shared: Counter[str] = field(default_factory=Counter, init=False)
+    _condition: asyncio.Condition | None = field(default=None, init=False)
+
+    def _available(self, command: Command) -> bool:
+        return not any(
+            lock in self._exclusive or self._shared[lock] for lock in command.locks
+        ) and not any(lock in self._exclusive for lock in command.shared_locks)
+
+    @asynccontextmanager
+    async def hold(self, command: Command) -> AsyncIterator[None]:
+        if not command.locks and not command.shared_locks:
+            yield
+            return
+
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+
+        # N.B.: All of a command's locks are taken at once; so commands can never deadlock holding
+        # some locks while waiting on others.
+        async with condition:
+            await condition.wait_for(lambda: self._available(command))
+            self._exclusive.update(command.locks)
+            self._shared.update(command.shared_locks)
+        try:
+            yield
+        finally:
+            async with condition:
+                self._exclusive.difference_update(command.locks)
+                self._shared.subtract(command.shared_locks)
+                condition.notify_all()
@@ -0,0 +1,87 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from dev_cmd import cache
+from dev_cmd.model import Command
+
+if TYPE_CHECKING:
+    from filelock import FileLock
+
+DEFAULT_KEEP_RUNS = 10
+
+_TAIL_CHUNK_SIZE = 64 * 1024
+
+
+def tail(log: Path, lines: int) -> tuple[bytes, bool]:
+    """Return the last `lines` lines of the log and whether any earlier lines were left out."""
+
+    with log.open("rb") as fp:
+        end = fp.seek(0, os.SEEK_END)
+        position = end
+        data = b""
+        # N.B.: A trailing newline ends the last line; it does not start a new one.
+        while position > 0 and data.count(b"\n", 0, len(data) - 1) < lines:
+            read_size = min(_TAIL_CHUNK_SIZE, position)
+            position -= read_size
+            fp.seek(position)
+            data = fp.read(read_size) + data
+    tail_lines = data.splitlines(keepends=True)
+    if len(tail_lines) > lines:
+        return b"".join(tail_lines[-lines:]), True
+    return data, False
+
+
+@dataclass(frozen=True)
+class Logs:
+    @classmethod
+    def create(cls, run_id: str, keep_runs: int = DEFAULT_KEEP_RUNS) -> Logs:
+        from filelock import FileLock
+
+        run_dir = cache.ensure_cache_dir() / "logs" / run_id
+        logs = cls(run_dir=run_dir, lock=FileLock(f"{run_dir}.lck"))
+        logs.prune(keep_runs)
+        return logs
+
+    run_dir: Path
+    lock: FileLock
+
+    def prune(self, keep_runs: int) -> None:
+        from filelock import FileLock, Timeout
+
+        # N.B.: Run ids sort in the order the runs were started and this run's directory is only
+        # created once it logs a command; so we keep room for it.
+        try:
+            run_dirs = sorted(path for path in self.run_dir.parent.iterdir() if path.is_dir())
+        except FileNotFoundError:
+            return
+        for run_dir in run_dirs[: max(0, len(run_dirs) - keep_runs + 1)]:
+            if run_dir == self.run_dir:
+                continue
+            # N.B.: A run holds the lock for its logs until it exits; so we never prune the logs of
+            # a concurrent run still in progress.
+            lock_file = Path(f"{run_dir}.lck")
+            lock = FileLock(lock_file)
+            try:
+                lock.acquire(timeout=0)
+            except Timeout:
+                continue
+            try:
+                shutil.rmtree(run_dir, ignore_errors=True)
+            finally:
+                lock.release()
+            lock_file.unlink(missing_ok=True)
+
+    def path(self, command: Command) -> Path:
+        if not self.lock.is_locked:
+            self.run_dir.parent.mkdir(parents=True, exist_ok=True)
+            self.lock.acquire()
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        return self.run_dir / f"{command.name.replace(os.sep, '_')}.log"
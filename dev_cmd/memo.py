@@ -0,0 +1,73 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Hashable, Iterable, Mapping, TypeVar
+
+# N.B.: Memoized values are only re-used while the stamp they were computed under still matches.
+# In a normal `dev-cmd` run each value is computed once anyway; the memos pay off in the `dev-cmd`
+# daemon, which seeds each run with the values computed by the runs before it.
+
+_T = TypeVar("_T")
+
+_ENTRIES: dict[Hashable, tuple[Hashable, Any]] = {}
+_UPDATES: dict[Hashable, tuple[Hashable, Any]] = {}
+
+
+def stat_stamp(paths: Iterable[str | os.PathLike[str]]) -> tuple[tuple[str, int, int], ...]:
+    stamp: list[tuple[str, int, int]] = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stamp.append((os.fspath(path), -1, -1))
+        else:
+            stamp.append((os.fspath(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+def tree_stamp(paths: Iterable[str | os.PathLike[str]]) -> tuple[tuple[str, int, int], ...]:
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, filenames in os.walk(path):
+                dirs.sort()
+                files.append(root)
+                files.extend(os.path.join(root, filename) for filename in sorted(filenames))
+        else:
+            files.append(os.fspath(path))
+    return stat_stamp(files)
+
+
+def lookup(key: Hashable, stamp: Hashable, valid: Callable[[Any], bool] | None = None) -> Any:
+    entry = _ENTRIES.get(key)
+    if entry is not None and entry[0] == stamp and (valid is None or valid(entry[1])):
+        return entry[1]
+    return None
+
+
+def store(key: Hashable, stamp: Hashable, value: _T) -> _T:
+    _ENTRIES[key] = _UPDATES[key] = stamp, value
+    return value
+
+
+def memoize(
+    key: Hashable,
+    stamp: Hashable,
+    compute: Callable[[], _T],
+    valid: Callable[[_T], bool] | None = None,
+) -> _T:
+    value = lookup(key, stamp, valid)
+    if value is not None:
+        return value  # type: ignore[no-any-return]
+    return store(key, stamp, compute())
+
+
+def updates() -> dict[Hashable, tuple[Hashable, Any]]:
+    return dict(_UPDATES)
+
+
+def merge(entries: Mapping[Hashable, tuple[Hashable, Any]]) -> None:
+    _ENTRIES.update(entries)
@@ -6,18 +6,47 @@ from __future__ import annotations
 import os
 import re
 import sys
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import PurePath
-from typing import Any, Container, Iterator, Mapping, MutableMapping
+from typing import TYPE_CHECKING, Any, Container, Iterator, Mapping, MutableMapping
 
-from packaging.markers import Marker
+if TYPE_CHECKING:
+    from packaging.markers import Marker
 
 
 class Factor(str):
     pass
 
 
+def split_factors(text: str) -> tuple[Factor, ...]:
+    factors: list[Factor] = []
+    factor_chars: list[str] = []
+    chars = deque(text)
+    while chars:
+        while chars:
+            char = chars.popleft()
+
+            if char != "-":
+                factor_chars.append(char)
+                continue
+
+            # Escaped - (--)
+            if chars and chars[0] == "-":
+                factor_chars.append(char)
+                chars.popleft()
+                continue
+
+            if not chars:
+                factor_chars.append(char)
+
+            break
+        factors.append(Factor("".join(factor_chars)))
+        factor_chars.clear()
+    return tuple(factors)
+
+
 @dataclass(frozen=True)
 class FactorDescription:
     factor: Factor
@@ -56,6 +85,12 @@ class Python:
         return self.spec
 
 
+@dataclass(frozen=True)
+class Inputs:
+    paths: tuple[str, ...] = ()
+    envs: tuple[str, ...] = ()
+
+
 @dataclass(frozen=True)
 class Command:
     name: str
@@ -67,6 +102,15 @@ class Command:
     description: str | None = None
     when: Marker | None = None
     dependency_group: str | None = None
+    needs: tuple[str, ...] = ()
+    inputs: Inputs | None = None
+    outputs: tuple[str, ...] = ()
+    cache: bool = False
+    locks: tuple[str, ...] = ()
+    shared_locks: tuple[str, ...] = ()
+    # N.B.: A task's `timeout` is pushed down to the commands it runs; so the same command run by
+    # tasks with different timeouts is still the same command.
+    timeout: float | None = field(default=None, compare=False)
     python: Python | None = field(default=None, compare=False)
     factor_descriptions: tuple[FactorDescription, ...] = field(default=(), compare=False)
     base: Command | None = field(default=None, compare=False)
@@ -93,6 +137,8 @@ class Task:
     hidden: bool = False
     description: str | None = None
     when: Marker | None = None
+    needs: tuple[str, ...] = ()
+    timeout: float | None = None
 
     def accepts_extra_args(self, skips: Container[str] = ()) -> Iterator[Command]:
         for command in self.iter_commands(skips):
@@ -114,6 +160,22 @@ class ExitStyle(Enum):
         return self.value
 
 
+class OutputStyle(Enum):
+    BUFFERED = "buffered"
+    STREAMED = "streamed"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Installer(Enum):
+    PIP = "pip"
+    UV = "uv"
+
+    def __str__(self) -> str:
+        return self.value
+
+
 @dataclass(frozen=True)
 class CacheKeyInputs:
     pyproject_data: Mapping[str, Any]
@@ -131,6 +193,7 @@ class PythonConfig:
     extra_requirements: tuple[str, ...] | str
     extra_requirements_pip_install_opts: tuple[str, ...]
     finalize_command: Command | None
+    installer: Installer = Installer.PIP
 
 
 @dataclass(frozen=True)
@@ -159,12 +222,102 @@ class VenvConfig:
     dependency_group: str | None = None
 
 
+# N.B.: The `ru_maxrss` field is reported in KiB on Linux but in bytes on macOS.
+_MAX_RSS_MULTIPLIER = 1 if sys.platform == "darwin" else 1024
+
+
+def _format_size(size: int) -> str:
+    amount = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if amount < 1024:
+            return f"{amount:.1f}{unit}"
+        amount /= 1024
+    return f"{amount:.1f}GiB"
+
+
+@dataclass(frozen=True)
+class Rusage:
+    @classmethod
+    def from_struct(cls, rusage: Any) -> Rusage:
+        return cls(
+            user=rusage.ru_utime,
+            system=rusage.ru_stime,
+            max_rss=rusage.ru_maxrss * _MAX_RSS_MULTIPLIER,
+            blocks_in=rusage.ru_inblock,
+            blocks_out=rusage.ru_oublock,
+            voluntary_switches=rusage.ru_nvcsw,
+            involuntary_switches=rusage.ru_nivcsw,
+        )
+
+    user: float
+    system: float
+    max_rss: int
+    blocks_in: int
+    blocks_out: int
+    voluntary_switches: int
+    involuntary_switches: int
+
+    def render(self) -> str:
+        return (
+            f"user {self.user:.3f}s sys {self.system:.3f}s rss {_format_size(self.max_rss)} "
+            f"io {self.blocks_in}/{self.blocks_out} blocks "
+            f"ctx {self.voluntary_switches}/{self.involuntary_switches}"
+        )
+
+
+@dataclass(frozen=True)
+class Admission:
+    cpu_pressure: float | None = None
+    memory_pressure: float | None = None
+    load: float | None = None
+
+
+@dataclass(frozen=True)
+class StepNames:
+    """The names `needs` can refer to.
+
+    These are the names of the defined commands and tasks as well as factored command names; e.g.:
+    `type-check-py3.9`, whose factors each match a factor placeholder of the named command. A
+    command whose factor placeholder names are computed has `None` factor names and accepts any
+    factors.
+    """
+
+    names: frozenset[str]
+    command_factor_names: Mapping[str, frozenset[str] | None] = field(default_factory=dict)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        if name in self.names:
+            return True
+        for command_name, factor_names in self.command_factor_names.items():
+            if not name.startswith(f"{command_name}-"):
+                continue
+            if factor_names is None:
+                return True
+            factors = split_factors(name[len(command_name) + 1 :])
+            if factors and all(
+                sum(1 for factor_name in factor_names if factor.startswith(factor_name)) == 1
+                for factor in factors
+            ):
+                return True
+        return False
+
+
 @dataclass(frozen=True)
 class Configuration:
     commands: tuple[Command, ...]
     tasks: tuple[Task, ...]
     default: Command | Task | None = None
     exit_style: ExitStyle | None = None
+    output_style: OutputStyle | None = None
+    spool_logs: bool | None = None
     grace_period: float | None = None
+    jobs: int | None = None
+    action_cache_max_size: int | None = None
+    venv_cache_max_size: int | None = None
+    venv_cache_max_count: int | None = None
+    admission: Admission | None = None
     pythons: tuple[PythonConfig, ...] = ()
+    step_names: StepNames | None = None
     source: Any = "<code>"
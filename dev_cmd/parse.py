@@ -6,17 +6,28 @@ from __future__ import annotations
 import dataclasses
 import itertools
 import os
-from collections import defaultdict, deque
+import re
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Container, Dict, Iterable, Iterator, List, Mapping, Set, cast
-
-from packaging.markers import InvalidMarker, Marker
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Container,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Set,
+    cast,
+)
 
-from dev_cmd import venv
+from dev_cmd import action_cache, jobs, venv
 from dev_cmd.errors import InvalidArgumentError, InvalidModelError
 from dev_cmd.expansion import expand
 from dev_cmd.model import (
+    Admission,
     CacheKeyInputs,
     Command,
     Configuration,
@@ -24,13 +35,21 @@ from dev_cmd.model import (
     Factor,
     FactorDescription,
     Group,
+    Inputs,
+    Installer,
+    OutputStyle,
     Python,
     PythonConfig,
+    StepNames,
     Task,
+    split_factors,
 )
 from dev_cmd.placeholder import Environment, Substitution
 from dev_cmd.project import PyProjectToml
 
+if TYPE_CHECKING:
+    from packaging.markers import Marker
+
 
 def _assert_list_str(obj: Any, *, path: str) -> list[str]:
     if not isinstance(obj, list) or not all(isinstance(item, str) for item in obj):
@@ -109,8 +128,13 @@ def _parse_when(data: dict[str, Any], table_path: str) -> Marker | None:
             f"The {table_path} `when` value must be a string, "
             f"given: {raw_when} of type {type(raw_when)}."
         )
+    if not raw_when:
+        return None
+
+    from packaging.markers import InvalidMarker, Marker
+
     try:
-        return Marker(raw_when) if raw_when else None
+        return Marker(raw_when)
     except InvalidMarker as e:
         raise InvalidModelError(
             f"The {table_path} `when` value is not a valid marker "
@@ -120,6 +144,169 @@ def _parse_when(data: dict[str, Any], table_path: str) -> Marker | None:
         )
 
 
+def _parse_needs(data: dict[str, Any], table_path: str) -> tuple[str, ...]:
+    raw_needs = data.pop("needs", None)
+    if raw_needs is None:
+        return ()
+    return tuple(
+        itertools.chain.from_iterable(
+            expand(need) for need in _assert_list_str(raw_needs, path=f"{table_path} `needs`")
+        )
+    )
+
+
+def _parse_locks(data: dict[str, Any], table_path: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    locks = tuple(_assert_list_str(data.pop("locks", []), path=f"{table_path} `locks`"))
+    shared_locks = tuple(
+        _assert_list_str(data.pop("shared-locks", []), path=f"{table_path} `shared-locks`")
+    )
+    if both := sorted(frozenset(locks) & frozenset(shared_locks)):
+        raise InvalidModelError(
+            f"The {table_path} table lists the following in both `locks` and `shared-locks`: "
+            f"{' '.join(both)}"
+        )
+    return locks, shared_locks
+
+
+def _parse_timeout(data: dict[str, Any], table_path: str) -> float | None:
+    timeout = data.pop("timeout", None)
+    if timeout is None:
+        return None
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise InvalidModelError(
+            f"The {table_path} `timeout` value must be a positive number of seconds, given: "
+            f"{timeout} of type {type(timeout)}."
+        )
+    return float(timeout)
+
+
+def _inherit_timeout(group: Group, timeout: float) -> Group:
+    # N.B.: This makes a task timeout a limit on each of its commands and not a deadline for the
+    # task as a whole.
+    members: list[Command | Task | Group] = []
+    for member in group.members:
+        if isinstance(member, Command):
+            if member.timeout is None:
+                member = dataclasses.replace(member, timeout=timeout)
+        elif isinstance(member, Task):
+            member = dataclasses.replace(member, steps=_inherit_timeout(member.steps, timeout))
+        else:
+            member = _inherit_timeout(member, timeout)
+        members.append(member)
+    return Group(members=tuple(members))
+
+
+_FACTOR_PLACEHOLDER = re.compile(r"{-(?P<name>[^}:?]*)")
+
+
+def _factor_names(data: Any) -> frozenset[str] | None:
+    # N.B.: Returns `None` when a factor name is itself computed by a placeholder; e.g.:
+    # `{-{env.FACTOR}}`, in which case any factor may be valid.
+    names: set[str] = set()
+    if isinstance(data, str):
+        for match in _FACTOR_PLACEHOLDER.finditer(data):
+            name = match.group("name")
+            if name.startswith("{"):
+                return None
+            if name and not name.startswith("-"):
+                names.add(name)
+    elif isinstance(data, dict):
+        for value in data.values():
+            value_names = _factor_names(value)
+            if value_names is None:
+                return None
+            names.update(value_names)
+    elif isinstance(data, list):
+        for item in data:
+            item_names = _factor_names(item)
+            if item_names is None:
+                return None
+            names.update(item_names)
+    return frozenset(names)
+
+
+def _validate_needs(steps: Iterable[Command | Task], step_names: StepNames) -> None:
+    for step in steps:
+        kind = "commands" if isinstance(step, Command) else "tasks"
+        for need in step.needs:
+            if need == step.name or (
+                isinstance(step, Command) and step.base and need == step.base.name
+            ):
+                raise InvalidModelError(
+                    f"The [tool.dev-cmd.{kind}.{step.name}] `needs` list cannot include itself."
+                )
+            if need in step_names:
+                continue
+            raise InvalidModelError(
+                os.linesep.join(
+                    (
+                        f"The [tool.dev-cmd.{kind}.{step.name}] `needs` entry {need!r} is not the "
+                        f"name of a defined command or task.",
+                        "",
+                        f"Available names: {' '.join(sorted(step_names.names))}",
+                    )
+                )
+            )
+
+
+def _parse_globs(globs_data: Any, project_dir: Path, path: str) -> tuple[str, ...]:
+    return tuple(
+        (project_dir / glob).as_posix() for glob in _assert_list_str(globs_data, path=path)
+    )
+
+
+def _parse_inputs(
+    data: dict[str, Any], project_dir: Path, table_path: str
+) -> tuple[Inputs | None, tuple[str, ...]]:
+    inputs_data = data.pop("inputs", None)
+    outputs_data = data.pop("outputs", None)
+    outputs = (
+        _parse_globs(outputs_data, project_dir, path=f"{table_path} `outputs`")
+        if outputs_data is not None
+        else ()
+    )
+    if inputs_data is None:
+        if outputs:
+            raise InvalidModelError(
+                f"The {table_path} table defines `outputs` but no `inputs`. Outputs are only "
+                f"checked for commands that declare their inputs."
+            )
+        return None, ()
+
+    if not isinstance(inputs_data, list):
+        raise InvalidModelError(
+            f"Expected value at {table_path} `inputs` to be a list, but given: {inputs_data} of "
+            f"type {type(inputs_data)}."
+        )
+
+    globs: list[str] = []
+    envs: list[str] = []
+    for index, input_data in enumerate(inputs_data):
+        if isinstance(input_data, str):
+            globs.append(input_data)
+            continue
+
+        input_table = _assert_dict_str_keys(input_data, path=f"{table_path} `inputs[{index}]`")
+        if len(input_table) != 1 or not ("env" in input_table or "path" in input_table):
+            raise InvalidModelError(
+                f"Expected value at {table_path} `inputs[{index}]` to be either a string "
+                f"representing a file path glob or else a table with a single `env` or `path` "
+                f"entry, but given: {input_table}."
+            )
+        for key, value in input_table.items():
+            if not isinstance(value, str):
+                raise InvalidModelError(
+                    f"Expected value at {table_path} `inputs[{index}].{key}` to be a string, but "
+                    f"given: {value} of type {type(value)}."
+                )
+            (envs if key == "env" else globs).append(value)
+
+    inputs = Inputs(
+        paths=_parse_globs(globs, project_dir, path=f"{table_path} `inputs`"), envs=tuple(envs)
+    )
+    return inputs, outputs
+
+
 @dataclass(frozen=True)
 class DeactivatedCommand:
     name: str
@@ -158,6 +345,13 @@ def _parse_commands(
             when = None
             python_spec: str | None = None
             dependency_group: str | None = None
+            needs: tuple[str, ...] = ()
+            inputs: Inputs | None = None
+            outputs: tuple[str, ...] = ()
+            cache = False
+            locks: tuple[str, ...] = ()
+            shared_locks: tuple[str, ...] = ()
+            timeout: float | None = None
         else:
             command = _assert_dict_str_keys(data, path=f"[tool.dev-cmd.commands.{name}]")
 
@@ -258,6 +452,34 @@ def _parse_commands(
                 )
             dependency_group = raw_dependency_group
 
+            needs = _parse_needs(command, table_path=f"[tool.dev-cmd.commands.{name}]")
+            inputs, outputs = _parse_inputs(
+                command, project_dir=project_dir, table_path=f"[tool.dev-cmd.commands.{name}]"
+            )
+
+            locks, shared_locks = _parse_locks(
+                command, table_path=f"[tool.dev-cmd.commands.{name}]"
+            )
+            timeout = _parse_timeout(command, table_path=f"[tool.dev-cmd.commands.{name}]")
+
+            cache = command.pop("cache", False)
+            if not isinstance(cache, bool):
+                raise InvalidModelError(
+                    f"The [tool.dev-cmd.commands.{name}] `cache` value must be a boolean, "
+                    f"given: {cache} of type {type(cache)}."
+                )
+            if cache and not inputs:
+                raise InvalidModelError(
+                    f"The [tool.dev-cmd.commands.{name}] table sets `cache = true` but does not "
+                    f"declare its `inputs`. Only commands that declare their inputs can be cached."
+                )
+            if cache and outputs:
+                raise InvalidModelError(
+                    f"The [tool.dev-cmd.commands.{name}] table sets `cache = true` but also "
+                    f"declares `outputs`. Only the console output of cached commands is cached; so "
+                    f"they cannot produce output files."
+                )
+
             if data:
                 raise InvalidModelError(
                     f"Unexpected configuration keys in the [tool.dev-cmd.commands.{name}] table: "
@@ -360,6 +582,13 @@ def _parse_commands(
                     when=when,
                     python=substituted_python or python,
                     dependency_group=dependency_group,
+                    needs=needs,
+                    inputs=inputs,
+                    outputs=outputs,
+                    cache=cache,
+                    locks=locks,
+                    shared_locks=shared_locks,
+                    timeout=timeout,
                 )
 
             final_name = f"{name}{factors_suffix}"
@@ -393,6 +622,13 @@ def _parse_commands(
                     when=when,
                     python=substituted_python or python,
                     dependency_group=dependency_group,
+                    needs=needs,
+                    inputs=inputs,
+                    outputs=outputs,
+                    cache=cache,
+                    locks=locks,
+                    shared_locks=shared_locks,
+                    timeout=timeout,
                 )
 
 
@@ -495,6 +731,8 @@ def _parse_tasks(
                 )
 
             when = _parse_when(data, table_path=f"[tool.dev-cmd.tasks.{name}]")
+            needs = _parse_needs(data, table_path=f"[tool.dev-cmd.tasks.{name}]")
+            timeout = _parse_timeout(data, table_path=f"[tool.dev-cmd.tasks.{name}]")
 
             if data:
                 raise InvalidModelError(
@@ -506,6 +744,8 @@ def _parse_tasks(
             hidden = False
             description = None
             when = None
+            needs = ()
+            timeout = None
         else:
             raise InvalidModelError(
                 f"Expected value at [tool.dev-cmd.tasks] `{name}` to be a list containing strings "
@@ -527,18 +767,21 @@ def _parse_tasks(
                     f"You can define a task multiple times, but you must ensure the "
                     f"tasks all define mutually exclusive `when` marker expressions."
                 )
+            steps = _parse_group(
+                task=name,
+                group=group,
+                all_task_names=frozenset(tasks),
+                tasks_defined_so_far=tasks_by_name,
+                commands=commands,
+            )
             task = Task(
                 name=name,
-                steps=_parse_group(
-                    task=name,
-                    group=group,
-                    all_task_names=frozenset(tasks),
-                    tasks_defined_so_far=tasks_by_name,
-                    commands=commands,
-                ),
+                steps=_inherit_timeout(steps, timeout) if timeout else steps,
                 hidden=hidden,
                 description=description,
                 when=when,
+                needs=needs,
+                timeout=timeout,
             )
             tasks_by_name[name] = task
             seen_tasks[name] = original_name
@@ -600,6 +843,39 @@ def _parse_exit_style(exit_style: Any) -> ExitStyle | None:
         )
 
 
+def _parse_output_style(output_style: Any) -> OutputStyle | None:
+    if output_style is None:
+        return None
+
+    if not isinstance(output_style, str):
+        raise InvalidModelError(
+            f"Expected [tool.dev-cmd] `output-style` to be a string but given: {output_style} of "
+            f"type {type(output_style)}."
+        )
+
+    try:
+        return OutputStyle(output_style)
+    except ValueError:
+        raise InvalidModelError(
+            f"The [tool.dev-cmd] `output-style` of {output_style!r} is not recognized. Valid "
+            f"choices are {', '.join(repr(style.value) for style in list(OutputStyle)[:-1])} and "
+            f"{list(OutputStyle)[-1].value!r}."
+        )
+
+
+def _parse_spool_logs(spool_logs: Any) -> bool | None:
+    if spool_logs is None:
+        return None
+
+    if not isinstance(spool_logs, bool):
+        raise InvalidModelError(
+            f"Expected [tool.dev-cmd] `spool-logs` to be a boolean but given: {spool_logs} of "
+            f"type {type(spool_logs)}."
+        )
+
+    return spool_logs
+
+
 def _parse_grace_period(grace_period: Any) -> float | None:
     if grace_period is None:
         return None
@@ -613,6 +889,107 @@ def _parse_grace_period(grace_period: Any) -> float | None:
     return float(grace_period)
 
 
+def _parse_jobs(jobs_data: Any) -> int | None:
+    if jobs_data is None:
+        return None
+
+    if isinstance(jobs_data, bool) or not isinstance(jobs_data, (int, str)):
+        raise InvalidModelError(
+            f"Expected [tool.dev-cmd] `jobs` to be a positive integer or {jobs.AUTO!r} but given: "
+            f"{jobs_data} of type {type(jobs_data)}."
+        )
+
+    try:
+        return jobs.parse_jobs(jobs_data)
+    except ValueError:
+        raise InvalidModelError(
+            f"Expected [tool.dev-cmd] `jobs` to be a positive integer or {jobs.AUTO!r} but given: "
+            f"{jobs_data!r}."
+        )
+
+
+def _parse_admission(admission_data: Any) -> Admission | None:
+    if admission_data is None:
+        return None
+
+    data = _assert_dict_str_keys(admission_data, path="[tool.dev-cmd.admission]")
+    thresholds: dict[str, float | None] = {}
+    for key in ("cpu-pressure", "memory-pressure", "load"):
+        threshold = data.pop(key, None)
+        if threshold is not None and (
+            isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold < 0
+        ):
+            raise InvalidModelError(
+                f"Expected [tool.dev-cmd.admission] `{key}` to be a non-negative number but given: "
+                f"{threshold} of type {type(threshold)}."
+            )
+        thresholds[key] = None if threshold is None else float(threshold)
+
+    if data:
+        raise InvalidModelError(
+            f"Unexpected configuration keys in the [tool.dev-cmd.admission] table: {' '.join(data)}"
+        )
+    if all(threshold is None for threshold in thresholds.values()):
+        raise InvalidModelError(
+            "The [tool.dev-cmd.admission] table must define at least one of `cpu-pressure`, "
+            "`memory-pressure` or `load`."
+        )
+
+    return Admission(
+        cpu_pressure=thresholds["cpu-pressure"],
+        memory_pressure=thresholds["memory-pressure"],
+        load=thresholds["load"],
+    )
+
+
+def _parse_action_cache_max_size(max_size_data: Any) -> int | None:
+    if max_size_data is None:
+        return None
+
+    if isinstance(max_size_data, bool) or not isinstance(max_size_data, (int, str)):
+        raise InvalidModelError(
+            f"Expected [tool.dev-cmd] `action-cache-max-size` to be a number of bytes or a size "
+            f"string like '512MB' but given: {max_size_data} of type {type(max_size_data)}."
+        )
+
+    try:
+        return action_cache.parse_size(max_size_data)
+    except ValueError as e:
+        raise InvalidModelError(f"Invalid [tool.dev-cmd] `action-cache-max-size`: {e}")
+
+
+def _parse_venv_cache_max_size(max_size_data: Any) -> int | None:
+    if max_size_data is None:
+        return None
+
+    if isinstance(max_size_data, bool) or not isinstance(max_size_data, (int, str)):
+        raise InvalidModelError(
+            f"Expected [tool.dev-cmd] `venv-cache-max-size` to be a number of bytes or a size "
+            f"string like '10GB' but given: {max_size_data} of type {type(max_size_data)}."
+        )
+
+    try:
+        return action_cache.parse_size(max_size_data)
+    except ValueError as e:
+        raise InvalidModelError(f"Invalid [tool.dev-cmd] `venv-cache-max-size`: {e}")
+
+
+def _parse_venv_cache_max_count(max_count_data: Any) -> int | None:
+    if max_count_data is None:
+        return None
+
+    if (
+        isinstance(max_count_data, bool)
+        or not isinstance(max_count_data, int)
+        or max_count_data < 0
+    ):
+        raise InvalidModelError(
+            f"Expected [tool.dev-cmd] `venv-cache-max-count` to be a non-negative integer but "
+            f"given: {max_count_data} of type {type(max_count_data)}."
+        )
+    return max_count_data
+
+
 def _parse_python(
     index: int,
     python_config_data: dict[str, Any],
@@ -652,6 +1029,24 @@ def _parse_python(
             )
         pip_requirement = pip_requirement_data
 
+    installer = defaults.installer if defaults else Installer.PIP
+    installer_data = python_config_data.pop("installer", None)
+    if installer_data is not None:
+        if not isinstance(installer_data, str):
+            raise InvalidModelError(
+                f"[tool.dev-cmd] `python[{index}].installer` value must be a string, but given: "
+                f"{installer_data} of type {type(installer_data)}."
+            )
+        try:
+            installer = Installer(installer_data)
+        except ValueError:
+            raise InvalidModelError(
+                f"The [tool.dev-cmd] `python[{index}].installer` of {installer_data!r} is not "
+                f"recognized. Valid choices are "
+                f"{', '.join(repr(choice.value) for choice in list(Installer)[:-1])} and "
+                f"{list(Installer)[-1].value!r}."
+            )
+
     thirdparty_pip_install_opts = defaults.thirdparty_pip_install_opts if defaults else ()
     thirdparty_pip_install_opts_data = python_config_data.pop("3rdparty-pip-install-opts", None)
     if thirdparty_pip_install_opts_data:
@@ -826,13 +1221,12 @@ def _parse_python(
         extra_requirements=extra_requirements,
         extra_requirements_pip_install_opts=extra_requirements_pip_install_opts,
         finalize_command=finalize_command,
+        installer=installer,
     )
 
 
-def select_python_config(
-    python: Python, pythons: Iterable[PythonConfig], quiet: bool = False
-) -> PythonConfig | None:
-    marker_environment = venv.marker_environment(python, quiet=quiet)
+def select_python_config(python: Python, pythons: Iterable[PythonConfig]) -> PythonConfig | None:
+    marker_environment = venv.marker_environment(python)
     activated_index: int | None = None
     activated_python_config: PythonConfig | None = None
     for index, python_config in enumerate(pythons):
@@ -941,6 +1335,10 @@ def parse_dev_config(
     default_step_name = dev_cmd_data.pop("default", None)
 
     required_steps: defaultdict[str, list[tuple[Factor, ...]]] = defaultdict(list)
+    command_factor_names = {
+        (data.get("name", name) if isinstance(data, dict) else name): _factor_names(data)
+        for name, data in commands_data.items()
+    }
     known_names = tuple(
         data.get("name", name) if isinstance(data, dict) else name
         for name, data in itertools.chain(commands_data.items(), tasks_data.items())
@@ -957,31 +1355,8 @@ def parse_dev_config(
             if not required_step_name.startswith(f"{known_name}-"):
                 continue
 
-            factors: list[Factor] = []
-            factor_chars: list[str] = []
-            chars = deque(required_step_name[len(known_name) + 1 :])
-            while chars:
-                while chars:
-                    char = chars.popleft()
-
-                    if char != "-":
-                        factor_chars.append(char)
-                        continue
-
-                    # Escaped - (--)
-                    if chars and chars[0] == "-":
-                        factor_chars.append(char)
-                        chars.popleft()
-                        continue
-
-                    if not chars:
-                        factor_chars.append(char)
-
-                    break
-                factors.append(Factor("".join(factor_chars)))
-                factor_chars.clear()
-
-            required_steps[known_name].append(tuple(factors))
+            factors = split_factors(required_step_name[len(known_name) + 1 :])
+            required_steps[known_name].append(factors)
             requested_step_names[required_step_name] = (
                 f"{known_name}-{'-'.join(factors)}" if factors else known_name
             )
@@ -1009,9 +1384,27 @@ def parse_dev_config(
         task.name: task
         for task in _parse_tasks(tasks_data, commands, marker_environment=marker_environment)
     }
+    steps: tuple[Command | Task, ...] = tuple(
+        itertools.chain(
+            (cmd for cmd in commands.values() if isinstance(cmd, Command)), tasks.values()
+        )
+    )
+    step_names = StepNames(names=frozenset(known_names), command_factor_names=command_factor_names)
+    _validate_needs(steps, step_names)
     default = _parse_default(default_step_name, commands, tasks)
     exit_style = _parse_exit_style(dev_cmd_data.pop("exit-style", None))
+    output_style = _parse_output_style(dev_cmd_data.pop("output-style", None))
+    spool_logs = _parse_spool_logs(dev_cmd_data.pop("spool-logs", None))
     grace_period = _parse_grace_period(dev_cmd_data.pop("grace-period", None))
+    job_slots = _parse_jobs(dev_cmd_data.pop("jobs", None))
+    action_cache_max_size = _parse_action_cache_max_size(
+        dev_cmd_data.pop("action-cache-max-size", None)
+    )
+    venv_cache_max_size = _parse_venv_cache_max_size(dev_cmd_data.pop("venv-cache-max-size", None))
+    venv_cache_max_count = _parse_venv_cache_max_count(
+        dev_cmd_data.pop("venv-cache-max-count", None)
+    )
+    admission = _parse_admission(dev_cmd_data.pop("admission", None))
 
     if dev_cmd_data:
         raise InvalidModelError(
@@ -1023,8 +1416,16 @@ def parse_dev_config(
         tasks=tuple(tasks.values()),
         default=default,
         exit_style=exit_style,
+        output_style=output_style,
+        spool_logs=spool_logs,
         grace_period=grace_period,
+        jobs=job_slots,
+        action_cache_max_size=action_cache_max_size,
+        venv_cache_max_size=venv_cache_max_size,
+        venv_cache_max_count=venv_cache_max_count,
+        admission=admission,
         pythons=pythons,
+        step_names=step_names,
         source=pyproject_toml.path,
     )
 
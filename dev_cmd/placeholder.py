@@ -3,11 +3,10 @@
 
 from __future__ import annotations
 
+import functools
 import os
 from dataclasses import dataclass, field
-from typing import Callable, Iterable, Mapping, cast
-
-from packaging import markers
+from typing import Iterable, Mapping, cast
 
 from dev_cmd import brace_substitution
 from dev_cmd.brace_substitution import Substituter
@@ -53,12 +52,19 @@ class Substitution:
     substituted_sections: tuple[slice, ...] = field(default=(), compare=False, hash=False)
 
 
+@functools.lru_cache(maxsize=None)
+def _default_markers() -> Mapping[str, str]:
+    # N.B.: Importing `packaging.markers` is relatively slow; so we only do so when a `{markers.*}`
+    # placeholder is actually used.
+    from packaging import markers
+
+    return cast(Mapping[str, str], markers.default_environment())
+
+
 @dataclass(frozen=True)
 class Environment(Substituter[State, str]):
     env: Mapping[str, str] = field(default_factory=os.environ.copy)
-    markers: Mapping[str, str] = field(
-        default_factory=cast(Callable[[], Mapping[str, str]], markers.default_environment)
-    )
+    markers: Mapping[str, str] | None = None
     hashseed: int = 0
 
     def substitute(self, text: str, *factors: Factor) -> Substitution:
@@ -148,7 +154,9 @@ class Environment(Substituter[State, str]):
         elif key.startswith("markers."):
             marker_name = self.substitute(key[8:]).value
             try:
-                value = self.markers[marker_name] or default
+                value = (self.markers if self.markers is not None else _default_markers())[
+                    marker_name
+                ] or default
             except KeyError:
                 raise ValueError(f"There is no Python environment marker named {marker_name!r}.")
             if value is None:
@@ -0,0 +1,74 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import functools
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from dev_cmd import jobs
+from dev_cmd.model import Admission
+
+POLL_INTERVAL = 0.5
+
+
+def psi(resource: str, proc_root: Path = Path("/proc")) -> float | None:
+    # N.B.: See https://docs.kernel.org/accounting/psi.html; we use the share of the last 10
+    # seconds in which some task was stalled on the resource.
+    try:
+        text = (proc_root / "pressure" / resource).read_text()
+    except OSError:
+        return None
+    for line in text.splitlines():
+        kind, *fields = line.split()
+        if kind != "some":
+            continue
+        for item in fields:
+            key, _, value = item.partition("=")
+            if key == "avg10":
+                try:
+                    return float(value)
+                except ValueError:
+                    return None
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _cpu_count() -> int:
+    return jobs.available_cpu_count()
+
+
+def load_per_cpu() -> float | None:
+    try:
+        load, _, _ = os.getloadavg()
+    except (AttributeError, OSError):
+        return None
+    return load / _cpu_count()
+
+
+@dataclass(frozen=True)
+class Sample:
+    @classmethod
+    def take(cls, proc_root: Path = Path("/proc")) -> Sample:
+        return cls(
+            cpu_pressure=psi("cpu", proc_root=proc_root),
+            memory_pressure=psi("memory", proc_root=proc_root),
+            load=load_per_cpu(),
+        )
+
+    cpu_pressure: float | None
+    memory_pressure: float | None
+    load: float | None
+
+    def exceeded(self, admission: Admission) -> list[str]:
+        exceeded: list[str] = []
+        for name, value, threshold, unit in (
+            ("cpu pressure", self.cpu_pressure, admission.cpu_pressure, "%"),
+            ("memory pressure", self.memory_pressure, admission.memory_pressure, "%"),
+            ("load per cpu", self.load, admission.load, ""),
+        ):
+            if value is not None and threshold is not None and value > threshold:
+                exceeded.append(f"{name} {value:.2f}{unit} > {threshold:.2f}{unit}")
+        return exceeded
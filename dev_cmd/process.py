@@ -0,0 +1,128 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import subprocess
+import threading
+from typing import Mapping, Sequence
+
+from dev_cmd.model import Rusage
+
+PIPE = subprocess.PIPE
+STDOUT = subprocess.STDOUT
+
+
+class Process:
+    """A child process whose resource usage is captured when it is reaped.
+
+    Where `os.wait4` is available, the child is reaped by a dedicated thread, like asyncio's own
+    threaded child watcher does, but with the child's resource usage collected in the same call.
+    Elsewhere, this just wraps an asyncio subprocess and no resource usage is reported.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        stdout: asyncio.StreamReader | None,
+        popen: subprocess.Popen[bytes] | None = None,
+        process: asyncio.subprocess.Process | None = None,
+    ) -> None:
+        self.pid = pid
+        self.stdout = stdout
+        self.returncode: int | None = None
+        self.rusage: Rusage | None = None
+        self._popen = popen
+        self._process = process
+        self._exited: asyncio.Future[tuple[int, Rusage | None]] | None = None
+        self._reaped = threading.Lock()
+        if popen is not None:
+            loop = asyncio.get_running_loop()
+            exited = self._exited = loop.create_future()
+
+            def reap() -> None:
+                # N.B.: We never call `Popen.poll` or `Popen.wait` since those would race this
+                # thread to reap the child. We also wait for the child to exit without reaping it
+                # first, when we can, so that the child is only reaped under the lock `_signal`
+                # holds; otherwise its pid could be recycled out from under a signal.
+                if hasattr(os, "waitid"):
+                    os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+                with self._reaped:
+                    _, status, rusage = os.wait4(pid, 0)
+                    returncode = os.waitstatus_to_exitcode(status)
+                    popen.returncode = returncode
+                try:
+                    loop.call_soon_threadsafe(
+                        exited.set_result, (returncode, Rusage.from_struct(rusage))
+                    )
+                except RuntimeError:
+                    # The event loop was closed out from under us; i.e.: on Ctrl-C.
+                    pass
+
+            threading.Thread(target=reap, name=f"reap-{pid}", daemon=True).start()
+
+    def _signal(self, signum: int) -> None:
+        if self._process is not None:
+            self._process.send_signal(signum)
+            return
+        assert self._popen is not None
+        with self._reaped:
+            if self._popen.returncode is not None:
+                return
+            try:
+                os.kill(self.pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+        else:
+            self._signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+        else:
+            self._signal(signal.SIGKILL)
+
+    async def wait(self) -> int:
+        if self._process is not None:
+            returncode = await self._process.wait()
+        else:
+            assert self._exited is not None
+            returncode, self.rusage = await asyncio.shield(self._exited)
+        self.returncode = returncode
+        return returncode
+
+    async def communicate(self) -> bytes | None:
+        output = await self.stdout.read() if self.stdout else None
+        await self.wait()
+        return output
+
+
+async def spawn(
+    args: Sequence[str],
+    cwd: str | os.PathLike[str] | None = None,
+    env: Mapping[str, str] | None = None,
+    stdout: int | None = None,
+    stderr: int | None = None,
+) -> Process:
+    if not hasattr(os, "wait4"):
+        process = await asyncio.create_subprocess_exec(
+            args[0], *args[1:], cwd=cwd, env=env, stdout=stdout, stderr=stderr
+        )
+        return Process(pid=process.pid, stdout=process.stdout, process=process)
+
+    popen = subprocess.Popen(args, cwd=cwd, env=env, stdout=stdout, stderr=stderr)
+    if popen.stdout is None:
+        return Process(pid=popen.pid, stdout=None, popen=popen)
+
+    reader = asyncio.StreamReader()
+    await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), popen.stdout
+    )
+    return Process(pid=popen.pid, stdout=reader, popen=popen)
@@ -3,11 +3,13 @@
 
 from __future__ import annotations
 
+import copy
 import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from dev_cmd import memo
 from dev_cmd.errors import InvalidProjectError
 
 try:
@@ -25,6 +27,16 @@ class PyProjectToml:
     path: Path
 
     def parse(self) -> dict[str, Any]:
+        # N.B.: Callers consume the parsed data destructively; so each gets its own copy.
+        return copy.deepcopy(
+            memo.memoize(
+                key=("pyproject", str(self.path)),
+                stamp=memo.stat_stamp([self.path]),
+                compute=self._parse,
+            )
+        )
+
+    def _parse(self) -> dict[str, Any]:
         try:
             with self.path.open("rb") as fp:
                 return toml.load(fp)
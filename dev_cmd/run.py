@@ -3,32 +3,45 @@
 
 from __future__ import annotations
 
-import asyncio
 import dataclasses
-import functools
 import itertools
+import math
 import os
 import sys
 import time
-from argparse import ArgumentParser
-from asyncio import CancelledError
+from argparse import ArgumentParser, ArgumentTypeError
 from collections import defaultdict
 from dataclasses import dataclass
-from multiprocessing.pool import ThreadPool
-from typing import Any, Collection, DefaultDict, Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Coroutine,
+    DefaultDict,
+    Iterable,
+    Iterator,
+    Mapping,
+)
 from uuid import uuid4
 
-from dev_cmd import __version__, color, parse, venv
+from dev_cmd import __version__, color, jobs, parse, trace, venv
+from dev_cmd.action_cache import DEFAULT_MAX_SIZE as DEFAULT_ACTION_CACHE_MAX_SIZE
+from dev_cmd.action_cache import ActionCache
 from dev_cmd.color import ColorChoice
 from dev_cmd.console import Console
+from dev_cmd.durations import Durations
 from dev_cmd.errors import DevCmdError, ExecutionError, InvalidArgumentError
 from dev_cmd.expansion import expand
-from dev_cmd.invoke import Invocation
+from dev_cmd.history import History, Kind, new_run_id
+from dev_cmd.logs import DEFAULT_KEEP_RUNS, Logs
 from dev_cmd.model import (
     Command,
     Configuration,
     ExitStyle,
     Group,
+    OutputStyle,
     Python,
     PythonConfig,
     Task,
@@ -38,9 +51,17 @@ from dev_cmd.model import (
 from dev_cmd.parse import parse_dev_config
 from dev_cmd.placeholder import Environment
 from dev_cmd.project import find_pyproject_toml
+from dev_cmd.venv import DEFAULT_MAX_SIZE as DEFAULT_VENV_CACHE_MAX_SIZE
+
+# N.B.: Running commands needs asyncio and the rest of the execution machinery, but `--list`,
+# `--report`, `--version` and `--help` do not; so these are imported only when commands are run.
+if TYPE_CHECKING:
+    from dev_cmd.invoke import Invocation
 
 DEFAULT_EXIT_STYLE = ExitStyle.AFTER_STEP
 DEFAULT_GRACE_PERIOD = 5.0
+DEFAULT_OUTPUT_STYLE = OutputStyle.BUFFERED
+DEFAULT_REPORT_RUNS = 10
 
 
 def _iter_commands(
@@ -60,9 +81,13 @@ def _iter_commands(
                 yield command
 
 
-def _ensure_venvs(
-    steps: Iterable[Command | Task], pythons_configs: Iterable[PythonConfig]
+async def _ensure_venvs(
+    steps: Iterable[Command | Task],
+    pythons_configs: Iterable[PythonConfig],
+    job_slots: int | None = None,
 ) -> Mapping[VenvConfig, Venv]:
+    import asyncio
+
     venv_configs_to_requesting_commands: DefaultDict[VenvConfig, list[Command]] = defaultdict(list)
     for command in _iter_commands(steps):
         if command.python:
@@ -87,9 +112,17 @@ def _ensure_venvs(
             f"{missing_pythons}"
         )
 
-    def ensure_venv(venv_config: VenvConfig, *, quiet: bool) -> Venv:
+    # N.B.: Venvs are built concurrently, but building one is heavy on the network, disk and CPU; so
+    # we only build as many at once as we run commands at once.
+    venv_slots = asyncio.Semaphore(job_slots or jobs.available_cpu_count())
+
+    async def ensure_venv(venv_config: VenvConfig, *, quiet: bool, track: str) -> Venv:
         requesting_commands = venv_configs_to_requesting_commands[venv_config]
-        python_config = parse.select_python_config(venv_config.python, pythons_configs, quiet=quiet)
+        # N.B.: Selecting a Python config may need to probe the Python's marker environment which
+        # blocks.
+        python_config = await asyncio.to_thread(
+            parse.select_python_config, venv_config.python, pythons_configs
+        )
         if not python_config:
             commands = "\n".join(f"+ {rc.name}" for rc in requesting_commands)
             raise InvalidArgumentError(
@@ -97,19 +130,41 @@ def _ensure_venvs(
                 f"none of the configured `[[tool.dev-cmd.python]]` entries apply:\n"
                 f"{commands}"
             )
-        return venv.ensure(venv_config=venv_config, python_config=python_config, quiet=quiet)
-
-    if len(venv_configs_to_requesting_commands) == 1:
-        venv_config, requesting_commands = venv_configs_to_requesting_commands.popitem()
-        return {venv_config: ensure_venv(venv_config, quiet=False)}
+        async with venv_slots:
+            with trace.span(f"venv {venv_config.python}", "venv", track=track):
+                return await venv.ensure(
+                    venv_config=venv_config, python_config=python_config, quiet=quiet, track=track
+                )
 
-    pool = ThreadPool()
+    # N.B.: The output of a single venv build is shown as it happens, but the output of concurrent
+    # builds would be interleaved; so it is only shown for builds that fail.
+    quiet = len(venv_configs_to_requesting_commands) > 1
+    pythons = list(venv_configs_to_requesting_commands)
+    tasks = [
+        asyncio.ensure_future(ensure_venv(venv_config, quiet=quiet, track=f"venv {index}"))
+        for index, venv_config in enumerate(pythons, start=1)
+    ]
     try:
-        pythons = list(venv_configs_to_requesting_commands)
-        return dict(zip(pythons, pool.map(functools.partial(ensure_venv, quiet=True), pythons)))
-    finally:
-        pool.close()
-        pool.join()
+        return dict(zip(pythons, await asyncio.gather(*tasks)))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def _gc(console: Console, config: Configuration) -> Any:
+    for cached_venv in venv.gc(
+        max_size=config.venv_cache_max_size or DEFAULT_VENV_CACHE_MAX_SIZE,
+        max_count=config.venv_cache_max_count,
+    ):
+        console.print(
+            color.color(
+                f"Evicted venv at {cached_venv.dir} ({cached_venv.size / 1024**2:.1f}MB).",
+                fg="gray",
+            ),
+            file=sys.stderr,
+        )
+    return None
 
 
 def _run(
@@ -122,8 +177,34 @@ def _run(
     extra_args: tuple[str, ...] = (),
     exit_style_override: ExitStyle | None = None,
     grace_period_override: float | None = None,
+    timeout_override: float | None = None,
+    jobs_override: int | None = None,
+    output_style_override: OutputStyle | None = None,
+    spool_logs: bool = False,
+    force: bool = False,
+    watch_changes: bool = False,
 ) -> None:
+    import asyncio
+
+    from dev_cmd.invoke import Invocation
+
     grace_period = grace_period_override or config.grace_period or DEFAULT_GRACE_PERIOD
+    job_slots = jobs_override or config.jobs
+    output_style = output_style_override or config.output_style or DEFAULT_OUTPUT_STYLE
+    action_cache_max_size = (
+        DEFAULT_ACTION_CACHE_MAX_SIZE
+        if config.action_cache_max_size is None
+        else config.action_cache_max_size
+    )
+    action_cache = (
+        ActionCache.create(max_size=action_cache_max_size)
+        if any(cmd.cache for cmd in config.commands)
+        else None
+    )
+    durations = Durations.load()
+    run_id = new_run_id()
+    history = History.create(run_id)
+    logs = Logs.create(run_id) if spool_logs or config.spool_logs else None
 
     available_cmds = {cmd.name: cmd for cmd in config.commands}
     available_tasks = {task.name: task for task in config.tasks}
@@ -150,6 +231,16 @@ def _run(
                 extra_args=extra_args,
                 timings=timings,
                 console=console,
+                jobs=job_slots,
+                output_style=output_style,
+                force=force,
+                action_cache=action_cache,
+                durations=durations,
+                history=history,
+                admission=config.admission,
+                timeout=timeout_override,
+                logs=logs,
+                known_names=config.step_names,
             )
         except KeyError as e:
             print(e, file=sys.stderr)
@@ -171,6 +262,16 @@ def _run(
             extra_args=extra_args,
             timings=timings,
             console=console,
+            jobs=job_slots,
+            output_style=output_style,
+            force=force,
+            action_cache=action_cache,
+            durations=durations,
+            history=history,
+            admission=config.admission,
+            timeout=timeout_override,
+            logs=logs,
+            known_names=config.step_names,
         )
     else:
         raise InvalidArgumentError(
@@ -189,16 +290,95 @@ def _run(
             "All steps in this invocation of `dev-cmd` were deactivated by `when` markers leaving "
             "nothing to run."
         )
-    invocation = dataclasses.replace(
-        invocation, venvs=_ensure_venvs(invocation.steps, config.pythons)
-    )
-
+    use_dag = invocation.has_needs(parallel=parallel)
     exit_style = exit_style_override or config.exit_style or DEFAULT_EXIT_STYLE
-    return asyncio.run(
-        invocation.invoke_parallel(*extra_args, exit_style=exit_style)
-        if parallel
-        else invocation.invoke(*extra_args, exit_style=exit_style)
+
+    def invoke(invocation: Invocation) -> Coroutine[Any, Any, None]:
+        if use_dag:
+            return invocation.invoke_dag(*extra_args, parallel=parallel, exit_style=exit_style)
+        if parallel:
+            return invocation.invoke_parallel(*extra_args, exit_style=exit_style)
+        return invocation.invoke(*extra_args, exit_style=exit_style)
+
+    async def run(invocation: Invocation) -> None:
+        # N.B.: Venvs are provisioned on the same event loop that then runs the commands.
+        with trace.span("ensure venvs", "venv"):
+            venvs = await _ensure_venvs(invocation.steps, config.pythons, job_slots=job_slots)
+        if venvs:
+            # N.B.: The venvs this run uses are marked in use; so they are never evicted.
+            with trace.span("gc venvs", "venv"):
+                await asyncio.to_thread(_gc, console, config)
+        invocation = dataclasses.replace(invocation, venvs=venvs)
+        if watch_changes:
+            project_dir = config.source.parent if isinstance(config.source, Path) else Path.cwd()
+            await _watch(invocation, invoke, project_dir, durations)
+        else:
+            await invoke(invocation)
+
+    try:
+        asyncio.run(run(invocation))
+    finally:
+        durations.save()
+
+
+def _execution_error_message(error: ExecutionError) -> str:
+    prefix = f"{color.red('dev-cmd')} {color.color(error.step_name, fg='red', style='bold')}"
+    return f"{prefix}] {color.red(error.message)}"
+
+
+async def _watch(
+    invocation: Invocation,
+    invoke: Callable[[Invocation], Coroutine[Any, Any, None]],
+    project_dir: Path,
+    durations: Durations,
+) -> None:
+    import asyncio
+    from asyncio import CancelledError
+
+    from dev_cmd import watch
+
+    console = invocation.console
+    commands = tuple(invocation.iter_commands())
+    watcher = watch.Watcher.create(
+        watch.roots(commands, project_dir), relevant=watch.input_matcher(commands)
     )
+    try:
+        while True:
+            # N.B.: Each run starts from a fresh copy of the invocation so that commands that ran
+            # before can run again, but the venvs it holds are carried over. Commands that declare
+            # their inputs are skipped when those inputs are unchanged by their up to date checks.
+            run = asyncio.ensure_future(invoke(dataclasses.replace(invocation)))
+            changes = asyncio.ensure_future(watcher.wait())
+            await asyncio.wait((run, changes), return_when=asyncio.FIRST_COMPLETED)
+            stale = not run.done()
+            if stale:
+                run.cancel()
+            try:
+                await run
+                console.print(
+                    f"{color.cyan('dev-cmd')}] {color.color('Success', fg='green', style='bold')}",
+                    file=sys.stderr,
+                )
+            except ExecutionError as e:
+                console.print(_execution_error_message(e), file=sys.stderr)
+            except CancelledError:
+                if not stale:
+                    raise
+            durations.save()
+
+            if not changes.done():
+                message = "Watching for changes (Ctrl-C to exit)..."
+                console.print(
+                    f"{color.cyan('dev-cmd')}] {color.color(message, fg='gray')}", file=sys.stderr
+                )
+            changed = await changes
+            message = (
+                f"Re-running after changes to {len(changed)} "
+                f"{'path' if len(changed) == 1 else 'paths'}..."
+            )
+            console.print(f"{color.cyan('dev-cmd')}] {color.magenta(message)}", file=sys.stderr)
+    finally:
+        watcher.close()
 
 
 @dataclass(frozen=True)
@@ -214,6 +394,44 @@ class Options:
     python: str | None = None
     exit_style: ExitStyle | None = None
     grace_period: float | None = None
+    timeout: float | None = None
+    jobs: int | None = None
+    output_style: OutputStyle | None = None
+    spool_logs: bool = False
+    force: bool = False
+    watch: bool = False
+    report: int | None = None
+    gc: bool = False
+    trace: str | None = None
+
+
+def _timeout(value: str) -> float:
+    try:
+        timeout = float(value)
+    except ValueError:
+        timeout = 0.0
+    if timeout <= 0:
+        raise ArgumentTypeError(f"Expected a positive number of seconds but given: {value!r}.")
+    return timeout
+
+
+def _jobs(value: str) -> int:
+    try:
+        return jobs.parse_jobs(value)
+    except ValueError:
+        raise ArgumentTypeError(
+            f"Expected a positive integer or {jobs.AUTO!r} but given: {value!r}."
+        )
+
+
+def _report_runs(value: str) -> int:
+    try:
+        runs = int(value)
+    except ValueError:
+        runs = 0
+    if runs < 1:
+        raise ArgumentTypeError(f"Expected a positive number of runs but given: {value!r}.")
+    return runs
 
 
 def _random_hashseed() -> int:
@@ -236,6 +454,36 @@ def _parse_args() -> Options:
         action="store_true",
         help="List the commands and tasks that can be run.",
     )
+    parser.add_argument(
+        "--report",
+        default=False,
+        action="store_true",
+        help=(
+            "Report the p50, p95 and max durations of the commands and tasks recorded in past "
+            "runs along with the trend of their durations over their most recent runs. If any "
+            "cmd|task names are passed, only those are reported."
+        ),
+    )
+    parser.add_argument(
+        "--report-runs",
+        type=_report_runs,
+        default=DEFAULT_REPORT_RUNS,
+        metavar="RUNS",
+        help=(
+            f"The number of most recent runs to show the `--report` trend for; "
+            f"{DEFAULT_REPORT_RUNS} by default."
+        ),
+    )
+    parser.add_argument(
+        "--gc",
+        default=False,
+        action="store_true",
+        help=(
+            "Evict the least recently used custom Python venvs until the remaining venvs fit the "
+            "[tool.dev-cmd] `venv-cache-max-size` and `venv-cache-max-count` budgets. Venvs in use "
+            "by other `dev-cmd` runs are never evicted."
+        ),
+    )
     parser.add_argument(
         "-q",
         "--quiet",
@@ -271,6 +519,25 @@ def _parse_args() -> Options:
         action="store_true",
         help="Emit timing information for each command run.",
     )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help=(
+            "Run commands that declare `inputs` even if they are up to date with respect to their "
+            "last successful run."
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running, re-running the requested commands and tasks whenever files they depend "
+            "on change. Commands that declare `inputs` are only re-run when those inputs change; "
+            "other commands are re-run when any file in the project changes. A run in progress "
+            "when further changes are made is cancelled and started over."
+        ),
+    )
     parser.add_argument(
         "--hashseed",
         type=int,
@@ -278,7 +545,7 @@ def _parse_args() -> Options:
         help="Set the {--hashseed} command placeholder value.",
     )
 
-    if venv.AVAILABLE:
+    if venv.available():
         parser.add_argument(
             "--py",
             "--python",
@@ -334,6 +601,61 @@ def _parse_args() -> Options:
             f"{ExitStyle.AFTER_STEP.value!r} or {ExitStyle.IMMEDIATE.value!r}."
         ),
     )
+    parser.add_argument(
+        "--timeout",
+        type=_timeout,
+        default=None,
+        help=(
+            "The amount of time in fractional seconds to let each command run before terminating "
+            "it and failing it as timed out. This overrides any `timeout` configured for commands "
+            "and tasks."
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_jobs,
+        default=None,
+        help=(
+            "The maximum number of commands to run concurrently. Commands in parallel groups that "
+            "would exceed this limit wait for a running command to finish before starting. Pass "
+            f"{jobs.AUTO!r} to use the number of CPUs available to `dev-cmd`, accounting for CPU "
+            "affinity and cgroup CPU quotas. By default, the [tool.dev-cmd] `jobs` setting is "
+            "used if configured; otherwise, there is no limit."
+        ),
+    )
+    parser.add_argument(
+        "--output-style",
+        type=OutputStyle,
+        choices=list(OutputStyle),
+        default=None,
+        help=(
+            "How to display the output of commands run in parallel. By default, each command's "
+            f"output is {OutputStyle.BUFFERED.value!r} and displayed all at once when the command "
+            f"completes. With {OutputStyle.STREAMED.value!r}, output is displayed line by line as "
+            "it is produced with each line prefixed by the name of the command that produced it."
+        ),
+    )
+    parser.add_argument(
+        "--spool-logs",
+        action="store_true",
+        help=(
+            "Buffer the output of commands run in parallel with the "
+            f"{OutputStyle.BUFFERED.value!r} output style in per-command log files under "
+            "`.dev-cmd/logs/<run id>/` instead of in memory. The logs of the last "
+            f"{DEFAULT_KEEP_RUNS} runs are kept. By default, the [tool.dev-cmd] `spool-logs` "
+            "setting is used if configured."
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        default=None,
+        help=(
+            "Write a timeline of this run to FILE in the Chrome trace event format. The trace "
+            "can be viewed with https://ui.perfetto.dev or chrome://tracing."
+        ),
+    )
     parser.add_argument(
         "--color",
         type=ColorChoice,
@@ -392,6 +714,15 @@ def _parse_args() -> Options:
         python=getattr(options, "python", None),
         exit_style=options.exit_style,
         grace_period=options.grace_period,
+        timeout=options.timeout,
+        jobs=options.jobs,
+        output_style=options.output_style,
+        spool_logs=options.spool_logs,
+        force=options.force,
+        watch=options.watch,
+        report=options.report_runs if options.report else None,
+        gc=options.gc,
+        trace=options.trace,
     )
 
 
@@ -487,36 +818,140 @@ def _list(
                 console.print(rendered_task_name)
 
 
+_SPARKS = "▁▂▃▄▅▆▇█"
+
+
+def _sparkline(durations: Iterable[float]) -> str:
+    values = tuple(durations)
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    scale = (len(_SPARKS) - 1) / (high - low) if high > low else 0
+    return "".join(_SPARKS[round((value - low) * scale)] for value in values)
+
+
+def _format_duration(duration: float) -> str:
+    return "-" if math.isnan(duration) else f"{duration:.3f}s"
+
+
+def _report(
+    console: Console, history: History, trend_runs: int, names: Collection[str] = ()
+) -> Any:
+    summaries = history.summarize(trend_runs=trend_runs, names=names)
+    if not summaries:
+        console.print(color.yellow(f"There is no timing history recorded in {history.path} yet."))
+        return None
+
+    header = ("", "runs", "failed", "p50", "p95", "max", f"last {trend_runs}")
+    for kind, title in ((Kind.COMMAND, "Commands"), (Kind.TASK, "Tasks")):
+        rows = [
+            (
+                summary.name,
+                str(summary.runs),
+                str(summary.failures),
+                _format_duration(summary.p50),
+                _format_duration(summary.p95),
+                _format_duration(summary.max),
+                _sparkline(summary.trend),
+            )
+            for summary in sorted(summaries, key=lambda s: s.name)
+            if summary.kind is kind
+        ]
+        if not rows:
+            continue
+        widths = [max(len(row[index]) for row in (header, *rows)) for index in range(len(header))]
+        console.print(f"{color.cyan(title)}:")
+        console.print(
+            color.color(
+                "  ".join(
+                    cell.ljust(width) if index == 0 else cell.rjust(width)
+                    for index, (cell, width) in enumerate(zip(header, widths))
+                ).rstrip(),
+                fg="gray",
+            )
+        )
+        for row in rows:
+            name, *stats, trend = row
+            cells = [
+                color.color(name.ljust(widths[0]), fg="magenta", style="bold"),
+                *(cell.rjust(width) for cell, width in zip(stats, widths[1:-1])),
+                trend,
+            ]
+            console.print("  ".join(cells).rstrip())
+        console.print()
+
+    slowest = sorted(
+        (
+            summary
+            for summary in summaries
+            if summary.kind is Kind.COMMAND and not math.isnan(summary.p50)
+        ),
+        key=lambda summary: summary.p50,
+        reverse=True,
+    )[:5]
+    if slowest:
+        console.print(f"{color.cyan('Slowest commands')}:")
+        for summary in slowest:
+            console.print(
+                f"{color.color(summary.name, fg='magenta', style='bold')} "
+                f"{color.color(f'p50 {_format_duration(summary.p50)}', fg='gray')}"
+            )
+    return None
+
+
 def main() -> Any:
     start = time.time()
     options = _parse_args()
+    if options.trace:
+        origin = trace.process_start_time() or start
+        trace.enable(origin=origin)
+        trace.complete("startup", "dev-cmd", origin, time.time())
     console = Console(quiet=options.quiet)
     python = Python(options.python) if options.python else None
     placeholder_env = Environment(hashseed=options.hashseed)
     try:
-        pyproject_toml = find_pyproject_toml()
-        config, steps = parse_dev_config(
-            pyproject_toml, *options.steps, placeholder_env=placeholder_env, requested_python=python
-        )
+        with trace.span("parse config", "dev-cmd"):
+            pyproject_toml = find_pyproject_toml()
+            config, steps = parse_dev_config(
+                pyproject_toml,
+                *options.steps,
+                placeholder_env=placeholder_env,
+                requested_python=python,
+            )
     except DevCmdError as e:
         return 1 if console.quiet else f"{color.red('Configuration error')}: {color.yellow(str(e))}"
 
     if options.list:
         return _list(console, config, placeholder_env)
 
+    if options.report is not None:
+        return _report(console, History.create(), trend_runs=options.report, names=options.steps)
+
+    if options.gc:
+        return _gc(console, config)
+
+    from asyncio import CancelledError
+
     success = False
     try:
-        _run(
-            config,
-            *steps,
-            skips=options.skips,
-            console=console,
-            parallel=options.parallel,
-            timings=options.timings,
-            extra_args=options.extra_args,
-            exit_style_override=options.exit_style,
-            grace_period_override=options.grace_period,
-        )
+        with trace.span("run", "dev-cmd"):
+            _run(
+                config,
+                *steps,
+                skips=options.skips,
+                console=console,
+                parallel=options.parallel,
+                timings=options.timings,
+                extra_args=options.extra_args,
+                exit_style_override=options.exit_style,
+                grace_period_override=options.grace_period,
+                timeout_override=options.timeout,
+                jobs_override=options.jobs,
+                output_style_override=options.output_style,
+                spool_logs=options.spool_logs,
+                force=options.force,
+                watch_changes=options.watch,
+            )
         success = True
     except DevCmdError as e:
         if console.quiet:
@@ -529,13 +964,14 @@ def main() -> Any:
     except ExecutionError as e:
         if console.quiet:
             return e.exit_code
-        prefix = f"{color.red('dev-cmd')} {color.color(e.step_name, fg='red', style='bold')}"
-        return f"{prefix}] {color.red(e.message)}"
+        return _execution_error_message(e)
     except (CancelledError, KeyboardInterrupt):
         if console.quiet:
             return 1
         return f"{color.red('dev-cmd')}] {color.color('Cancelled', fg='red', style='bold')}"
     finally:
+        if options.trace:
+            trace.write(options.trace)
         if not console.quiet:
             summary_color = "green" if success else "red"
             status = color.color(
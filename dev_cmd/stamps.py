@@ -0,0 +1,94 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from dev_cmd import cache
+from dev_cmd.model import Command
+
+
+def _iter_files(globs: Iterable[str], exclude_dir: str) -> Iterable[str]:
+    for pattern in globs:
+        for match in glob.glob(pattern, recursive=True):
+            if os.path.isfile(match):
+                yield match
+            elif os.path.isdir(match):
+                for root, dirs, files in os.walk(match):
+                    dirs[:] = [
+                        d for d in dirs if os.path.abspath(os.path.join(root, d)) != exclude_dir
+                    ]
+                    for f in files:
+                        yield os.path.join(root, f)
+
+
+def fingerprint_files(globs: Iterable[str]) -> dict[str, str]:
+    # N.B.: The cache dir is excluded since it holds the stamps themselves.
+    exclude_dir = str(cache.ensure_cache_dir())
+    return {
+        Path(path).as_posix(): cache.fingerprint_file(path)
+        for path in sorted(frozenset(_iter_files(globs, exclude_dir)))
+        if not os.path.abspath(path).startswith(exclude_dir + os.sep)
+    }
+
+
+@dataclass(frozen=True)
+class Stamp:
+    @classmethod
+    def calculate(cls, command: Command, args: Sequence[str], python: str) -> Stamp | None:
+        if not command.inputs:
+            return None
+
+        fingerprint = cache.fingerprint(
+            json.dumps(
+                {
+                    "args": list(args),
+                    "extra-env": dict(command.extra_env),
+                    "cwd": str(command.cwd) if command.cwd else None,
+                    "python": python,
+                    "inputs": {
+                        "paths": fingerprint_files(command.inputs.paths),
+                        "env": {env: os.environ.get(env) for env in command.inputs.envs},
+                    },
+                },
+                sort_keys=True,
+            ).encode()
+        )
+        path = (
+            cache.ensure_cache_dir() / "stamps" / f"{cache.fingerprint(command.name.encode())}.json"
+        )
+        return cls(path=path, fingerprint=fingerprint, outputs=command.outputs)
+
+    path: Path
+    fingerprint: str
+    outputs: tuple[str, ...]
+
+    def is_up_to_date(self) -> bool:
+        try:
+            with self.path.open() as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return False
+        return self.fingerprint == data.get("fingerprint") and fingerprint_files(
+            self.outputs
+        ) == data.get("outputs")
+
+    def record(self) -> None:
+        cache.atomic_write(
+            self.path,
+            json.dumps(
+                {"fingerprint": self.fingerprint, "outputs": fingerprint_files(self.outputs)}
+            ).encode(),
+        )
+
+    def invalidate(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
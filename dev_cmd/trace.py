@@ -0,0 +1,169 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from dev_cmd import cache
+
+# N.B.: Events are recorded in the Chrome trace event format which Perfetto and chrome://tracing
+# can both load. See:
+#   https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+
+
+def process_start_time() -> float | None:
+    try:
+        with open("/proc/self/stat") as fp:
+            # N.B.: The command name field can contain spaces; so we split after its closing paren.
+            fields = fp.read().rsplit(")", 1)[1].split()
+        # N.B.: The boot time in /proc/stat only has 1 second resolution; so we work back from the
+        # current uptime instead.
+        with open("/proc/uptime") as fp:
+            uptime = float(fp.read().split()[0])
+        now = time.time()
+        return now - uptime + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+@dataclass
+class _Tracer:
+    origin: float
+    events: list[dict[str, Any]] = field(default_factory=list)
+    tracks: dict[str, int] = field(default_factory=dict)
+    thread_tracks: dict[int, str] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def track_id(self, track: str) -> int:
+        with self.lock:
+            tid = self.tracks.get(track)
+            if tid is None:
+                tid = self.tracks[track] = len(self.tracks) + 1
+                self.events.append(
+                    {
+                        "ph": "M",
+                        "name": "thread_name",
+                        "pid": 1,
+                        "tid": tid,
+                        "args": {"name": track},
+                    }
+                )
+                self.events.append(
+                    {
+                        "ph": "M",
+                        "name": "thread_sort_index",
+                        "pid": 1,
+                        "tid": tid,
+                        "args": {"sort_index": tid},
+                    }
+                )
+            return tid
+
+    def thread_track(self) -> str:
+        thread = threading.current_thread()
+        if thread is threading.main_thread():
+            return "dev-cmd"
+        with self.lock:
+            track = self.thread_tracks.get(thread.ident or 0)
+            if track is None:
+                track = self.thread_tracks[thread.ident or 0] = (
+                    f"worker {len(self.thread_tracks) + 1}"
+                )
+            return track
+
+
+_TRACER: _Tracer | None = None
+
+
+def enable(origin: float) -> None:
+    global _TRACER
+    _TRACER = _Tracer(origin=origin)
+
+
+def enabled() -> bool:
+    return _TRACER is not None
+
+
+def complete(
+    name: str,
+    category: str,
+    start: float,
+    end: float,
+    track: str | None = None,
+    **args: Any,
+) -> None:
+    tracer = _TRACER
+    if tracer is None:
+        return
+    event: dict[str, Any] = {
+        "ph": "X",
+        "name": name,
+        "cat": category,
+        "pid": 1,
+        "tid": tracer.track_id(track or tracer.thread_track()),
+        "ts": round((start - tracer.origin) * 1_000_000),
+        "dur": round((end - start) * 1_000_000),
+    }
+    if args:
+        event["args"] = args
+    with tracer.lock:
+        tracer.events.append(event)
+
+
+@contextmanager
+def span(name: str, category: str, track: str | None = None, **args: Any) -> Iterator[None]:
+    if _TRACER is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        complete(name, category, start, time.time(), track=track, **args)
+
+
+@dataclass
+class Lanes:
+    """Hands out the lowest numbered free track to each concurrently running span."""
+
+    name: str
+    _free: list[int] = field(default_factory=list, init=False)
+    _count: int = field(default=0, init=False)
+
+    def acquire(self) -> int:
+        if self._free:
+            return heapq.heappop(self._free)
+        self._count += 1
+        return self._count
+
+    def release(self, lane: int) -> None:
+        heapq.heappush(self._free, lane)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[None]:
+        if _TRACER is None:
+            yield
+            return
+        lane = self.acquire()
+        try:
+            with span(name, category, track=f"{self.name} {lane}", **args):
+                yield
+        finally:
+            self.release(lane)
+
+
+def write(path: str | Path) -> None:
+    if _TRACER is None:
+        return
+    with _TRACER.lock:
+        data = json.dumps({"traceEvents": _TRACER.events, "displayTimeUnit": "ms"}).encode()
+    cache.atomic_write(Path(os.path.abspath(path)), data)
@@ -3,8 +3,7 @@
 
 from __future__ import annotations
 
-import base64
-import hashlib
+import functools
 import importlib.util
 import json
 import os
@@ -13,56 +12,116 @@ import shutil
 import stat
 import subprocess
 import sys
-from contextlib import contextmanager
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
 from os import fspath
 from pathlib import Path
-from tempfile import NamedTemporaryFile, TemporaryDirectory
 from textwrap import dedent
-from typing import IO, Any, Dict, Iterator, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Container,
+    DefaultDict,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Protocol,
+    Sequence,
+    cast,
+)
 
-from dev_cmd import color
+from dev_cmd import cache, color, console, memo, trace
 from dev_cmd.errors import DevCmdError
-from dev_cmd.model import Command, Python, PythonConfig, Venv, VenvConfig
+from dev_cmd.model import Command, Installer, Python, PythonConfig, Venv, VenvConfig
 
-AVAILABLE = False
+# N.B.: This module is imported on every `dev-cmd` run, but venvs are only provisioned for projects
+# with custom Pythons; so the asyncio machinery used to provision them is imported lazily.
 
-if shutil.which("pex3") and importlib.util.find_spec("filelock"):
-    from filelock import FileLock
 
-    AVAILABLE = True
+DEFAULT_MAX_SIZE = 10 * 1024**3
 
+_LAYOUT_FILE = ".dev-cmd-venv-layout.json"
+_REQUIREMENTS_FILE = ".dev-cmd-requirements.txt"
 
-def _fingerprint(data: bytes) -> str:
-    return base64.urlsafe_b64encode(hashlib.sha256(data).digest()).decode().rstrip("=")
+# N.B.: An existing venv is only cloned for a new one when at most this fraction of the new venv's
+# requirements need to be uninstalled or (re-)installed. Past that, reworking the clone costs about
+# as much as building from scratch.
+_MAX_CLONE_DIFF_RATIO = 0.5
 
 
-@contextmanager
-def _named_temporary_file(
-    tmp_dir: str | None = None, prefix: str | None = None
-) -> Iterator[IO[bytes]]:
-    # Work around Windows issue with auto-delete: https://bugs.python.org/issue14243
-    fp = NamedTemporaryFile(dir=tmp_dir, prefix=prefix, delete=False)
+@functools.lru_cache(maxsize=None)
+def available() -> bool:
+    return bool(shutil.which("pex3") and importlib.util.find_spec("filelock"))
+
+
+async def _execute(
+    args: Sequence[str],
+    cwd: str | os.PathLike[str] | None = None,
+    env: Mapping[str, str] | None = None,
+    capture: bool = False,
+    quiet: bool = False,
+) -> bytes:
+    """Runs a venv setup command to completion, raising `CalledProcessError` if it fails.
+
+    The command's stdout goes to stderr unless captured. When quiet, its stderr is captured too and
+    the output is only shown if the command fails, unless it was captured for the caller.
+    """
+    from dev_cmd import process
+
+    if quiet:
+        stdout, stderr = process.PIPE, process.STDOUT
+    elif capture:
+        stdout, stderr = process.PIPE, None
+    else:
+        stdout, stderr = sys.stderr.fileno(), None
+    if stderr is None:
+        # N.B.: The command writes straight to our stderr; so queued console output must land first.
+        console.flush()
+
+    child = await process.spawn(args, cwd=cwd, env=env, stdout=stdout, stderr=stderr)
     try:
-        with fp:
-            yield fp
-    finally:
+        output = await child.communicate() or b""
+    except BaseException:
+        child.terminate()
+        raise
+    if child.returncode:
+        if quiet and not capture:
+            _print(output.decode(errors="replace"), end="")
+        raise subprocess.CalledProcessError(child.returncode, list(args), output=output)
+    return output
+
+
+@asynccontextmanager
+async def _file_lock(path: str) -> AsyncIterator[None]:
+    import asyncio
+
+    from filelock import FileLock, Timeout
+
+    # N.B.: We poll for the lock instead of blocking a thread on it so that the lock is acquired and
+    # released by the same (event loop) thread.
+    lock = FileLock(path)
+    while True:
         try:
-            os.remove(fp.name)
-        except FileNotFoundError:
-            pass
+            lock.acquire(timeout=0)
+            break
+        except Timeout:
+            await asyncio.sleep(0.1)
+    try:
+        yield
+    finally:
+        lock.release()
 
 
-def _ensure_cache_dir() -> Path:
-    cache_dir = Path(os.path.abspath(os.environ.get("DEV_CMD_WORKSPACE_CACHE_DIR", ".dev-cmd")))
-    gitignore = cache_dir / ".gitignore"
-    if not gitignore.exists():
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        with _named_temporary_file(tmp_dir=fspath(cache_dir), prefix=".gitignore.") as gitignore_fp:
-            gitignore_fp.write(b"*\n")
-            gitignore_fp.close()
-            os.rename(gitignore_fp.name, gitignore)
-    return cache_dir
+def _print(message: str, end: str = "\n") -> None:
+    # N.B.: Output queued by `Console.aprint` must land before this output.
+    console.flush()
+    print(message, end=end, file=sys.stderr, flush=True)
+
+
+def _progress(env_description: str, message: str) -> None:
+    _print(color.color(f"[{env_description}] {message}...", fg="gray"))
 
 
 @dataclass(frozen=True)
@@ -71,88 +130,150 @@ class _VenvLayout:
     site_packages_dir: str
 
 
-def _create_venv(python: str, venv_dir: str) -> _VenvLayout:
-    result = subprocess.run(
-        args=[
-            "pex3",
-            "venv",
-            "create",
-            "--force",
-            "--python",
-            python,
-            "--pip-version",
-            "latest",
-            "--allow-pip-version-fallback",
-            "--pip",
-            "--dest-dir",
-            venv_dir,
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
-        raise DevCmdError(result.stderr)
+async def _create_venv(python: str, venv_dir: str) -> _VenvLayout:
+    try:
+        await _execute(
+            args=[
+                "pex3",
+                "venv",
+                "create",
+                "--force",
+                "--python",
+                python,
+                "--pip-version",
+                "latest",
+                "--allow-pip-version-fallback",
+                "--pip",
+                "--dest-dir",
+                venv_dir,
+            ],
+            capture=True,
+            quiet=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise DevCmdError(e.output.decode(errors="replace"))
+    return await _inspect_venv(venv_dir)
 
-    result = subprocess.run(
-        args=["pex3", "venv", "inspect", venv_dir],
-        text=True,
-        stdout=subprocess.PIPE,
-        check=True,
-    )
-    venv_data = json.loads(result.stdout)
+
+async def _inspect_venv(venv_dir: str) -> _VenvLayout:
+    venv_data = json.loads(await _execute(args=["pex3", "venv", "inspect", venv_dir], capture=True))
     python_exe = venv_data["interpreter"]["binary"]
     site_packages_dir = venv_data["site_packages"]
 
     return _VenvLayout(python=python_exe, site_packages_dir=site_packages_dir)
 
 
-def marker_environment(python: Python, quiet: bool = False) -> dict[str, str]:
-    resolved_python = python.resolve()
-    fingerprint = _fingerprint(resolved_python.encode())
-    markers_file = _ensure_cache_dir() / "interpreters" / f"markers.{fingerprint}.json"
-    if not os.path.exists(markers_file):
-        markers_file.parent.mkdir(parents=True, exist_ok=True)
-        with (
-            FileLock(f"{markers_file}.lck"),
-            TemporaryDirectory(dir=markers_file.parent, prefix="packaging-venv.") as td,
-        ):
-            print(
-                f"{color.yellow(f'Calculating environment markers for --python {python}')}...",
-                file=sys.stderr,
-            )
-            venv_layout = _create_venv(resolved_python, fspath(td))
-            subprocess.run(
-                args=[venv_layout.python, "-m", "pip", "install", "packaging"],
-                stdout=subprocess.DEVNULL if quiet else sys.stderr.fileno(),
-                stderr=subprocess.DEVNULL if quiet else None,
-                check=True,
-            )
-            temp_markers_file = Path(td) / markers_file.name
-            temp_markers_file.write_bytes(
-                subprocess.run(
-                    args=[
-                        venv_layout.python,
-                        "-c",
-                        dedent(
-                            """\
-                            import json
-                            import sys
-
-                            from packaging import markers
-
-                            json.dump(markers.default_environment(), sys.stdout)
-                            """
-                        ),
-                    ],
-                    stdout=subprocess.PIPE,
-                    check=True,
-                ).stdout
-            )
-            temp_markers_file.rename(markers_file)
-    return cast(Dict[str, str], json.loads(markers_file.read_bytes()))
+async def _inspect_uv_venv(venv_dir: str) -> _VenvLayout:
+    # N.B.: A uv venv is a standard PEP 405 venv; so we can find its layout without Pex, asking its
+    # interpreter where its site-packages directory is.
+    if not os.path.isfile(os.path.join(venv_dir, "pyvenv.cfg")):
+        raise DevCmdError(f"Expected uv to create a venv at {venv_dir} but it has no pyvenv.cfg.")
+    if sys.platform == "win32":
+        python_exe = os.path.join(venv_dir, "Scripts", "python.exe")
+    else:
+        python_exe = os.path.join(venv_dir, "bin", "python")
+    site_packages_dir = await _execute(
+        args=[python_exe, "-c", "import sysconfig; print(sysconfig.get_path('purelib'))"],
+        capture=True,
+    )
+    return _VenvLayout(python=python_exe, site_packages_dir=site_packages_dir.decode().strip())
+
 
+# N.B.: This mirrors `packaging.markers.default_environment` and must run under any Python a venv
+# might be built for; so it sticks to syntax and modules available since Python 2.7.
+_MARKERS_PROBE = dedent(
+    """\
+    import json
+    import os
+    import platform
+    import sys
 
-def _fingerprint_python_config(venv_config: VenvConfig, python_config: PythonConfig) -> str:
+    if hasattr(sys, "implementation"):
+        info = sys.implementation.version
+        implementation_version = "{0.major}.{0.minor}.{0.micro}".format(info)
+        if info.releaselevel != "final":
+            implementation_version += info.releaselevel[0] + str(info.serial)
+        implementation_name = sys.implementation.name
+    else:
+        implementation_version = "0"
+        implementation_name = ""
+
+    json.dump(
+        {
+            "implementation_name": implementation_name,
+            "implementation_version": implementation_version,
+            "os_name": os.name,
+            "platform_machine": platform.machine(),
+            "platform_release": platform.release(),
+            "platform_system": platform.system(),
+            "platform_version": platform.version(),
+            "python_full_version": platform.python_version(),
+            "platform_python_implementation": platform.python_implementation(),
+            "python_version": ".".join(platform.python_version_tuple()[:2]),
+            "sys_platform": sys.platform,
+        },
+        sys.stdout,
+    )
+    """
+)
+
+
+def _interpreter(python: Python) -> str:
+    resolved = python.resolve()
+    interpreter = resolved if os.path.sep in resolved else shutil.which(resolved)
+    if not interpreter or not os.path.isfile(interpreter):
+        raise DevCmdError(f"Could not find a Python interpreter for --python {python}.")
+    return os.path.realpath(interpreter)
+
+
+def _probe_marker_environment(python: Python, interpreter: str) -> dict[str, str]:
+    process = subprocess.run(
+        args=[interpreter, "-sE", "-c", _MARKERS_PROBE],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if process.returncode != 0:
+        raise DevCmdError(
+            f"Failed to calculate environment markers for --python {python} using {interpreter}:\n"
+            f"{process.stderr.decode(errors='replace')}"
+        )
+    return cast(Dict[str, str], json.loads(process.stdout))
+
+
+def marker_environment(python: Python) -> dict[str, str]:
+    """Returns the PEP 508 marker environment of the given Python.
+
+    Results are indexed by interpreter path and re-probed whenever the interpreter binary changes;
+    e.g.: when it is upgraded in place.
+    """
+    interpreter = _interpreter(python)
+
+    def calculate() -> dict[str, str]:
+        index_file = cache.ensure_cache_dir() / "interpreters" / "markers.json"
+        try:
+            index: dict[str, Any] = json.loads(index_file.read_bytes())
+        except (OSError, ValueError):
+            index = {}
+
+        stat = os.stat(interpreter)
+        key = [stat.st_size, stat.st_mtime_ns]
+        entry = index.get(interpreter)
+        if entry and entry["key"] == key:
+            return cast(Dict[str, str], entry["marker-environment"])
+
+        environment = _probe_marker_environment(python, interpreter)
+        index[interpreter] = {"key": key, "marker-environment": environment}
+        # N.B.: Concurrent runs may race to write the index; the loser's probe is just re-run by
+        # some later run.
+        cache.atomic_write(index_file, json.dumps(index, indent=2, sort_keys=True).encode())
+        return environment
+
+    return memo.memoize(
+        key=("markers", interpreter), stamp=memo.stat_stamp([interpreter]), compute=calculate
+    )
+
+
+def _fingerprint_cache_key_paths(python_config: PythonConfig) -> dict[str, str]:
     input_files = {}
     input_paths: dict[str, str] = {}
     for path in python_config.cache_key_inputs.paths:
@@ -172,13 +293,21 @@ def _fingerprint_python_config(venv_config: VenvConfig, python_config: PythonCon
         input_paths.update(
             zip(
                 map(lambda f: f.as_posix(), input_files),
-                # TODO(John Sirois): Investigate ThreadPool().map(..., chunk_size=?) ~# of files
-                #  threshold where performance improves A quick experiment on SSD showed a thread
-                #  pool to be slower for <100 files.
-                map(lambda f: _fingerprint(f.read_bytes()), input_files),
+                cache.fingerprint_files(list(input_files)),
             )
         )
+    return input_paths
+
+
+def _cache_keys(python_config: PythonConfig, input_paths: Mapping[str, str]) -> dict[str, Any]:
+    return {
+        "pyproject-data": python_config.cache_key_inputs.pyproject_data,
+        "paths": input_paths,
+        "env": python_config.cache_key_inputs.envs,
+    }
 
+
+def _python_config_data(venv_config: VenvConfig, python_config: PythonConfig) -> dict[str, Any]:
     def extract_command_fingerprint_data(command: Command | None) -> dict[str, Any] | None:
         if command is None:
             return None
@@ -188,36 +317,47 @@ def _fingerprint_python_config(venv_config: VenvConfig, python_config: PythonCon
             "cwd": str(command.cwd) if command.cwd else None,
         }
 
-    return _fingerprint(
+    return {
+        "python": venv_config.python.resolve(),
+        "installer": python_config.installer.value,
+        "dependency-group": venv_config.dependency_group,
+        "pip-requirement": python_config.pip_requirement,
+        "3rdparty-export-command": extract_command_fingerprint_data(
+            python_config.thirdparty_export_command
+        ),
+        "3rdparty-pip-install-opts": python_config.thirdparty_pip_install_opts,
+        "extra-requirements": (
+            cache.fingerprint(python_config.extra_requirements.encode())
+            if isinstance(python_config.extra_requirements, str)
+            else python_config.extra_requirements
+        ),
+        "extra-requirements-pip-install-opts": python_config.extra_requirements_pip_install_opts,
+        "finalize-command": extract_command_fingerprint_data(python_config.finalize_command),
+    }
+
+
+def _fingerprint_python_config(
+    venv_config: VenvConfig, python_config: PythonConfig, input_paths: Mapping[str, str]
+) -> str:
+    return cache.fingerprint(
         json.dumps(
             {
-                "python": venv_config.python.resolve(),
-                "dependency-group": venv_config.dependency_group,
-                "cache-keys": {
-                    "pyproject-data": python_config.cache_key_inputs.pyproject_data,
-                    "paths": input_paths,
-                    "env": python_config.cache_key_inputs.envs,
-                },
-                "pip-requirement": python_config.pip_requirement,
-                "3rdparty-export-command": extract_command_fingerprint_data(
-                    python_config.thirdparty_export_command
-                ),
-                "3rdparty-pip-install-opts": python_config.thirdparty_pip_install_opts,
-                "extra-requirements": (
-                    _fingerprint(python_config.extra_requirements.encode())
-                    if isinstance(python_config.extra_requirements, str)
-                    else python_config.extra_requirements
-                ),
-                "extra-requirements-pip-install-opts": python_config.extra_requirements_pip_install_opts,
-                "finalize-command": extract_command_fingerprint_data(
-                    python_config.finalize_command
-                ),
+                **_python_config_data(venv_config, python_config),
+                "cache-keys": _cache_keys(python_config, input_paths),
             },
             sort_keys=True,
         ).encode()
     )
 
 
+def _lineage(venv_config: VenvConfig, python_config: PythonConfig) -> str:
+    # N.B.: Venvs of the same lineage differ only in their cache keys, and so, at most, in their
+    # exported requirements.
+    return cache.fingerprint(
+        json.dumps(_python_config_data(venv_config, python_config), sort_keys=True).encode()
+    )
+
+
 def _chmod_plus_x(path: Path) -> None:
     path_mode = path.stat().st_mode
     path_mode &= 0o777
@@ -230,202 +370,726 @@ def _chmod_plus_x(path: Path) -> None:
     path.chmod(path_mode)
 
 
-def ensure(
+# N.B.: Each venv in use by this process is marked by a lock file we hold until we exit, keyed by
+# venv dir.
+_IN_USE: dict[Path, Any] = {}
+
+
+def _last_used_file(venv_dir: Path) -> Path:
+    return Path(f"{venv_dir}.last-used")
+
+
+def _users_dir(venv_dir: Path) -> Path:
+    return Path(f"{venv_dir}.users")
+
+
+def _mark_in_use(venv_dir: Path) -> None:
+    # N.B.: The venv's lock must be held here; `gc` holds it while checking for users.
+    _last_used_file(venv_dir).touch()
+    if venv_dir in _IN_USE:
+        return
+
+    from filelock import FileLock
+
+    users_dir = _users_dir(venv_dir)
+    users_dir.mkdir(parents=True, exist_ok=True)
+    lock = FileLock(users_dir / f"{os.getpid()}.lck")
+    lock.acquire()
+    _IN_USE[venv_dir] = lock
+
+
+def _env_description(venv_config: VenvConfig) -> str:
+    env_description = f"--python {venv_config.python}"
+    if venv_config.dependency_group:
+        env_description = f"{env_description} dependency-group={venv_config.dependency_group}"
+    return env_description
+
+
+async def ensure(
     venv_config: VenvConfig,
     python_config: PythonConfig,
-    rebuild_if_needed: bool = True,
     quiet: bool = False,
+    track: str | None = None,
 ) -> Venv:
-    python = venv_config.python
+    # N.B.: Fingerprinting a venv hashes all of its cache key input files. A venv resolved earlier
+    # in a `dev-cmd` daemon is re-used without re-hashing while none of those files have changed.
+    key = (
+        "venv",
+        repr(venv_config),
+        repr(python_config),
+        os.environ.get("PATH"),
+        str(cache.ensure_cache_dir()),
+    )
+    stamp = memo.tree_stamp(python_config.cache_key_inputs.paths)
+    venv = memo.lookup(key, stamp, valid=Venv.is_valid)
+    if venv is not None:
+        async with _file_lock(f"{venv.dir}.lck"):
+            _mark_in_use(Path(venv.dir))
+            if not venv.is_valid():
+                venv = None
+    if venv is None:
+        venv = memo.store(
+            key, stamp, await _ensure(venv_config, python_config, quiet=quiet, track=track)
+        )
+    _print(color.color(f"Using venv at {venv.dir} for {_env_description(venv_config)}.", fg="gray"))
+    return cast(Venv, venv)
 
-    env_description = f"--python {python}"
-    if venv_config.dependency_group:
-        env_description = f"{env_description} dependency-group={venv_config.dependency_group}"
 
-    fingerprint = _fingerprint_python_config(venv_config=venv_config, python_config=python_config)
-    venv_dir = _ensure_cache_dir() / "venvs" / fingerprint
-    layout_file = venv_dir / ".dev-cmd-venv-layout.json"
-    if not os.path.exists(venv_dir):
-        venv_dir.parent.mkdir(parents=True, exist_ok=True)
-        with FileLock(f"{venv_dir}.lck"):
-            if not os.path.exists(venv_dir):
-                print(
-                    f"{color.yellow(f'Setting up venv for {env_description}')}...", file=sys.stderr
+def _thirdparty_export_command_args(
+    venv_config: VenvConfig, python_config: PythonConfig, requirements_file: str
+) -> list[str]:
+    thirdparty_export_command_args: list[str] = []
+    for arg in python_config.thirdparty_export_command.args:
+        if arg == "{requirements.txt}":
+            thirdparty_export_command_args.append(requirements_file)
+            continue
+        match = re.match(r"^\{dependency-group(?::(?P<default>.*))?}$", arg)
+        if not match:
+            thirdparty_export_command_args.append(arg)
+        elif venv_config.dependency_group:
+            thirdparty_export_command_args.append(venv_config.dependency_group)
+        else:
+            default_dependency_group = match.group("default")
+            if not default_dependency_group:
+                raise DevCmdError(
+                    f"A [[tool.dev-cmd.python]] configuration uses {arg} and no "
+                    f"default dependency-group was set."
                 )
-                work_dir = Path(f"{venv_dir}.work")
-                venv_layout = _create_venv(python.resolve(), venv_dir=fspath(work_dir))
-
-                thirdparty_export_command_args: list[str] = []
-                for arg in python_config.thirdparty_export_command.args:
-                    match = re.match(r"^\{dependency-group(?::(?P<default>.*))?}$", arg)
-                    if not match:
-                        thirdparty_export_command_args.append(arg)
-                    elif venv_config.dependency_group:
-                        thirdparty_export_command_args.append(venv_config.dependency_group)
-                    else:
-                        default_dependency_group = match.group("default")
-                        if not default_dependency_group:
-                            raise DevCmdError(
-                                f"A [[tool.dev-cmd.python]] configuration uses {arg} and no "
-                                f"default dependency-group was set."
-                            )
-                        thirdparty_export_command_args.append(default_dependency_group)
-
-                with _named_temporary_file(
-                    tmp_dir=fspath(work_dir), prefix="3rdparty-reqs."
-                ) as reqs_fp:
-                    reqs_fp.close()
-
-                    requirements_export_command_args = [
-                        (reqs_fp.name if arg == "{requirements.txt}" else arg)
-                        for arg in thirdparty_export_command_args
-                    ]
-                    env = os.environ.copy()
-                    env.update(python_config.thirdparty_export_command.extra_env)
-                    subprocess.run(
-                        args=requirements_export_command_args,
-                        cwd=python_config.thirdparty_export_command.cwd,
-                        env=env,
-                        check=True,
-                    )
+            thirdparty_export_command_args.append(default_dependency_group)
+    return thirdparty_export_command_args
 
-                    pip_stdout = subprocess.DEVNULL if quiet else sys.stderr.fileno()
-                    pip_stderr = subprocess.DEVNULL if quiet else None
-                    subprocess.run(
-                        args=[
-                            venv_layout.python,
-                            "-m",
-                            "pip",
-                            "install",
-                            "-U",
-                            python_config.pip_requirement,
-                        ],
-                        stdout=pip_stdout,
-                        stderr=pip_stderr,
-                        check=True,
-                    )
-                    subprocess.run(
-                        args=[venv_layout.python, "-m", "pip", "install"]
-                        + list(python_config.thirdparty_pip_install_opts)
-                        + ["-r", reqs_fp.name],
-                        stdout=pip_stdout,
-                        stderr=pip_stderr,
-                        check=True,
-                    )
 
-                if python_config.extra_requirements:
-
-                    @contextmanager
-                    def _extra_requirements_args() -> Iterator[list[str]]:
-                        if isinstance(python_config.extra_requirements, str):
-                            with _named_temporary_file(
-                                tmp_dir=fspath(work_dir), prefix="extra-reqs."
-                            ) as fp:
-                                fp.write(python_config.extra_requirements.encode())
-                                fp.close()
-                                yield ["-r", fp.name]
-                        else:
-                            yield list(python_config.extra_requirements)
-
-                    with _extra_requirements_args() as extra_requirements_args:
-                        subprocess.run(
-                            args=[venv_layout.python, "-m", "pip", "install"]
-                            + list(python_config.extra_requirements_pip_install_opts)
-                            + extra_requirements_args,
-                            stdout=pip_stdout,
-                            stderr=pip_stderr,
-                            check=True,
-                        )
-
-                if python_config.finalize_command:
-                    finalize_command_args: list[str] = []
-                    for arg in python_config.finalize_command.args:
-                        if arg == "{venv-python}":
-                            finalize_command_args.append(venv_layout.python)
-                        elif arg == "{venv-site-packages}":
-                            finalize_command_args.append(venv_layout.site_packages_dir)
-                        else:
-                            finalize_command_args.append(arg)
-                    env = os.environ.copy()
-                    env.update(python_config.finalize_command.extra_env)
-                    subprocess.run(
-                        args=finalize_command_args,
-                        cwd=python_config.finalize_command.cwd,
-                        env=env,
-                        check=True,
+async def _export_requirements(
+    venv_config: VenvConfig,
+    python_config: PythonConfig,
+    input_paths: Mapping[str, str],
+    env_description: str,
+    quiet: bool,
+) -> Path:
+    # N.B.: Venvs for different Pythons commonly export the same requirements; e.g.: a type-check
+    # matrix. So exports are shared by all venvs, in this run and later ones, that resolve the
+    # export command the same way against the same cache keys.
+    command = python_config.thirdparty_export_command
+    cwd = os.path.abspath(command.cwd or os.curdir)
+    fingerprint = cache.fingerprint(
+        json.dumps(
+            {
+                "args": _thirdparty_export_command_args(
+                    venv_config, python_config, requirements_file="{requirements.txt}"
+                ),
+                "extra-env": dict(command.extra_env),
+                "cwd": cwd,
+                "cache-keys": _cache_keys(python_config, input_paths),
+            },
+            sort_keys=True,
+        ).encode()
+    )
+    requirements_file = cache.ensure_cache_dir() / "3rdparty-exports" / f"{fingerprint}.txt"
+    requirements_file.parent.mkdir(parents=True, exist_ok=True)
+    async with _file_lock(f"{requirements_file}.lck"):
+        if requirements_file.exists():
+            _progress(env_description, "Re-using exported requirements")
+            return requirements_file
+
+        _progress(env_description, "Exporting requirements")
+        with cache.named_temporary_file(
+            tmp_dir=fspath(requirements_file.parent), prefix=f".{requirements_file.name}."
+        ) as fp:
+            fp.close()
+            env = os.environ.copy()
+            env.update(command.extra_env)
+            await _execute(
+                args=_thirdparty_export_command_args(venv_config, python_config, fp.name),
+                cwd=cwd,
+                env=env,
+                quiet=quiet,
+            )
+            os.replace(fp.name, requirements_file)
+    return requirements_file
+
+
+@contextmanager
+def _extra_requirements_args(python_config: PythonConfig, work_dir: Path) -> Iterator[list[str]]:
+    if not python_config.extra_requirements or not isinstance(
+        python_config.extra_requirements, str
+    ):
+        yield list(python_config.extra_requirements)
+        return
+
+    with cache.named_temporary_file(tmp_dir=fspath(work_dir), prefix="extra-reqs.") as fp:
+        fp.write(python_config.extra_requirements.encode())
+        fp.close()
+        yield ["-r", fp.name]
+
+
+class _Installer(Protocol):
+    async def create(self, python: str, venv_dir: str) -> _VenvLayout: ...
+
+    async def install(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        requirements_file: Path,
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None: ...
+
+    async def update(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        removed: Sequence[str],
+        requirements_file: Path | None,
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None: ...
+
+
+def _progress_uninstall(env_description: str, removed: Sequence[str]) -> None:
+    _progress(env_description, f"Uninstalling {', '.join(removed)}")
+
+
+class _PipInstaller:
+    """Creates venvs with Pex and installs into them with the venv's own Pip, one step at a time."""
+
+    async def create(self, python: str, venv_dir: str) -> _VenvLayout:
+        return await _create_venv(python, venv_dir)
+
+    async def install(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        requirements_file: Path,
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None:
+        _progress(env_description, "Installing pip")
+        with trace.span("install pip", "venv", track=track):
+            await _execute(
+                args=[venv_layout.python, "-m", "pip", "install", "-U"]
+                + [python_config.pip_requirement],
+                quiet=quiet,
+            )
+        await self._install(
+            venv_layout, python_config, requirements_file, work_dir, env_description, quiet, track
+        )
+
+    async def update(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        removed: Sequence[str],
+        requirements_file: Path | None,
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None:
+        if removed:
+            _progress_uninstall(env_description, removed)
+            with trace.span("uninstall requirements", "venv", track=track):
+                await _execute(
+                    args=[venv_layout.python, "-m", "pip", "uninstall", "-y", *removed], quiet=quiet
+                )
+        await self._install(
+            venv_layout, python_config, requirements_file, work_dir, env_description, quiet, track
+        )
+
+    async def _install(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        requirements_file: Path | None,
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None:
+        pip = [venv_layout.python, "-m", "pip", "install"]
+
+        if requirements_file:
+            _progress(env_description, "Installing requirements")
+            with trace.span("install requirements", "venv", track=track):
+                await _execute(
+                    args=pip
+                    + list(python_config.thirdparty_pip_install_opts)
+                    + ["-r", fspath(requirements_file)],
+                    quiet=quiet,
+                )
+
+        if python_config.extra_requirements:
+            _progress(env_description, "Installing extra requirements")
+            with trace.span("install extra requirements", "venv", track=track):
+                with _extra_requirements_args(python_config, work_dir) as extra_requirements_args:
+                    await _execute(
+                        args=pip
+                        + list(python_config.extra_requirements_pip_install_opts)
+                        + extra_requirements_args,
+                        quiet=quiet,
                     )
 
-                venv_bin_dir = Path(os.path.dirname(venv_layout.python))
-                work_dir_path = str(work_dir)
-                work_dir_path_bytes = work_dir_path.encode()
-                venv_dir_path = str(venv_dir)
-                venv_dir_path_bytes = venv_dir_path.encode()
-                for candidate_console_script in venv_bin_dir.iterdir():
-                    if (
-                        not candidate_console_script.is_file()
-                        or candidate_console_script.is_symlink()
-                    ):
-                        continue
-                    with candidate_console_script.open("rb") as candidate_fp:
-                        if candidate_fp.read(2) != b"#!":
-                            continue
-                        shebang = candidate_fp.readline()
-                        if shebang != b"/bin/sh\n" and not shebang.startswith(work_dir_path_bytes):
-                            continue
-
-                        rewrite_target = candidate_console_script.with_suffix(".rewrite")
-                        with rewrite_target.open("wb") as rewrite_fp:
-                            rewrite_fp.write(b"#!")
-                            if shebang.startswith(work_dir_path_bytes):
-                                rewrite_fp.write(
-                                    shebang.replace(work_dir_path_bytes, venv_dir_path_bytes)
-                                )
-                                shutil.copyfileobj(candidate_fp, rewrite_fp)
-                            else:
-                                # N.B.: Scripts with too-long shebangs will use the `#!/bin/sh` trick.
-                                # Like so:
-                                # #!/bin/sh
-                                # # N.B.: This python script executes via a /bin/sh re-exec as a hack to work around a
-                                # # potential maximum shebang length of 128 bytes on this system which
-                                # # the python interpreter `exec`ed below would violate.
-                                # ''''exec /too/long/lead-in/path/.dev-cmd/venvs/Dik2FlYfLsaDdskunQh_vGTlBS1My7KattEsxC0M9-k.work/bin/python2.7 "$0" "$@"
-                                # '''
-                                # # -*- coding: utf-8 -*-
-                                # import importlib
-                                # ...
-                                rewrite_fp.write(shebang)
-                                rewrite_fp.write(
-                                    candidate_fp.read().replace(
-                                        work_dir_path_bytes, venv_dir_path_bytes, 1
-                                    )
-                                )
-                    rewrite_target.replace(candidate_console_script)
-                    _chmod_plus_x(candidate_console_script)
-
-                with (work_dir / layout_file.name).open("w") as out_fp:
-                    json.dump(
-                        {
-                            "python": venv_layout.python.replace(work_dir_path, venv_dir_path),
-                            "marker-environment": marker_environment(python, quiet=quiet),
-                        },
-                        out_fp,
+
+class _UvInstaller:
+    """Creates venvs with uv and installs everything into them in a single uv resolve."""
+
+    @staticmethod
+    def _uv() -> str:
+        uv = shutil.which("uv")
+        if not uv:
+            raise DevCmdError(
+                'A [[tool.dev-cmd.python]] configuration uses `installer = "uv"` but `uv` could '
+                "not be found on the PATH."
+            )
+        return uv
+
+    async def create(self, python: str, venv_dir: str) -> _VenvLayout:
+        try:
+            await _execute(
+                args=[self._uv(), "venv", "--quiet", "--python", python, venv_dir],
+                capture=True,
+                quiet=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise DevCmdError(e.output.decode(errors="replace"))
+        return await _inspect_uv_venv(venv_dir)
+
+    async def install(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        requirements_file: Path,
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None:
+        # N.B.: The venv gets Pip too, just like Pip installer venvs, since commands and
+        # `finalize-command`s may rely on it.
+        await self._install(
+            venv_layout,
+            python_config,
+            [python_config.pip_requirement, "-r", fspath(requirements_file)],
+            work_dir,
+            env_description,
+            quiet,
+            track,
+        )
+
+    async def update(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        removed: Sequence[str],
+        requirements_file: Path | None,
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None:
+        if removed:
+            _progress_uninstall(env_description, removed)
+            with trace.span("uninstall requirements", "venv", track=track):
+                await _execute(
+                    args=[self._uv(), "pip", "uninstall", "--python", venv_layout.python, *removed],
+                    quiet=quiet,
+                )
+        await self._install(
+            venv_layout,
+            python_config,
+            ["-r", fspath(requirements_file)] if requirements_file else [],
+            work_dir,
+            env_description,
+            quiet,
+            track,
+        )
+
+    async def _install(
+        self,
+        venv_layout: _VenvLayout,
+        python_config: PythonConfig,
+        requirements: list[str],
+        work_dir: Path,
+        env_description: str,
+        quiet: bool,
+        track: str | None,
+    ) -> None:
+        if not requirements and not python_config.extra_requirements:
+            return
+
+        args: list[str] = []
+        if requirements:
+            args.extend(python_config.thirdparty_pip_install_opts)
+            args.extend(requirements)
+        with _extra_requirements_args(python_config, work_dir) as extra_requirements_args:
+            if extra_requirements_args:
+                args.extend(python_config.extra_requirements_pip_install_opts)
+                args.extend(extra_requirements_args)
+
+            _progress(env_description, "Installing requirements")
+            with trace.span("install requirements", "venv", track=track):
+                await _execute(
+                    args=[self._uv(), "pip", "install", "--python", venv_layout.python, *args],
+                    quiet=quiet,
+                )
+
+
+_INSTALLERS: dict[Installer, _Installer] = {
+    Installer.PIP: _PipInstaller(),
+    Installer.UV: _UvInstaller(),
+}
+
+
+async def _finalize(venv_layout: _VenvLayout, finalize_command: Command, quiet: bool) -> None:
+    finalize_command_args: list[str] = []
+    for arg in finalize_command.args:
+        if arg == "{venv-python}":
+            finalize_command_args.append(venv_layout.python)
+        elif arg == "{venv-site-packages}":
+            finalize_command_args.append(venv_layout.site_packages_dir)
+        else:
+            finalize_command_args.append(arg)
+    env = os.environ.copy()
+    env.update(finalize_command.extra_env)
+    await _execute(args=finalize_command_args, cwd=finalize_command.cwd, env=env, quiet=quiet)
+
+
+def _relocate_console_scripts(venv_layout: _VenvLayout, work_dir: Path, venv_dir: Path) -> None:
+    venv_bin_dir = Path(os.path.dirname(venv_layout.python))
+    work_dir_path = str(work_dir)
+    work_dir_path_bytes = work_dir_path.encode()
+    venv_dir_path = str(venv_dir)
+    venv_dir_path_bytes = venv_dir_path.encode()
+    for candidate_console_script in venv_bin_dir.iterdir():
+        if not candidate_console_script.is_file() or candidate_console_script.is_symlink():
+            continue
+        with candidate_console_script.open("rb") as candidate_fp:
+            if candidate_fp.read(2) != b"#!":
+                continue
+            shebang = candidate_fp.readline()
+            if shebang != b"/bin/sh\n" and not shebang.startswith(work_dir_path_bytes):
+                continue
+
+            rewrite_target = candidate_console_script.with_suffix(".rewrite")
+            with rewrite_target.open("wb") as rewrite_fp:
+                rewrite_fp.write(b"#!")
+                if shebang.startswith(work_dir_path_bytes):
+                    rewrite_fp.write(shebang.replace(work_dir_path_bytes, venv_dir_path_bytes))
+                    shutil.copyfileobj(candidate_fp, rewrite_fp)
+                else:
+                    # N.B.: Scripts with too-long shebangs will use the `#!/bin/sh` trick.
+                    # Like so:
+                    # #!/bin/sh
+                    # # N.B.: This python script executes via a /bin/sh re-exec as a hack to work around a
+                    # # potential maximum shebang length of 128 bytes on this system which
+                    # # the python interpreter `exec`ed below would violate.
+                    # ''''exec /too/long/lead-in/path/.dev-cmd/venvs/Dik2FlYfLsaDdskunQh_vGTlBS1My7KattEsxC0M9-k.work/bin/python2.7 "$0" "$@"
+                    # '''
+                    # # -*- coding: utf-8 -*-
+                    # import importlib
+                    # ...
+                    rewrite_fp.write(shebang)
+                    rewrite_fp.write(
+                        candidate_fp.read().replace(work_dir_path_bytes, venv_dir_path_bytes, 1)
                     )
-                work_dir.rename(venv_dir)
+        rewrite_target.replace(candidate_console_script)
+        _chmod_plus_x(candidate_console_script)
+
+
+@dataclass(frozen=True)
+class _Requirements:
+    @classmethod
+    def load(cls, requirements_file: Path) -> _Requirements | None:
+        """Loads a requirements file as individual requirements that can be diffed.
+
+        Returns `None` if the requirements file has entries whose contents we can't see; i.e.:
+        nested requirements or constraints files, find-links repositories, local projects and
+        archives or direct URL references. The contents of any of these can change without the
+        requirement line changing.
+        """
+        try:
+            content = requirements_file.read_text()
+        except OSError:
+            return None
+
+        options: list[str] = []
+        requirements: DefaultDict[str, list[str]] = defaultdict(list)
+        for line in content.replace("\\\n", " ").splitlines():
+            line = " ".join(re.sub(r"(?:^|\s)#.*$", "", line).split())
+            if not line:
+                continue
+            if line.startswith("-"):
+                if re.match(
+                    r"^(?:-[rcef]|--requirement|--constraint|--editable|--find-links)\b", line
+                ):
+                    return None
+                options.append(line)
+                continue
+            match = re.match(r"^[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?", line)
+            if (
+                not match
+                or re.search(r"[@/\\]", line)
+                or re.match(r"^\S+\.(?:whl|zip|tar\.gz|tgz|tar\.bz2)(?:\s|$)", line)
+            ):
+                return None
+            # N.B.: A project can have several requirements with mutually exclusive markers.
+            requirements[re.sub(r"[-_.]+", "-", match.group(0)).lower()].append(line)
+        return cls(
+            options=tuple(options),
+            requirements={
+                project_name: tuple(sorted(lines)) for project_name, lines in requirements.items()
+            },
+        )
+
+    options: tuple[str, ...]
+    requirements: Mapping[str, tuple[str, ...]]
+
+    def removed(self, base: _Requirements) -> list[str]:
+        return sorted(base.requirements.keys() - self.requirements.keys())
+
+    def changed(self, base: _Requirements) -> list[str]:
+        return [
+            requirement
+            for project_name, requirements in sorted(self.requirements.items())
+            if base.requirements.get(project_name) != requirements
+            for requirement in requirements
+        ]
+
+
+def _find_base_venv(
+    cached_venvs: Iterable[CachedVenv], requirements: _Requirements
+) -> tuple[Path, _Requirements] | None:
+    max_distance = _MAX_CLONE_DIFF_RATIO * sum(
+        len(lines) for lines in requirements.requirements.values()
+    )
+    candidates: list[tuple[int, float, Path, _Requirements]] = []
+    for cached_venv in cached_venvs:
+        base_requirements = _Requirements.load(cached_venv.dir / _REQUIREMENTS_FILE)
+        if base_requirements is None or base_requirements.options != requirements.options:
+            continue
+        distance = len(requirements.removed(base_requirements)) + len(
+            requirements.changed(base_requirements)
+        )
+        if distance > max_distance:
+            continue
+        candidates.append((distance, -cached_venv.last_used, cached_venv.dir, base_requirements))
+    if not candidates:
+        return None
+    _, _, base_venv_dir, base_requirements = min(candidates, key=lambda c: c[:2])
+    return base_venv_dir, base_requirements
+
+
+async def _update_from_base(
+    installer: _Installer,
+    python_config: PythonConfig,
+    requirements: _Requirements,
+    base_venv_dir: Path,
+    base_requirements: _Requirements,
+    work_dir: Path,
+    env_description: str,
+    quiet: bool,
+    track: str | None,
+) -> _VenvLayout | None:
+    import asyncio
+
+    async with _file_lock(f"{base_venv_dir}.lck"):
+        # N.B.: The base venv may have been evicted while we were looking for it.
+        if not (base_venv_dir / _LAYOUT_FILE).exists():
+            return None
+        _progress(env_description, f"Cloning venv at {base_venv_dir}")
+        with trace.span("clone venv", "venv", track=track):
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+            await asyncio.to_thread(shutil.copytree, base_venv_dir, work_dir, symlinks=True)
+
+    venv_layout = await _inspect_venv(fspath(work_dir))
+    _relocate_console_scripts(venv_layout, base_venv_dir, work_dir)
+
+    changed = requirements.changed(base_requirements)
+    update_requirements_file: Path | None = None
+    if changed:
+        update_requirements_file = work_dir / ".dev-cmd-requirements-update.txt"
+        update_requirements_file.write_text(
+            "".join(f"{line}\n" for line in (*requirements.options, *changed))
+        )
+    await installer.update(
+        venv_layout,
+        python_config,
+        requirements.removed(base_requirements),
+        update_requirements_file,
+        work_dir,
+        env_description,
+        quiet=quiet,
+        track=track,
+    )
+    if update_requirements_file:
+        update_requirements_file.unlink()
+    return venv_layout
+
+
+async def _build(
+    venv_config: VenvConfig,
+    python_config: PythonConfig,
+    input_paths: Mapping[str, str],
+    venv_dir: Path,
+    layout_file: Path,
+    quiet: bool,
+    track: str | None,
+) -> None:
+    import asyncio
+
+    python = venv_config.python
+    installer = _INSTALLERS[python_config.installer]
+    env_description = _env_description(venv_config)
+    _print(f"{color.yellow(f'Setting up venv for {env_description}')}...")
+
+    work_dir = Path(f"{venv_dir}.work")
+
+    async def create_venv() -> _VenvLayout:
+        _progress(env_description, "Creating venv")
+        with trace.span("create venv", "venv", track=track):
+            # N.B.: The work dir may hold the remains of a failed build or update.
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+            return await installer.create(python.resolve(), venv_dir=fspath(work_dir))
+
+    async def export_requirements() -> Path:
+        with trace.span("export requirements", "venv", track=track):
+            return await _export_requirements(
+                venv_config, python_config, input_paths, env_description, quiet=quiet
+            )
+
+    async def build_from_scratch() -> tuple[_VenvLayout, Path]:
+        # N.B.: Creating the venv and exporting its requirements are independent; so they overlap.
+        create_task = asyncio.ensure_future(create_venv())
+        export_task = asyncio.ensure_future(export_requirements())
+        try:
+            venv_layout, requirements_file = await asyncio.gather(create_task, export_task)
+        except BaseException:
+            create_task.cancel()
+            export_task.cancel()
+            raise
+
+        await installer.install(
+            venv_layout,
+            python_config,
+            requirements_file,
+            work_dir,
+            env_description,
+            quiet=quiet,
+            track=track,
+        )
+        return venv_layout, requirements_file
+
+    async def build_incrementally(
+        cached_venvs: Iterable[CachedVenv],
+    ) -> tuple[_VenvLayout, Path] | None:
+        # N.B.: A venv of the same lineage only differs in its requirements; so if there is one, we
+        # clone the one with the fewest differences and just install those.
+        requirements_file = await export_requirements()
+        requirements = await asyncio.to_thread(_Requirements.load, requirements_file)
+        if requirements is None:
+            return None
+        base = await asyncio.to_thread(_find_base_venv, cached_venvs, requirements)
+        if base is None:
+            return None
+        base_venv_dir, base_requirements = base
+        try:
+            venv_layout = await _update_from_base(
+                installer,
+                python_config,
+                requirements,
+                base_venv_dir,
+                base_requirements,
+                work_dir,
+                env_description,
+                quiet=quiet,
+                track=track,
+            )
+        except subprocess.CalledProcessError:
+            _progress(env_description, "Failed to update a clone, building from scratch instead")
+            return None
+        return (venv_layout, requirements_file) if venv_layout else None
+
+    # N.B.: Exports are derived from the pyproject data and path cache keys; so those may differ
+    # from a base venv's. The env cache keys can feed into the venv in ways the export can't reveal
+    # though; so those must match.
+    lineage = _lineage(venv_config, python_config)
+    cache_keys = _cache_keys(python_config, input_paths)
+    cached_venvs = [
+        cached_venv
+        for cached_venv in await asyncio.to_thread(list, _iter_cached_venvs(venv_dir.parent))
+        if cached_venv.lineage == lineage
+        and cached_venv.cache_keys is not None
+        and cached_venv.cache_keys.get("env") == cache_keys["env"]
+    ]
+    built = await build_incrementally(cached_venvs) if cached_venvs else None
+    venv_layout, requirements_file = built or await build_from_scratch()
+
+    if python_config.finalize_command:
+        _progress(env_description, "Finalizing venv")
+        with trace.span("finalize venv", "venv", track=track):
+            await _finalize(venv_layout, python_config.finalize_command, quiet=quiet)
+
+    _relocate_console_scripts(venv_layout, work_dir, venv_dir)
+    shutil.copyfile(requirements_file, work_dir / _REQUIREMENTS_FILE)
+    with (work_dir / layout_file.name).open("w") as out_fp:
+        json.dump(
+            {
+                "python": venv_layout.python.replace(str(work_dir), str(venv_dir)),
+                "lineage": lineage,
+                "marker-environment": await asyncio.to_thread(marker_environment, python),
+                "size": await asyncio.to_thread(_tree_size, work_dir),
+                "requirements-export": requirements_file.name,
+                "cache-keys": cache_keys,
+            },
+            out_fp,
+        )
+    work_dir.rename(venv_dir)
+
+
+async def _ensure(
+    venv_config: VenvConfig,
+    python_config: PythonConfig,
+    rebuild_if_needed: bool = True,
+    quiet: bool = False,
+    track: str | None = None,
+) -> Venv:
+    import asyncio
+
+    python = venv_config.python
+
+    input_paths = await asyncio.to_thread(_fingerprint_cache_key_paths, python_config)
+    fingerprint = _fingerprint_python_config(venv_config, python_config, input_paths)
+    venv_dir = cache.ensure_cache_dir() / "venvs" / fingerprint
+    layout_file = venv_dir / _LAYOUT_FILE
+    venv_dir.parent.mkdir(parents=True, exist_ok=True)
+    async with _file_lock(f"{venv_dir}.lck"):
+        _mark_in_use(venv_dir)
+        if not os.path.exists(venv_dir):
+            await _build(
+                venv_config, python_config, input_paths, venv_dir, layout_file, quiet, track
+            )
 
     with layout_file.open() as in_fp:
         data = json.load(in_fp)
 
-    def rebuild():
-        print(
-            color.yellow(f"Venv for --python {python} at {venv_dir} is out of date, rebuilding."),
-            file=sys.stderr,
+    async def rebuild() -> Venv:
+        _print(
+            color.yellow(f"Venv for --python {python} at {venv_dir} is out of date, rebuilding.")
         )
         shutil.rmtree(venv_dir)
-        return ensure(venv_config=venv_config, python_config=python_config, rebuild_if_needed=False)
+        return await _ensure(
+            venv_config=venv_config,
+            python_config=python_config,
+            rebuild_if_needed=False,
+            quiet=quiet,
+            track=track,
+        )
 
-    print(
-        color.color(f"Using venv at {venv_dir} for {env_description}.", fg="gray"), file=sys.stderr
-    )
     try:
         venv = Venv(
             dir=venv_dir.as_posix(),
@@ -433,9 +1097,195 @@ def ensure(
             marker_environment=data["marker-environment"],
         )
         if not venv.is_valid():
-            return rebuild()
+            return await rebuild()
         return venv
     except KeyError:
         if not rebuild_if_needed:
             raise
-        return rebuild()
+        return await rebuild()
+
+
+def _tree_size(path: Path) -> int:
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+@dataclass(frozen=True)
+class CachedVenv:
+    dir: Path
+    last_used: float
+    size: int
+    lineage: str | None = None
+    requirements_export: str | None = None
+    cache_keys: Mapping[str, Any] | None = None
+
+
+def _iter_cached_venvs(venvs_dir: Path) -> Iterator[CachedVenv]:
+    try:
+        entries = list(os.scandir(venvs_dir))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        # N.B.: Venvs are built in `.work` dirs and renamed into place; so only fully built venvs
+        # have a layout file.
+        venv_dir = Path(entry.path)
+        layout_file = venv_dir / _LAYOUT_FILE
+        try:
+            with layout_file.open() as fp:
+                layout = json.load(fp)
+        except (OSError, ValueError):
+            continue
+        try:
+            last_used = _last_used_file(venv_dir).stat().st_mtime
+        except OSError:
+            last_used = layout_file.stat().st_mtime
+        size = layout.get("size")
+        if not size:
+            # N.B.: Venvs built before sizes were recorded are measured once.
+            size = _tree_size(venv_dir)
+            layout["size"] = size
+            try:
+                cache.atomic_write(layout_file, json.dumps(layout).encode())
+            except OSError:
+                pass
+        yield CachedVenv(
+            dir=venv_dir,
+            last_used=last_used,
+            size=size,
+            lineage=layout.get("lineage"),
+            requirements_export=layout.get("requirements-export"),
+            cache_keys=layout.get("cache-keys"),
+        )
+
+
+def _evict(venv_dir: Path) -> bool:
+    from filelock import FileLock, Timeout
+
+    # N.B.: We never wait on a venv; one that is locked is being built or claimed for use.
+    lock = FileLock(f"{venv_dir}.lck")
+    try:
+        lock.acquire(timeout=0)
+    except Timeout:
+        return False
+    try:
+        users_dir = _users_dir(venv_dir)
+        try:
+            user_lock_files = list(users_dir.iterdir())
+        except FileNotFoundError:
+            user_lock_files = []
+        for user_lock_file in user_lock_files:
+            user_lock = FileLock(user_lock_file)
+            try:
+                user_lock.acquire(timeout=0)
+            except Timeout:
+                return False
+            # N.B.: The user exited without cleaning up after itself.
+            user_lock.release()
+            user_lock_file.unlink()
+
+        shutil.rmtree(venv_dir)
+        shutil.rmtree(users_dir, ignore_errors=True)
+        _last_used_file(venv_dir).unlink(missing_ok=True)
+        return True
+    finally:
+        lock.release()
+
+
+def _evict_abandoned_work_dirs(venvs_dir: Path) -> None:
+    from filelock import FileLock, Timeout
+
+    for work_dir in venvs_dir.glob("*.work"):
+        # N.B.: A work dir is only abandoned if no build holds its venv's lock.
+        lock = FileLock(venvs_dir / f"{work_dir.name[: -len('.work')]}.lck")
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            continue
+        try:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        finally:
+            lock.release()
+
+
+def _building(venvs_dir: Path) -> bool:
+    from filelock import FileLock, Timeout
+
+    for lock_file in venvs_dir.glob("*.lck"):
+        if (venvs_dir / lock_file.name[: -len(".lck")]).exists():
+            continue
+        lock = FileLock(lock_file)
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            return True
+        lock.release()
+    return False
+
+
+def _evict_unused_exports(exports_dir: Path, used: Container[str]) -> None:
+    from filelock import FileLock, Timeout
+
+    try:
+        lock_files = [path for path in exports_dir.iterdir() if path.name.endswith(".txt.lck")]
+    except FileNotFoundError:
+        return
+    for lock_file in lock_files:
+        export = exports_dir / lock_file.name[: -len(".lck")]
+        if export.name in used:
+            continue
+        lock = FileLock(lock_file)
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            continue
+        try:
+            export.unlink(missing_ok=True)
+        finally:
+            lock.release()
+        lock_file.unlink(missing_ok=True)
+
+
+def gc(max_size: int | None = None, max_count: int | None = None) -> tuple[CachedVenv, ...]:
+    """Evicts the least recently used venvs until the remaining venvs fit the given budgets.
+
+    Venvs in use by any running `dev-cmd` are never evicted. The work dirs of abandoned builds and
+    exported requirements no remaining venv was built from are evicted too. Returns the evicted
+    venvs.
+    """
+    cache_dir = cache.ensure_cache_dir()
+    venvs_dir = cache_dir / "venvs"
+    if venvs_dir.is_dir():
+        _evict_abandoned_work_dirs(venvs_dir)
+    cached_venvs = sorted(_iter_cached_venvs(venvs_dir), key=lambda cv: cv.last_used)
+    total_size = sum(cached_venv.size for cached_venv in cached_venvs)
+    count = len(cached_venvs)
+
+    evicted: list[CachedVenv] = []
+    for cached_venv in cached_venvs:
+        if (max_size is None or total_size <= max_size) and (
+            max_count is None or count <= max_count
+        ):
+            break
+        if cached_venv.dir in _IN_USE or not _evict(cached_venv.dir):
+            continue
+        evicted.append(cached_venv)
+        total_size -= cached_venv.size
+        count -= 1
+
+    # N.B.: A venv being built may be using an export it has not recorded yet.
+    if not _building(venvs_dir):
+        _evict_unused_exports(
+            cache_dir / "3rdparty-exports",
+            used=frozenset(
+                cached_venv.requirements_export
+                for cached_venv in cached_venvs
+                if cached_venv not in evicted and cached_venv.requirements_export
+            ),
+        )
+    return tuple(evicted)
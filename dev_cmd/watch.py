@@ -0,0 +1,291 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import re
+import struct
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from dev_cmd.model import Command
+
+DEBOUNCE = 0.2
+POLL_INTERVAL = 0.5
+
+# N.B.: Changes beneath these directories are made by tools and by `dev-cmd` itself as commands
+# run; reacting to them would re-run commands in an endless loop.
+_IGNORED_DIRS = frozenset((".dev-cmd", ".git", "__pycache__", "node_modules"))
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _ignored(name: str) -> bool:
+    return name in _IGNORED_DIRS
+
+
+def _glob_regex(glob: str) -> re.Pattern[str]:
+    # N.B.: This mirrors `glob.glob(..., recursive=True)`, which `inputs` are expanded with:
+    # wildcards do not match hidden names unless the glob component does, and a directory matched by
+    # a glob includes everything beneath it.
+    regex: list[str] = []
+    parts = glob.split("/")
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == "**":
+            regex.append(r"(?:(?!\.)[^/]+(?:/(?!\.)[^/]+)*)?" if last else r"(?:(?!\.)[^/]+/)*")
+            continue
+        if part[:1] in ("*", "?", "["):
+            regex.append(r"(?!\.)")
+        position = 0
+        while position < len(part):
+            char = part[position]
+            end = part.find("]", position + 2) if char == "[" else -1
+            if char == "*":
+                regex.append("[^/]*")
+            elif char == "?":
+                regex.append("[^/]")
+            elif end != -1:
+                chars = part[position + 1 : end]
+                if chars.startswith("!"):
+                    regex.append(f"[^{chars[1:]}]")
+                else:
+                    regex.append(f"[{chars}]")
+                position = end
+            else:
+                regex.append(re.escape(char))
+            position += 1
+        if not last:
+            regex.append("/")
+    regex.append("(?:/.*)?")
+    return re.compile("".join(regex))
+
+
+def input_matcher(commands: Iterable[Command]) -> Callable[[Path], bool]:
+    """Returns a predicate that selects the changed paths that are inputs to any of the commands."""
+    regexes: list[re.Pattern[str]] = []
+    for command in commands:
+        # N.B.: Commands that do not declare their inputs could depend on any file in the project.
+        if not command.inputs or not command.inputs.paths:
+            return lambda path: True
+        regexes.extend(_glob_regex(glob) for glob in command.inputs.paths)
+    return lambda path: any(regex.fullmatch(path.as_posix()) for regex in regexes)
+
+
+def _static_prefix(glob: str) -> Path:
+    parts: list[str] = []
+    for part in Path(glob).parts:
+        if any(char in part for char in "*?["):
+            break
+        parts.append(part)
+    return Path(*parts)
+
+
+def roots(commands: Iterable[Command], project_dir: Path) -> tuple[Path, ...]:
+    # N.B.: Commands that do not declare their inputs could depend on any file in the project.
+    candidates: set[Path] = set()
+    for command in commands:
+        if not command.inputs or not command.inputs.paths:
+            candidates.add(project_dir)
+            continue
+        for glob in command.inputs.paths:
+            root = _static_prefix(glob)
+            while not root.is_dir() and root != root.parent:
+                root = root.parent
+            candidates.add(root)
+    return tuple(
+        sorted(
+            root
+            for root in candidates
+            if not any(other != root and other in root.parents for other in candidates)
+        )
+    )
+
+
+def _walk_dirs(root: Path) -> Iterator[Path]:
+    yield root
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [dirname for dirname in dirnames if not _ignored(dirname)]
+        for dirname in dirnames:
+            yield Path(dirpath) / dirname
+
+
+def _snapshot(roots: Iterable[Path]) -> dict[Path, tuple[int, int]]:
+    snapshot: dict[Path, tuple[int, int]] = {}
+    for root in roots:
+        for directory in _walk_dirs(root):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if _ignored(entry.name) or entry.is_dir():
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                snapshot[Path(entry.path)] = stat.st_mtime_ns, stat.st_size
+    return snapshot
+
+
+@dataclass
+class Watcher:
+    """Waits for changes to files beneath a set of root directories.
+
+    On Linux, changes are observed with inotify; elsewhere, the roots are polled.
+    """
+
+    @classmethod
+    def create(
+        cls,
+        roots: Iterable[Path],
+        use_inotify: bool = True,
+        relevant: Callable[[Path], bool] | None = None,
+    ) -> Watcher:
+        watcher = cls(roots=tuple(roots), relevant=relevant or (lambda path: True))
+        watcher._start(use_inotify)
+        return watcher
+
+    roots: tuple[Path, ...]
+    relevant: Callable[[Path], bool]
+    _fd: int | None = field(default=None, init=False)
+    _watches: dict[int, Path] = field(default_factory=dict, init=False)
+    _libc: ctypes.CDLL | None = field(default=None, init=False)
+    _changed: set[Path] = field(default_factory=set, init=False)
+    _event: asyncio.Event | None = field(default=None, init=False)
+    _snapshot: dict[Path, tuple[int, int]] = field(default_factory=dict, init=False)
+
+    def _start(self, use_inotify: bool) -> None:
+        if use_inotify and sys.platform == "linux" and (libc_name := ctypes.util.find_library("c")):
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd >= 0:
+                self._libc = libc
+                self._fd = fd
+                for root in self.roots:
+                    self._add_watches(root)
+                return
+        self._snapshot = _snapshot(self.roots)
+
+    def _add_watches(self, root: Path) -> None:
+        assert self._libc is not None
+        for directory in _walk_dirs(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = directory
+            elif ctypes.get_errno() == errno.ENOSPC:
+                # N.B.: We have run out of inotify watches; the user will need to raise
+                # `fs.inotify.max_user_watches` to watch everything.
+                return
+
+    def _read_events(self) -> None:
+        assert self._fd is not None
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                self._changed.update(self.roots)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or (name and _ignored(name)):
+                continue
+            path = directory / name if name else directory
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._add_watches(path)
+                # N.B.: Files can be created in the new directory before we start watching it.
+                self._changed.update(filter(self.relevant, _snapshot([path])))
+            if self.relevant(path):
+                self._changed.add(path)
+        if self._changed and self._event:
+            self._event.set()
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            snapshot = await asyncio.to_thread(_snapshot, self.roots)
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path) and self.relevant(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                self._changed.update(changed)
+                return
+
+    async def _next_change(self) -> None:
+        if self._fd is None:
+            await self._poll()
+            return
+        assert self._event is not None
+        await self._event.wait()
+        self._event.clear()
+
+    async def wait(self) -> frozenset[Path]:
+        loop = asyncio.get_running_loop()
+        if self._fd is not None and self._event is None:
+            self._event = asyncio.Event()
+            loop.add_reader(self._fd, self._read_events)
+        try:
+            while not self._changed:
+                await self._next_change()
+            # N.B.: Editors and tools often write several files in quick succession; so we wait
+            # for changes to settle before reporting them.
+            while True:
+                seen = len(self._changed)
+                try:
+                    await asyncio.wait_for(self._next_change(), timeout=DEBOUNCE)
+                except asyncio.TimeoutError:
+                    if len(self._changed) == seen:
+                        break
+            changed = frozenset(self._changed)
+            self._changed.clear()
+            return changed
+        finally:
+            if self._fd is not None:
+                loop.remove_reader(self._fd)
+                self._event = None
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
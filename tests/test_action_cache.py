@@ -0,0 +1,143 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd.action_cache import ActionCache, CachedResult, parse_size
+from dev_cmd.console import Console
+from dev_cmd.errors import ExecutionError
+from dev_cmd.invoke import Invocation
+from dev_cmd.model import Command, Inputs
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / ".dev-cmd"
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def test_parse_size() -> None:
+    assert 42 == parse_size(42)
+    assert 42 == parse_size("42")
+    assert 2048 == parse_size("2K")
+    assert 512 * 1024 * 1024 == parse_size("512MB")
+    assert 1024**3 == parse_size("1GiB")
+    assert 1536 == parse_size("1.5kb")
+
+    with pytest.raises(ValueError):
+        parse_size(-1)
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_put_get() -> None:
+    action_cache = ActionCache.create()
+    assert action_cache.get("key") is None
+
+    action_cache.put("key", 1, b"Oops!\n")
+    assert CachedResult(returncode=1, output=b"Oops!\n") == action_cache.get("key")
+
+
+def test_evict_least_recently_used() -> None:
+    action_cache = ActionCache.create(max_size=1024)
+    for index, key in enumerate(("a", "b", "c")):
+        action_cache.put(key, 0, os.urandom(300))
+        # N.B.: Make LRU order deterministic regardless of filesystem mtime granularity.
+        os.utime(action_cache.cache_dir / key[:2] / key, (index, index))
+
+    assert action_cache.get("a") is not None
+    action_cache.put("d", 0, os.urandom(300))
+
+    assert action_cache.get("a") is not None
+    assert action_cache.get("b") is None
+    assert action_cache.get("c") is not None
+    assert action_cache.get("d") is not None
+
+
+def test_evict_only_when_over_budget(monkeypatch: MonkeyPatch) -> None:
+    action_cache = ActionCache.create(max_size=1024)
+    action_cache.put("a", 0, os.urandom(300))
+
+    walks = 0
+    walk = os.walk
+
+    def counting_walk(*args, **kwargs):
+        nonlocal walks
+        walks += 1
+        return walk(*args, **kwargs)
+
+    monkeypatch.setattr(os, "walk", counting_walk)
+    action_cache.put("b", 0, os.urandom(300))
+    action_cache.put("b", 0, os.urandom(300))
+    action_cache.put("c", 0, os.urandom(300))
+    assert 0 == walks
+
+    action_cache.put("d", 0, os.urandom(300))
+    assert 1 == walks
+    assert action_cache.get("a") is None
+    assert action_cache.get("d") is not None
+
+
+def test_max_size_zero() -> None:
+    ActionCache.create().put("key", 0, b"Cached!\n")
+
+    action_cache = ActionCache.create(max_size=0)
+    assert action_cache.get("key") is None
+    action_cache.put("other", 0, b"Not cached.\n")
+    assert action_cache.get("other") is None
+    assert ActionCache.create().get("key") is None
+    assert ActionCache.create().get("other") is None
+
+
+def test_replay(
+    monkeypatch: MonkeyPatch, tmp_path: Path, capfd: pytest.CaptureFixture[str]
+) -> None:
+    src = tmp_path / "src.txt"
+    src.write_text("42")
+    runs = tmp_path / "runs.txt"
+
+    command = Command(
+        "check",
+        args=(
+            sys.executable,
+            "-c",
+            (
+                f"import sys; open({str(runs)!r}, 'a').write('run\\n'); "
+                f"value = open({str(src)!r}).read(); print(f'checked {{value}}'); "
+                f"sys.exit(value != '42')"
+            ),
+        ),
+        inputs=Inputs(paths=(src.as_posix(),), envs=()),
+        cache=True,
+    )
+
+    def invoke() -> str:
+        invocation = Invocation.create(
+            command,
+            skips=(),
+            grace_period=1.0,
+            console=Console(quiet=True),
+            action_cache=ActionCache.create(),
+        )
+        asyncio.run(invocation.invoke())
+        return capfd.readouterr().out
+
+    assert "checked 42\n" == invoke()
+    assert "checked 42\n" == invoke()
+    assert 1 == len(runs.read_text().splitlines())
+
+    src.write_text("13")
+    for _ in range(2):
+        with pytest.raises(ExecutionError):
+            invoke()
+        assert "checked 13\n" == capfd.readouterr().out
+    assert 2 == len(runs.read_text().splitlines())
@@ -0,0 +1,73 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd import cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / ".dev-cmd"
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def test_fingerprint_file(tmp_path: Path) -> None:
+    empty = tmp_path / "empty"
+    empty.touch()
+    large = tmp_path / "large"
+    large.write_bytes(os.urandom(3 * 1024 * 1024 + 1))
+
+    for path in empty, large:
+        assert cache.fingerprint(path.read_bytes()) == cache.fingerprint_file(path)
+
+
+def test_fingerprint_files(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    hashed: list[str] = []
+    fingerprint_file = cache.fingerprint_file
+
+    def record_hash(path: str | Path) -> str:
+        hashed.append(os.path.basename(path))
+        return fingerprint_file(path)
+
+    monkeypatch.setattr(cache, "fingerprint_file", record_hash)
+
+    def write(path: Path, content: bytes) -> Path:
+        path.write_bytes(content)
+        # N.B.: Files modified just now are never indexed since a further modification might not
+        # change their stat.
+        os.utime(path, ns=(0, 0))
+        return path
+
+    a = write(tmp_path / "a", b"a")
+    b = write(tmp_path / "b", b"b")
+    c = write(tmp_path / "c", os.urandom(1024 * 1024))
+    d = write(tmp_path / "d", os.urandom(1024 * 1024))
+
+    def expected_fingerprints(*paths: Path) -> list[str]:
+        return [cache.fingerprint(path.read_bytes()) for path in paths]
+
+    assert expected_fingerprints(a, b, c, d) == cache.fingerprint_files([a, b, c, d])
+    assert ["a", "b", "c", "d"] == sorted(hashed)
+
+    hashed.clear()
+    assert expected_fingerprints(d, b) == cache.fingerprint_files([d, b])
+    assert [] == hashed
+
+    write(b, b"B")
+    assert expected_fingerprints(a, b) == cache.fingerprint_files([a, b])
+    assert ["b"] == hashed
+
+    hashed.clear()
+    recent = tmp_path / "recent"
+    recent.write_bytes(b"recent")
+    assert expected_fingerprints(recent) == cache.fingerprint_files([recent])
+    assert expected_fingerprints(recent) == cache.fingerprint_files([recent])
+    assert ["recent", "recent"] == hashed
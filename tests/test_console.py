@@ -0,0 +1,87 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd import console
+from dev_cmd.console import Console
+
+
+def test_ordering(capsys: pytest.CaptureFixture[str]) -> None:
+    async def emit() -> None:
+        for index in range(100):
+            await Console().aprint(index)
+            await Console().aprint(f"err {index}", use_stderr=True)
+        await Console(quiet=True).aprint("quiet")
+        await Console(quiet=True).aprint("forced", force=True)
+
+    asyncio.run(emit())
+    Console().print("done")
+
+    captured = capsys.readouterr()
+    assert "".join(f"{index}\n" for index in range(100)) + "forced\ndone\n" == captured.out
+    assert "".join(f"err {index}\n" for index in range(100)) == captured.err
+
+
+class BlockedStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblocked = threading.Event()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.unblocked.wait()
+        self.writes += 1
+        return super().write(text)
+
+
+def test_slow_stream(monkeypatch: MonkeyPatch) -> None:
+    stdout = BlockedStream()
+    monkeypatch.setattr("sys.stdout", stdout)
+
+    async def emit() -> None:
+        for index in range(100):
+            await Console().aprint(index)
+
+    asyncio.run(asyncio.wait_for(emit(), timeout=5.0))
+    assert "" == stdout.getvalue()
+
+    stdout.unblocked.set()
+    console.flush()
+    assert "".join(f"{index}\n" for index in range(100)) == stdout.getvalue()
+    assert stdout.writes < 100
+
+
+def test_backlog_bounded(monkeypatch: MonkeyPatch) -> None:
+    stdout = BlockedStream()
+    monkeypatch.setattr("sys.stdout", stdout)
+
+    chunk = "x" * (console._MAX_PENDING * 3 // 4)
+    emitted = threading.Event()
+
+    def emit() -> None:
+        async def aprint_chunks() -> None:
+            # N.B.: The writer thread may grab either the 1st or the 1st and 2nd chunks before
+            # blocking on the stream; either way the remaining chunks exceed the bound.
+            for _ in range(4):
+                await Console().aprint(chunk, end="")
+
+        asyncio.run(aprint_chunks())
+        emitted.set()
+
+    thread = threading.Thread(target=emit, daemon=True)
+    thread.start()
+    assert not emitted.wait(timeout=0.5)
+
+    stdout.unblocked.set()
+    thread.join(timeout=5.0)
+    assert emitted.is_set()
+    console.flush()
+    assert chunk * 4 == stdout.getvalue()
@@ -0,0 +1,95 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from textwrap import dedent
+from typing import Iterator
+
+import pytest
+
+from dev_cmd import daemon
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="The dev-cmd daemon is only supported on POSIX systems."
+)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "pyproject.toml").write_text(
+        dedent(
+            """\
+            [tool.dev-cmd.commands]
+            ppid = ["python", "-c", "import os, sys; print(os.getppid()); sys.exit(42)"]
+            """
+        )
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def env() -> dict[str, str]:
+    env = {**os.environ, daemon.ENV_VAR: "1"}
+    env.pop("DEV_CMD_WORKSPACE_CACHE_DIR", None)
+    env["PYTHONPATH"] = os.pathsep.join(
+        (str(Path(daemon.__file__).parent.parent), *filter(None, [env.get("PYTHONPATH")]))
+    )
+    return env
+
+
+@pytest.fixture
+def server(project: Path, env: dict[str, str]) -> Iterator[subprocess.Popen[bytes]]:
+    process = subprocess.Popen([sys.executable, "-m", "dev_cmd.daemon"], cwd=project, env=env)
+    socket = project / ".dev-cmd" / "daemon.sock"
+    try:
+        deadline = time.monotonic() + 30
+        while not socket.exists():
+            assert process.poll() is None, "The daemon exited before it started listening."
+            assert time.monotonic() < deadline, "The daemon never started listening."
+            time.sleep(0.1)
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run_client(project: Path, env: dict[str, str], *args: str) -> tuple[int, int, str]:
+    client = subprocess.Popen(
+        [sys.executable, "-m", "dev_cmd", *args],
+        cwd=project,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    output, _ = client.communicate()
+    return client.pid, client.returncode, output
+
+
+def test_forwarded(project: Path, env: dict[str, str], server: subprocess.Popen[bytes]) -> None:
+    client_pid, returncode, output = run_client(project, env, "ppid")
+    assert 1 == returncode
+    assert "returned non-zero exit status 42" in output
+
+    # N.B.: The command is run by a child of the daemon and not by the client.
+    ppid = int(output.splitlines()[1])
+    assert client_pid != ppid
+
+    (project / "pyproject.toml").write_text(
+        dedent(
+            """\
+            [tool.dev-cmd.commands]
+            hello = ["python", "-c", "print('Hello!')"]
+            """
+        )
+    )
+    _, returncode, output = run_client(project, env, "hello")
+    assert 0 == returncode, output
+    assert "Hello!" in output
+    assert server.poll() is None
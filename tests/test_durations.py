@@ -0,0 +1,54 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd.durations import Durations
+from dev_cmd.model import Command, Group, Task
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / ".dev-cmd"
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def test_estimate() -> None:
+    a = Command("a", args=("a",))
+    b = Command("b", args=("b",))
+    c = Command("c", args=("c",))
+    durations = Durations(path=Path("unused"), history={"a": 1.0, "b": 2.0, "c": 4.0})
+
+    assert 2.0 == durations.estimate(b)
+    assert 0.0 == durations.estimate(b, skips=["b"])
+    assert 0.0 == durations.estimate(Command("d", args=("d",)))
+
+    assert 7.0 == durations.estimate(Task("serial", steps=Group(members=(a, b, c))))
+    assert 4.0 == durations.estimate(Task("parallel", steps=Group(members=(Group((a, b, c)),))))
+    assert 3.0 == durations.estimate(
+        Task("mixed", steps=Group(members=(a, Group(members=(b, c))))), skips=["c"]
+    )
+
+
+def test_record_save_load() -> None:
+    a = Command("a", args=("a",))
+    b = Command("b", args=("b",))
+
+    durations = Durations.load()
+    assert {} == durations.history
+    durations.record(a, 2.0)
+    durations.record(a, 4.0)
+    assert 3.0 == durations.estimate(a)
+
+    other = Durations.load()
+    other.record(b, 1.0)
+    other.save()
+
+    durations.save()
+    assert {"a": 3.0, "b": 1.0} == Durations.load().history
@@ -0,0 +1,184 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from filelock import FileLock
+from pytest import MonkeyPatch
+
+from dev_cmd.console import Console
+from dev_cmd.history import History, Kind, Record, Summary, new_run_id, percentile
+from dev_cmd.invoke import Invocation
+from dev_cmd.model import Command, Group, Rusage, Task
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / ".dev-cmd"
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def test_percentile() -> None:
+    durations = [float(duration) for duration in range(1, 21)]
+    assert 10.0 == percentile(durations, 50)
+    assert 19.0 == percentile(durations, 95)
+    assert 20.0 == percentile(durations, 100)
+    assert 1.0 == percentile([1.0], 95)
+
+
+def test_new_run_id() -> None:
+    run_ids = [new_run_id() for _ in range(100)]
+    assert run_ids == sorted(run_ids)
+    assert len(run_ids) == len(set(run_ids))
+
+
+def test_record_round_trip() -> None:
+    record = Record(
+        run="1",
+        kind=Kind.COMMAND,
+        name="type-check-py3.9",
+        start=1.0,
+        end=3.5,
+        exit_code=0,
+        python="3.9",
+        factors="py3.9",
+        rusage=Rusage(
+            user=1.5,
+            system=0.25,
+            max_rss=1024,
+            blocks_in=1,
+            blocks_out=2,
+            voluntary_switches=3,
+            involuntary_switches=4,
+        ),
+    )
+    assert record == Record.from_json(record.to_json())
+    assert 2.5 == record.duration
+    assert Record.from_json("{") is None
+
+
+def test_summarize() -> None:
+    history = History.create(run_id="1")
+
+    def append(kind: Kind, name: str, duration: float, exit_code: int = 0) -> None:
+        history.append(
+            Record(
+                run=history.run_id,
+                kind=kind,
+                name=name,
+                start=0.0,
+                end=duration,
+                exit_code=exit_code,
+            )
+        )
+
+    for duration in (1.0, 2.0, 3.0, 4.0):
+        append(Kind.COMMAND, "test", duration)
+    append(Kind.COMMAND, "test", 0.1, exit_code=1)
+    append(Kind.TASK, "checks", 5.0)
+
+    assert [
+        Summary(
+            kind=Kind.COMMAND,
+            name="test",
+            runs=5,
+            failures=1,
+            p50=2.0,
+            p95=4.0,
+            max=4.0,
+            trend=(3.0, 4.0),
+        ),
+        Summary(
+            kind=Kind.TASK,
+            name="checks",
+            runs=1,
+            failures=0,
+            p50=5.0,
+            p95=5.0,
+            max=5.0,
+            trend=(5.0,),
+        ),
+    ] == history.summarize(trend_runs=2)
+
+    assert ["checks"] == [summary.name for summary in history.summarize(2, names=["checks"])]
+
+    append(Kind.COMMAND, "lint", 1.0, exit_code=1)
+    (lint,) = history.summarize(trend_runs=2, names=["lint"])
+    assert math.isnan(lint.p50)
+    assert () == lint.trend
+
+
+def test_compact() -> None:
+    history = History.create(run_id="1")
+    for index in range(10):
+        history.append(
+            Record(run=str(index), kind=Kind.COMMAND, name="test", start=0.0, end=1.0, exit_code=0)
+        )
+    history.compact()
+    assert [str(index) for index in range(5, 10)] == [record.run for record in history.records()]
+
+
+def test_compact_locked() -> None:
+    history = History.create(run_id="1")
+    records = [
+        Record(run=str(index), kind=Kind.COMMAND, name="test", start=0.0, end=1.0, exit_code=0)
+        for index in range(4)
+    ]
+    for record in records[:2]:
+        history.append(record)
+
+    # N.B.: A concurrent run appending must wait for a compaction in progress and vice versa.
+    lock = FileLock(f"{history.path}.lck")
+    with lock:
+        appender = threading.Thread(target=history.append, args=(records[2],))
+        compactor = threading.Thread(target=history.compact)
+        appender.start()
+        compactor.start()
+        time.sleep(0.1)
+        assert appender.is_alive()
+        assert compactor.is_alive()
+    appender.join()
+    compactor.join()
+
+    history.append(records[3])
+    assert ["1", "2", "3"] == [record.run for record in history.records()]
+
+
+def test_invocation_records() -> None:
+    ok = Command("ok", args=(sys.executable, "-c", "pass"))
+    factored = Command(
+        "check-py3.12", args=(sys.executable, "-c", "pass"), base=Command("check", args=())
+    )
+    task = Task("checks", steps=Group(members=(ok, factored)))
+
+    history = History.create(run_id="1")
+    invocation = Invocation.create(
+        task, skips=(), grace_period=1.0, console=Console(quiet=True), history=history
+    )
+    asyncio.run(invocation.invoke())
+
+    assert [
+        ("1", Kind.COMMAND, "ok", 0, None),
+        ("1", Kind.COMMAND, "check-py3.12", 0, "py3.12"),
+        ("1", Kind.TASK, "checks", 0, None),
+    ] == [
+        (record.run, record.kind, record.name, record.exit_code, record.factors)
+        for record in history.records()
+    ]
+
+    for record in history.records():
+        if record.kind is Kind.COMMAND and hasattr(os, "wait4"):
+            assert record.rusage is not None
+            assert record.rusage.max_rss > 0
+        else:
+            assert record.rusage is None
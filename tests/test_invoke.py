@@ -0,0 +1,334 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+import colors
+import pytest
+
+from dev_cmd.console import Console
+from dev_cmd.durations import Durations
+from dev_cmd.errors import ExecutionError, InvalidModelError
+from dev_cmd.invoke import Invocation
+from dev_cmd.model import Command, ExitStyle, Group, OutputStyle, StepNames, Task
+
+
+def span_command(name: str, spans: Path, duration: float = 0.1) -> Command:
+    return Command(
+        name,
+        args=(
+            sys.executable,
+            "-c",
+            dedent(
+                f"""\
+                import time
+
+                start = time.time()
+                time.sleep({duration})
+                with open({str(spans)!r}, "a") as fp:
+                    fp.write(f"{name} {{start}} {{time.time()}}\\n")
+                """
+            ),
+        ),
+    )
+
+
+def read_spans(spans: Path) -> dict[str, tuple[float, float]]:
+    result: dict[str, tuple[float, float]] = {}
+    for line in spans.read_text().splitlines():
+        name, start, end = line.split()
+        result[name] = float(start), float(end)
+    return result
+
+
+def test_jobs_bound_parallel_groups(tmp_path: Path) -> None:
+    spans = tmp_path / "spans.txt"
+    task = Task(
+        "checks",
+        steps=Group(
+            members=(
+                Group(
+                    members=(
+                        span_command("a", spans),
+                        span_command("b", spans),
+                        Group(members=(span_command("c", spans), span_command("d", spans))),
+                    )
+                ),
+            )
+        ),
+    )
+    invocation = Invocation.create(
+        task, skips=(), grace_period=1.0, console=Console(quiet=True), jobs=1
+    )
+    asyncio.run(invocation.invoke())
+
+    intervals = sorted(read_spans(spans).values())
+    assert 4 == len(intervals)
+    for (_, previous_end), (next_start, _) in zip(intervals, intervals[1:]):
+        assert previous_end <= next_start, "Expected no two commands to run at the same time."
+
+
+def test_streamed_output(capfd: pytest.CaptureFixture[str]) -> None:
+    chatty = Command(
+        "chatty",
+        args=(
+            sys.executable,
+            "-c",
+            "import sys; sys.stdout.write('line 1\\nline 2\\npartial'); sys.stdout.flush()",
+        ),
+    )
+    quiet = Command("quiet", args=(sys.executable, "-c", "pass"))
+    invocation = Invocation.create(
+        chatty,
+        quiet,
+        skips=(),
+        grace_period=1.0,
+        console=Console(quiet=True),
+        output_style=OutputStyle.STREAMED,
+    )
+    asyncio.run(invocation.invoke_parallel())
+
+    assert [
+        "dev-cmd chatty] line 1",
+        "dev-cmd chatty] line 2",
+        "dev-cmd chatty] partial",
+    ] == colors.strip_color(capfd.readouterr().err).splitlines()
+
+
+def test_needs_start_commands_as_soon_as_their_needs_succeed(tmp_path: Path) -> None:
+    spans = tmp_path / "spans.txt"
+    fmt = span_command("fmt", spans, duration=0.1)
+    lint = span_command("lint", spans, duration=1.0)
+    test = dataclasses.replace(span_command("test", spans, duration=0.1), needs=("fmt",))
+    checks = Task("checks", steps=Group(members=(Group(members=(fmt, lint, test)),)))
+
+    invocation = Invocation.create(checks, skips=(), grace_period=1.0, console=Console(quiet=True))
+    assert invocation.has_needs()
+    asyncio.run(invocation.invoke_dag())
+
+    intervals = read_spans(spans)
+    assert intervals["fmt"][1] <= intervals["test"][0]
+    assert intervals["test"][1] < intervals["lint"][1]
+
+
+def test_needs_skip_dependents_of_failures(tmp_path: Path) -> None:
+    spans = tmp_path / "spans.txt"
+    fail = Command("fail", args=(sys.executable, "-c", "raise SystemExit(42)"))
+    dependent = dataclasses.replace(span_command("dependent", spans), needs=("fail",))
+    independent = span_command("independent", spans)
+
+    invocation = Invocation.create(
+        fail, dependent, independent, skips=(), grace_period=1.0, console=Console(quiet=True)
+    )
+    with pytest.raises(ExecutionError) as exc_info:
+        asyncio.run(invocation.invoke_dag(parallel=True, exit_style=ExitStyle.END))
+    assert 42 == exc_info.value.exit_code
+    assert ["independent"] == list(read_spans(spans))
+
+
+def test_needs_cycle(tmp_path: Path) -> None:
+    a = Command("a", args=("true",), needs=("b",))
+    b = Command("b", args=("true",), needs=("a",))
+
+    invocation = Invocation.create(a, b, skips=(), grace_period=1.0)
+    with pytest.raises(
+        InvalidModelError,
+        match=r"The `needs` of the following commands form a cycle or depend on one: a b",
+    ):
+        invocation.has_needs(parallel=True)
+
+
+def test_needs_unknown() -> None:
+    test = Command("test", args=("true",), needs=("fmt",))
+
+    invocation = Invocation.create(test, skips=(), grace_period=1.0, known_names={"fmt", "test"})
+    assert not invocation.has_needs()
+
+    invocation = Invocation.create(test, skips=(), grace_period=1.0, known_names={"test"})
+    with pytest.raises(
+        InvalidModelError,
+        match=(
+            r"The command 'test' needs 'fmt' which is not the name of a defined command or "
+            r"task\."
+        ),
+    ):
+        invocation.has_needs()
+
+
+def test_needs_unknown_factored() -> None:
+    step_names = StepNames(
+        names=frozenset(("test", "type-check")),
+        command_factor_names={"type-check": frozenset(("py",))},
+    )
+
+    test = Command("test", args=("true",), needs=("type-check-py3.12",))
+    invocation = Invocation.create(test, skips=(), grace_period=1.0, known_names=step_names)
+    assert not invocation.has_needs()
+
+    test = Command("test", args=("true",), needs=("type-check-typo",))
+    invocation = Invocation.create(test, skips=(), grace_period=1.0, known_names=step_names)
+    with pytest.raises(
+        InvalidModelError,
+        match=(
+            r"The command 'test' needs 'type-check-typo' which is not the name of a defined "
+            r"command or task\."
+        ),
+    ):
+        invocation.has_needs()
+
+
+def test_longest_first(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(tmp_path / ".dev-cmd"))
+    spans = tmp_path / "spans.txt"
+    fast = span_command("fast", spans)
+    slow = span_command("slow", spans)
+
+    durations = Durations.load()
+    durations.record(slow, 60.0)
+    invocation = Invocation.create(
+        fast,
+        slow,
+        skips=(),
+        grace_period=1.0,
+        console=Console(quiet=True),
+        jobs=1,
+        durations=durations,
+    )
+    asyncio.run(invocation.invoke_parallel())
+
+    intervals = read_spans(spans)
+    assert intervals["slow"][1] <= intervals["fast"][0]
+    assert 60.0 > durations.estimate(slow)
+    assert durations.estimate(fast) > 0.0
+
+
+def test_dedup_commands(tmp_path: Path) -> None:
+    spans = tmp_path / "spans.txt"
+    fmt = span_command("fmt", spans)
+    lint = span_command("lint", spans)
+    checks = Task("checks", steps=Group(members=(fmt, lint)))
+    ci = Task("ci", steps=Group(members=(Group(members=(fmt, checks)),)))
+
+    invocation = Invocation.create(fmt, ci, skips=(), grace_period=1.0, console=Console(quiet=True))
+    asyncio.run(invocation.invoke())
+    assert ["fmt", "lint"] == [line.split()[0] for line in spans.read_text().splitlines()]
+
+    spans.unlink()
+    invocation = Invocation.create(
+        ci, checks, skips=(), grace_period=1.0, console=Console(quiet=True)
+    )
+    asyncio.run(invocation.invoke_parallel())
+    assert ["fmt", "lint"] == [line.split()[0] for line in spans.read_text().splitlines()]
+
+
+def test_dedup_failures(tmp_path: Path) -> None:
+    spans = tmp_path / "spans.txt"
+    fail = Command(
+        "fail",
+        args=(
+            sys.executable,
+            "-c",
+            f"open({str(spans)!r}, 'a').write('fail 0 0\\n'); raise SystemExit(42)",
+        ),
+    )
+    checks = Task("checks", steps=Group(members=(fail,)))
+
+    ok = Command("ok", args=(sys.executable, "-c", "pass"))
+    ci = Task("ci", steps=Group(members=(fail, ok)))
+
+    invocation = Invocation.create(
+        fail, checks, skips=(), grace_period=1.0, console=Console(quiet=True)
+    )
+    with pytest.raises(ExecutionError) as exc_info:
+        asyncio.run(invocation.invoke(exit_style=ExitStyle.END))
+    assert "fail" == exc_info.value.step_name
+    assert ["fail"] == list(read_spans(spans))
+
+    spans.unlink()
+    invocation = Invocation.create(
+        fail, checks, ci, skips=(), grace_period=1.0, console=Console(quiet=True)
+    )
+    with pytest.raises(ExecutionError) as exc_info:
+        asyncio.run(invocation.invoke_parallel(exit_style=ExitStyle.END))
+    assert "fail" == exc_info.value.step_name
+    assert ["fail"] == list(read_spans(spans))
+
+
+def test_needs_repeated_commands() -> None:
+    a = Command("a", args=("true",))
+    b = Command("b", args=("true",))
+    checks = Task("checks", steps=Group(members=(a, b)))
+    reversed_checks = Task("reversed-checks", steps=Group(members=(b, a)))
+
+    invocation = Invocation.create(checks, a, reversed_checks, skips=(), grace_period=1.0)
+    assert not invocation.has_needs()
+
+    c = Command("c", args=("true",), needs=("a",))
+    invocation = Invocation.create(checks, a, c, skips=(), grace_period=1.0)
+    assert invocation.has_needs()
+
+
+def test_locks(tmp_path: Path) -> None:
+    spans = tmp_path / "spans.txt"
+    fmt = dataclasses.replace(span_command("fmt", spans, duration=0.3), locks=("src",))
+    lint = dataclasses.replace(span_command("lint", spans, duration=0.3), locks=("src",))
+    type_check = dataclasses.replace(
+        span_command("type-check", spans, duration=0.3), shared_locks=("src",)
+    )
+    test = dataclasses.replace(span_command("test", spans, duration=0.3), shared_locks=("src",))
+    other = span_command("other", spans, duration=0.3)
+
+    invocation = Invocation.create(
+        fmt, lint, type_check, test, other, skips=(), grace_period=1.0, console=Console(quiet=True)
+    )
+    asyncio.run(invocation.invoke_parallel())
+
+    intervals = read_spans(spans)
+
+    def overlap(a: str, b: str) -> bool:
+        return intervals[a][0] < intervals[b][1] and intervals[b][0] < intervals[a][1]
+
+    assert not overlap("fmt", "lint")
+    for exclusive in ("fmt", "lint"):
+        for shared in ("type-check", "test"):
+            assert not overlap(exclusive, shared)
+    assert overlap("type-check", "test")
+    assert overlap("fmt", "other")
+
+
+def test_timeout(capfd: pytest.CaptureFixture[str]) -> None:
+    hang = Command(
+        "hang",
+        args=(
+            sys.executable,
+            "-c",
+            "import sys, time; print('started', flush=True); time.sleep(60)",
+        ),
+        timeout=0.5,
+    )
+    quick = Command("quick", args=(sys.executable, "-c", "pass"), timeout=0.5)
+
+    for invoke in (
+        lambda invocation: invocation.invoke(),
+        lambda invocation: invocation.invoke_parallel(),
+    ):
+        invocation = Invocation.create(quick, hang, skips=(), grace_period=0.5, console=Console())
+        with pytest.raises(ExecutionError) as exc_info:
+            asyncio.run(invoke(invocation))
+        assert "hang" == exc_info.value.step_name
+        assert exc_info.value.message.endswith("timed out after 0.50s")
+        captured = capfd.readouterr()
+        assert "started" in captured.out + captured.err
+
+    invocation = Invocation.create(
+        hang, skips=(), grace_period=0.0, console=Console(quiet=True), timeout=0.2
+    )
+    with pytest.raises(ExecutionError) as exc_info:
+        asyncio.run(invocation.invoke())
+    assert exc_info.value.message.endswith("timed out after 0.20s")
@@ -0,0 +1,35 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from dev_cmd import jobs
+
+
+def test_parse_jobs() -> None:
+    assert 3 == jobs.parse_jobs("3")
+    assert 1 == jobs.parse_jobs(1)
+    assert jobs.available_cpu_count() == jobs.parse_jobs("auto")
+
+    with pytest.raises(ValueError):
+        jobs.parse_jobs("0")
+    with pytest.raises(ValueError):
+        jobs.parse_jobs("many")
+
+
+def test_available_cpu_count_cgroup_v1_quota(tmp_path: Path) -> None:
+    cpu_dir = tmp_path / "cpu"
+    cpu_dir.mkdir()
+    (cpu_dir / "cpu.cfs_quota_us").write_text("50000\n")
+    (cpu_dir / "cpu.cfs_period_us").write_text("100000\n")
+    assert 1 == jobs.available_cpu_count(cgroup_root=tmp_path)
+
+    (cpu_dir / "cpu.cfs_quota_us").write_text("-1\n")
+    assert (
+        len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    ) == jobs.available_cpu_count(cgroup_root=tmp_path)
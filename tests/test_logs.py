@@ -0,0 +1,126 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd.console import Console
+from dev_cmd.errors import ExecutionError
+from dev_cmd.invoke import Invocation
+from dev_cmd.logs import Logs, tail
+from dev_cmd.model import Command
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / ".dev-cmd"
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def run_ids(cache_dir: Path) -> list[str]:
+    return sorted(path.name for path in (cache_dir / "logs").iterdir() if path.is_dir())
+
+
+def test_prune(cache_dir: Path) -> None:
+    for run_id in ("1", "2", "3"):
+        (cache_dir / "logs" / run_id).mkdir(parents=True)
+
+    logs = Logs.create("4", keep_runs=3)
+    assert ["2", "3"] == run_ids(cache_dir)
+
+    logs.path(Command("test", args=()))
+    Logs.create("5", keep_runs=3)
+    assert ["3", "4"] == run_ids(cache_dir)
+
+
+def test_prune_skips_active_runs(cache_dir: Path) -> None:
+    active = Logs.create("1")
+    active.path(Command("test", args=()))
+    (cache_dir / "logs" / "2").mkdir()
+
+    Logs.create("3", keep_runs=1)
+    assert ["1"] == run_ids(cache_dir)
+
+    active.lock.release()
+    Logs.create("4", keep_runs=1)
+    assert [] == run_ids(cache_dir)
+    assert [] == list((cache_dir / "logs").iterdir())
+
+
+def test_tail(tmp_path: Path) -> None:
+    log = tmp_path / "log"
+
+    log.write_bytes(b"")
+    assert (b"", False) == tail(log, 2)
+
+    log.write_bytes(b"1\n2\n")
+    assert (b"1\n2\n", False) == tail(log, 2)
+
+    log.write_bytes(b"1\n2\n3")
+    assert (b"2\n3", True) == tail(log, 2)
+
+    lines = [f"{line}\n".encode() for line in range(100_000)]
+    log.write_bytes(b"".join(lines))
+    assert (b"".join(lines[-3:]), True) == tail(log, 3)
+    assert (b"".join(lines), False) == tail(log, len(lines))
+
+
+def test_spooled_output(cache_dir: Path, capfd: pytest.CaptureFixture[str]) -> None:
+    chatty = Command(
+        "chatty",
+        args=(
+            sys.executable,
+            "-c",
+            "import sys; "
+            "print('out' * 10_000, flush=True); "
+            "print('err', file=sys.stderr); "
+            "sys.exit(3)",
+        ),
+    )
+    quiet = Command("quiet", args=(sys.executable, "-c", "print('done')"))
+
+    invocation = Invocation.create(
+        chatty, quiet, skips=(), grace_period=1.0, console=Console(), logs=Logs.create("1")
+    )
+    with pytest.raises(ExecutionError) as exc_info:
+        asyncio.run(invocation.invoke_parallel())
+    assert "chatty" == exc_info.value.step_name
+
+    run_dir = cache_dir / "logs" / "1"
+    assert f"{'out' * 10_000}\nerr\n" == (run_dir / "chatty.log").read_text()
+    assert "done\n" == (run_dir / "quiet.log").read_text()
+
+    err = capfd.readouterr().err
+    assert "out" * 10_000 in err
+    assert "done" in err
+
+
+def test_failed_output_tail(cache_dir: Path, capfd: pytest.CaptureFixture[str]) -> None:
+    chatty = Command(
+        "chatty",
+        args=(
+            sys.executable,
+            "-c",
+            "import sys; [print(line) for line in range(1_000)]; sys.exit(1)",
+        ),
+    )
+    invocation = Invocation.create(
+        chatty, skips=(), grace_period=1.0, console=Console(), logs=Logs.create("1")
+    )
+    with pytest.raises(ExecutionError):
+        asyncio.run(invocation.invoke_parallel())
+
+    log = cache_dir / "logs" / "1" / "chatty.log"
+    assert "".join(f"{line}\n" for line in range(1_000)) == log.read_text()
+
+    err = capfd.readouterr().err
+    assert f"the full log is at {log}" in err
+    assert "".join(f"{line}\n" for line in range(950, 1_000)) in err
+    assert "\n949\n" not in err
@@ -0,0 +1,52 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from dev_cmd import memo
+
+
+def test_memoize(tmp_path: Path) -> None:
+    config = tmp_path / "config"
+    config.write_text("1")
+
+    computed: list[str] = []
+
+    def compute() -> str:
+        computed.append(config.read_text())
+        return computed[-1]
+
+    def lookup() -> str:
+        return memo.memoize(("test", str(config)), memo.stat_stamp([config]), compute)
+
+    assert "1" == lookup()
+    assert "1" == lookup()
+    assert ["1"] == computed
+
+    config.write_text("22")
+    assert "22" == lookup()
+    assert ["1", "22"] == computed
+
+    assert ("test", str(config)) in memo.updates()
+
+
+def test_tree_stamp(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.py").write_text("a")
+    stamp = memo.tree_stamp([src])
+    assert stamp == memo.tree_stamp([src])
+
+    (src / "pkg").mkdir()
+    assert stamp != memo.tree_stamp([src])
+
+    stamp = memo.tree_stamp([src])
+    (src / "pkg" / "b.py").write_text("b")
+    assert stamp != memo.tree_stamp([src])
+
+    stamp = memo.tree_stamp([src])
+    os.utime(src / "a.py", ns=(0, 0))
+    assert stamp != memo.tree_stamp([src])
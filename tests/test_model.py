@@ -5,7 +5,7 @@ import pytest
 
 from dev_cmd.errors import InvalidArgumentError, InvalidModelError
 from dev_cmd.invoke import Invocation
-from dev_cmd.model import Command
+from dev_cmd.model import Command, Rusage
 
 
 def test_invocation_create_no_extra_args():
@@ -55,3 +55,16 @@ def test_invocation_create_multiple_extra_args():
 
     invocation = Invocation.create(foo, bar, skips=["foo"], grace_period=1.0)
     assert tuple([bar]) == invocation.steps
+
+
+def test_render() -> None:
+    rusage = Rusage(
+        user=1.25,
+        system=0.5,
+        max_rss=3 * 1024 * 1024,
+        blocks_in=8,
+        blocks_out=16,
+        voluntary_switches=10,
+        involuntary_switches=2,
+    )
+    assert "user 1.250s sys 0.500s rss 3.0MiB io 8/16 blocks ctx 10/2" == rusage.render()
@@ -12,7 +12,8 @@ import pytest
 from packaging.markers import Marker
 
 from dev_cmd.errors import InvalidModelError
-from dev_cmd.model import Command, Configuration, Group, Task
+from dev_cmd.jobs import available_cpu_count
+from dev_cmd.model import Admission, Command, Configuration, Group, Inputs, Installer, Task
 from dev_cmd.parse import parse_dev_config
 from dev_cmd.placeholder import Environment
 from dev_cmd.project import PyProjectToml
@@ -233,3 +234,374 @@ def test_discard_empty(parse_config: ConfigurationParser) -> None:
         )
         == parse_config(config, "example-warnings_as_errors").commands
     )
+
+
+def test_jobs(parse_config: ConfigurationParser) -> None:
+    config = dedent(
+        """
+        [tool.dev-cmd]
+        jobs = {jobs}
+
+        [tool.dev-cmd.commands]
+        example = ["python", "-V"]
+        """
+    )
+    assert 2 == parse_config(config.format(jobs="2")).jobs
+    assert available_cpu_count() == parse_config(config.format(jobs='"auto"')).jobs
+
+    for bad_jobs in "0", "true", '"many"':
+        with pytest.raises(
+            InvalidModelError, match=r"Expected \[tool.dev-cmd\] `jobs` to be a positive integer"
+        ):
+            parse_config(config.format(jobs=bad_jobs))
+
+
+def test_needs(parse_config: ConfigurationParser) -> None:
+    config = parse_config(
+        dedent(
+            """
+            [tool.dev-cmd.commands]
+            fmt = ["ruff", "format"]
+            lint = ["ruff", "check", "--fix"]
+            type-check = ["mypy", "--python-version", "{-py:3.13}"]
+
+            [tool.dev-cmd.commands.test]
+            args = ["pytest"]
+            needs = ["fmt", "type-check-py3.{12,13}"]
+
+            [tool.dev-cmd.tasks.checks]
+            steps = [["lint", "test"]]
+            needs = ["fmt"]
+            """
+        )
+    )
+    assert ("fmt", "type-check-py3.12", "type-check-py3.13") == next(
+        command.needs for command in config.commands if command.name == "test"
+    )
+    assert ("fmt",) == config.tasks[0].needs
+    assert config.step_names is not None
+    assert "type-check-py3.12" in config.step_names
+    assert "type-check-py3.13" in config.step_names
+    assert "type-check-typo" not in config.step_names
+    assert "test" in config.step_names
+    assert "missing" not in config.step_names
+
+
+def test_needs_invalid(parse_config: ConfigurationParser) -> None:
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd.commands.test] `needs` entry 'fmt' is not the name of a defined "
+            "command or task."
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands.test]
+                args = ["pytest"]
+                needs = ["fmt"]
+                """
+            )
+        )
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape("The [tool.dev-cmd.commands.test] `needs` list cannot include itself."),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands.test]
+                args = ["pytest"]
+                needs = ["test"]
+                """
+            )
+        )
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd.commands.test] `needs` entry 'type-check-typo' is not the name of a "
+            "defined command or task."
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands]
+                type-check = ["mypy", "--python-version", "{-py:3.13}"]
+
+                [tool.dev-cmd.commands.test]
+                args = ["pytest"]
+                needs = ["type-check-typo"]
+                """
+            )
+        )
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd.commands.test] `needs` entry 'fmt-typo' is not the name of a "
+            "defined command or task."
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands]
+                fmt = ["ruff", "format"]
+
+                [tool.dev-cmd.commands.test]
+                args = ["pytest"]
+                needs = ["fmt-typo"]
+                """
+            )
+        )
+
+
+def test_inputs(tmp_path: Path, parse_config: ConfigurationParser) -> None:
+    config = parse_config(
+        dedent(
+            """
+            [tool.dev-cmd.commands.gen]
+            args = ["gen"]
+            inputs = ["src/**/*.py", {env = "GEN_MODE"}, {path = "gen.cfg"}]
+            outputs = ["out"]
+            """
+        )
+    )
+    assert (
+        Command(
+            "gen",
+            args=("gen",),
+            inputs=Inputs(
+                paths=((tmp_path / "src/**/*.py").as_posix(), (tmp_path / "gen.cfg").as_posix()),
+                envs=("GEN_MODE",),
+            ),
+            outputs=((tmp_path / "out").as_posix(),),
+        ),
+    ) == config.commands
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape("The [tool.dev-cmd.commands.gen] table defines `outputs` but no `inputs`."),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands.gen]
+                args = ["gen"]
+                outputs = ["out"]
+                """
+            )
+        )
+
+
+def test_cache(tmp_path: Path, parse_config: ConfigurationParser) -> None:
+    config = parse_config(
+        dedent(
+            """
+            [tool.dev-cmd]
+            action-cache-max-size = "64MB"
+
+            [tool.dev-cmd.commands.check]
+            args = ["check"]
+            inputs = ["src"]
+            cache = true
+            """
+        )
+    )
+    assert 64 * 1024 * 1024 == config.action_cache_max_size
+    assert (
+        Command(
+            "check",
+            args=("check",),
+            inputs=Inputs(paths=((tmp_path / "src").as_posix(),), envs=()),
+            cache=True,
+        ),
+    ) == config.commands
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd.commands.check] table sets `cache = true` but does not declare its "
+            "`inputs`."
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands.check]
+                args = ["check"]
+                cache = true
+                """
+            )
+        )
+
+
+def test_admission(parse_config: ConfigurationParser) -> None:
+    config = parse_config(
+        dedent(
+            """
+            [tool.dev-cmd.commands]
+            check = ["check"]
+
+            [tool.dev-cmd.admission]
+            cpu-pressure = 40
+            load = 1.5
+            """
+        )
+    )
+    assert Admission(cpu_pressure=40.0, load=1.5) == config.admission
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd.admission] table must define at least one of `cpu-pressure`, "
+            "`memory-pressure` or `load`."
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands]
+                check = ["check"]
+
+                [tool.dev-cmd.admission]
+                """
+            )
+        )
+
+
+def test_locks(parse_config: ConfigurationParser) -> None:
+    config = parse_config(
+        dedent(
+            """
+            [tool.dev-cmd.commands.fmt]
+            args = ["fmt"]
+            locks = ["src"]
+
+            [tool.dev-cmd.commands.test]
+            args = ["test"]
+            shared-locks = ["src", "db"]
+            """
+        )
+    )
+    assert (
+        Command("fmt", args=("fmt",), locks=("src",)),
+        Command("test", args=("test",), shared_locks=("src", "db")),
+    ) == config.commands
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd.commands.fmt] table lists the following in both `locks` and "
+            "`shared-locks`: src"
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands.fmt]
+                args = ["fmt"]
+                locks = ["src"]
+                shared-locks = ["src"]
+                """
+            )
+        )
+
+
+def test_timeout(parse_config: ConfigurationParser) -> None:
+    config = parse_config(
+        dedent(
+            """
+            [tool.dev-cmd.commands.fmt]
+            args = ["fmt"]
+
+            [tool.dev-cmd.commands.test]
+            args = ["test"]
+            timeout = 600
+
+            [tool.dev-cmd.tasks.checks]
+            steps = ["fmt", "test"]
+            timeout = 60.5
+
+            [tool.dev-cmd.tasks.ci]
+            steps = ["checks", "fmt"]
+            timeout = 900
+            """
+        )
+    )
+    fmt, test = config.commands
+    assert fmt.timeout is None
+    assert 600.0 == test.timeout
+
+    checks, ci = config.tasks
+    assert 60.5 == checks.timeout
+    assert [60.5, 600.0] == [command.timeout for command in checks.iter_commands(skips=())]
+    assert [60.5, 600.0, 900.0] == [command.timeout for command in ci.iter_commands(skips=())]
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd.commands.fmt] `timeout` value must be a positive number of seconds, "
+            "given: 0 of type <class 'int'>."
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands.fmt]
+                args = ["fmt"]
+                timeout = 0
+                """
+            )
+        )
+
+
+def test_installer(parse_config: ConfigurationParser) -> None:
+    config = parse_config(
+        dedent(
+            """
+            [tool.dev-cmd.commands]
+            repl = ["python"]
+
+            [[tool.dev-cmd.python]]
+            3rdparty-export-command = ["export", "{requirements.txt}"]
+            pyproject-cache-keys = []
+            installer = "uv"
+
+            [[tool.dev-cmd.python]]
+            when = "python_version < '3.8'"
+
+            [[tool.dev-cmd.python]]
+            when = "python_version < '3.7'"
+            installer = "pip"
+            """
+        )
+    )
+    assert [Installer.UV, Installer.UV, Installer.PIP] == [
+        python_config.installer for python_config in config.pythons
+    ]
+
+    with pytest.raises(
+        InvalidModelError,
+        match=re.escape(
+            "The [tool.dev-cmd] `python[0].installer` of 'conda' is not recognized. Valid choices "
+            "are 'pip' and 'uv'."
+        ),
+    ):
+        parse_config(
+            dedent(
+                """
+                [tool.dev-cmd.commands]
+                repl = ["python"]
+
+                [[tool.dev-cmd.python]]
+                3rdparty-export-command = ["export", "{requirements.txt}"]
+                pyproject-cache-keys = []
+                installer = "conda"
+                """
+            )
+        )
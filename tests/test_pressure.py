@@ -0,0 +1,78 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd import pressure
+from dev_cmd.invoke import Invocation
+from dev_cmd.model import Admission, Command
+from dev_cmd.pressure import Sample
+
+
+def test_psi(tmp_path: Path) -> None:
+    assert pressure.psi("cpu", proc_root=tmp_path) is None
+
+    (tmp_path / "pressure").mkdir()
+    (tmp_path / "pressure" / "memory").write_text(
+        "some avg10=12.50 avg60=3.00 avg300=1.00 total=12345\n"
+        "full avg10=99.00 avg60=0.00 avg300=0.00 total=0\n"
+    )
+    assert 12.5 == pressure.psi("memory", proc_root=tmp_path)
+
+
+def test_exceeded() -> None:
+    sample = Sample(cpu_pressure=75.0, memory_pressure=None, load=0.5)
+    assert [] == sample.exceeded(Admission())
+    assert [] == sample.exceeded(Admission(memory_pressure=1.0, load=1.0))
+    assert ["cpu pressure 75.00% > 50.00%", "load per cpu 0.50 > 0.25"] == sample.exceeded(
+        Admission(cpu_pressure=50.0, load=0.25)
+    )
+
+
+def test_hold_back_under_pressure(
+    monkeypatch: MonkeyPatch, tmp_path: Path, capfd: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(
+        Sample,
+        "take",
+        classmethod(lambda cls: cls(cpu_pressure=100.0, memory_pressure=None, load=None)),
+    )
+    monkeypatch.setattr(pressure, "POLL_INTERVAL", 0.01)
+
+    spans = tmp_path / "spans.txt"
+
+    def span_command(name: str) -> Command:
+        return Command(
+            name,
+            args=(
+                sys.executable,
+                "-c",
+                (
+                    f"import time; start = time.time(); time.sleep(0.1); "
+                    f"open({str(spans)!r}, 'a').write(f'{{start}} {{time.time()}}\\n')"
+                ),
+            ),
+        )
+
+    invocation = Invocation.create(
+        span_command("a"),
+        span_command("b"),
+        skips=(),
+        grace_period=1.0,
+        timings=True,
+        admission=Admission(cpu_pressure=50.0),
+    )
+    asyncio.run(invocation.invoke_parallel())
+
+    (_, first_end), (second_start, _) = sorted(
+        tuple(map(float, line.split())) for line in spans.read_text().splitlines()
+    )
+    assert first_end <= second_start
+    assert "cpu pressure 100.00% > 50.00%" in capfd.readouterr().err
@@ -0,0 +1,69 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sys
+
+import pytest
+
+from dev_cmd import process
+
+
+def test_communicate() -> None:
+    async def run() -> tuple[bytes | None, process.Process]:
+        child = await process.spawn(
+            [
+                sys.executable,
+                "-c",
+                "import sys; data = bytearray(32 * 1024 * 1024); print('hi'); sys.exit(3)",
+            ],
+            stdout=process.PIPE,
+            stderr=process.STDOUT,
+        )
+        return await child.communicate(), child
+
+    output, child = asyncio.run(run())
+    assert output is not None
+    assert b"hi" == output.strip()
+    assert 3 == child.returncode
+    if hasattr(os, "wait4"):
+        assert child.rusage is not None
+        assert child.rusage.max_rss >= 32 * 1024 * 1024
+        assert child.rusage.user + child.rusage.system > 0
+    else:
+        assert child.rusage is None
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="Signals are only reported on POSIX.")
+def test_terminate() -> None:
+    async def run() -> int:
+        child = await process.spawn([sys.executable, "-c", "import time; time.sleep(60)"])
+        child.terminate()
+        return await child.wait()
+
+    assert -signal.SIGTERM == asyncio.run(run())
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "wait4"), reason="Children are only reaped by a thread on POSIX."
+)
+def test_signal_after_reap(monkeypatch: pytest.MonkeyPatch) -> None:
+    signalled: list[tuple[int, int]] = []
+    monkeypatch.setattr(os, "kill", lambda pid, signum: signalled.append((pid, signum)))
+
+    async def run() -> int:
+        child = await process.spawn([sys.executable, "-c", "pass"])
+        while child._popen is not None and child._popen.returncode is None:
+            await asyncio.sleep(0.01)
+
+        # N.B.: The child's pid may already belong to another process once it has been reaped.
+        child.terminate()
+        child.kill()
+        return await child.wait()
+
+    assert 0 == asyncio.run(run())
+    assert [] == signalled
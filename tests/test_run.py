@@ -0,0 +1,47 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+from typing import cast
+
+from pytest import MonkeyPatch
+
+from dev_cmd import parse, venv
+from dev_cmd.model import Command, Python, PythonConfig, Venv, VenvConfig
+from dev_cmd.run import _ensure_venvs
+
+
+def test_ensure_venvs_job_slots(monkeypatch: MonkeyPatch) -> None:
+    python_config = cast(PythonConfig, object())
+    monkeypatch.setattr(parse, "select_python_config", lambda python, pythons: python_config)
+
+    building = 0
+    max_building = 0
+    quiet_builds: list[bool] = []
+
+    async def ensure(
+        venv_config: VenvConfig, python_config: PythonConfig, quiet: bool, track: str
+    ) -> Venv:
+        nonlocal building, max_building
+        building += 1
+        max_building = max(max_building, building)
+        quiet_builds.append(quiet)
+        await asyncio.sleep(0.1)
+        building -= 1
+        return Venv(dir=str(venv_config.dependency_group), python="python", marker_environment={})
+
+    monkeypatch.setattr(venv, "ensure", ensure)
+
+    commands = [
+        Command("test", args=("pytest",), python=Python("3.13"), dependency_group=f"group{index}")
+        for index in range(6)
+    ]
+    venvs = asyncio.run(_ensure_venvs(commands, [python_config], job_slots=2))
+    assert [f"group{index}" for index in range(6)] == [
+        venvs[VenvConfig(python=Python("3.13"), dependency_group=f"group{index}")].dir
+        for index in range(6)
+    ]
+    assert 2 == max_building
+    assert [True] * 6 == quiet_builds
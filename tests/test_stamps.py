@@ -0,0 +1,72 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd.model import Command, Inputs
+from dev_cmd.stamps import Stamp
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / ".dev-cmd"
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def test_no_inputs() -> None:
+    assert (
+        Stamp.calculate(Command("check", args=("check",)), args=["check"], python="python") is None
+    )
+
+
+def test_up_to_date(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.py").write_text("a = 1\n")
+    out = tmp_path / "out.txt"
+
+    command = Command(
+        "gen",
+        args=("gen",),
+        inputs=Inputs(paths=(f"{src.as_posix()}/**/*.py",), envs=("GEN_MODE",)),
+        outputs=(out.as_posix(),),
+    )
+
+    def calculate(*args: str) -> Stamp:
+        stamp = Stamp.calculate(command, args=["gen", *args], python="python")
+        assert stamp is not None
+        return stamp
+
+    assert not calculate().is_up_to_date()
+
+    out.write_text("generated")
+    calculate().record()
+    assert calculate().is_up_to_date()
+
+    assert not calculate("-v").is_up_to_date()
+
+    monkeypatch.setenv("GEN_MODE", "fast")
+    assert not calculate().is_up_to_date()
+    calculate().record()
+    assert calculate().is_up_to_date()
+
+    (src / "b.py").write_text("b = 2\n")
+    assert not calculate().is_up_to_date()
+    calculate().record()
+    assert calculate().is_up_to_date()
+
+    out.unlink()
+    assert not calculate().is_up_to_date()
+
+    out.write_text("generated")
+    calculate().record()
+    stamp = calculate()
+    assert stamp.is_up_to_date()
+    stamp.invalidate()
+    assert not stamp.is_up_to_date()
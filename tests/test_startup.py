@@ -0,0 +1,84 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+import dev_cmd
+
+# N.B.: `dev-cmd --version`, `--list` and `--report` import ~165 modules today, including the ~30
+# the interpreter imports to start up. This budget leaves some room for growth but catches an eager
+# import of asyncio or the like.
+IMPORT_BUDGET = 200
+
+DEFERRED_MODULES = (
+    "asyncio",
+    "colorama",
+    "colors",
+    "filelock",
+    "multiprocessing",
+    "packaging.markers",
+)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "pyproject.toml").write_text(
+        dedent(
+            """\
+            [tool.dev-cmd.commands]
+            fmt = ["ruff", "format"]
+            lint = ["ruff", "check"]
+
+            [tool.dev-cmd.tasks]
+            checks = ["fmt", "lint"]
+            """
+        )
+    )
+    cache_dir = tmp_path / ".dev-cmd"
+    cache_dir.mkdir()
+    (cache_dir / "history.jsonl").write_text(
+        '{"run":"1","kind":"command","name":"fmt","start":0,"end":1,"exit":0,'
+        '"rusage":{"user":0.5,"system":0.1,"max_rss":1024,"blocks_in":0,"blocks_out":0,'
+        '"voluntary_switches":1,"involuntary_switches":0}}\n'
+    )
+    return tmp_path
+
+
+def imported_modules(project: Path, *args: str) -> list[str]:
+    env = {**os.environ, "NO_COLOR": "1"}
+    env.pop("DEV_CMD_DAEMON", None)
+    env.pop("DEV_CMD_WORKSPACE_CACHE_DIR", None)
+    env["PYTHONPATH"] = os.pathsep.join(
+        (str(Path(dev_cmd.__file__).parent.parent), *filter(None, [env.get("PYTHONPATH")]))
+    )
+    result = subprocess.run(
+        args=[sys.executable, "-X", "importtime", "-m", "dev_cmd", *args],
+        cwd=project,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return [
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    ]
+
+
+@pytest.mark.parametrize(
+    "args", [["--version"], ["--list"], ["--report"]], ids=["version", "list", "report"]
+)
+def test_startup_budget(project: Path, args: list[str]) -> None:
+    modules = imported_modules(project, *args)
+    assert [] == [module for module in modules if module in DEFERRED_MODULES]
+    assert len(modules) <= IMPORT_BUDGET, os.linesep.join(modules)
@@ -0,0 +1,79 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytest import MonkeyPatch
+
+from dev_cmd import trace
+from dev_cmd.console import Console
+from dev_cmd.invoke import Invocation
+from dev_cmd.model import Command, Group, Task
+
+
+@pytest.fixture(autouse=True)
+def tracer(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(trace, "_TRACER", None)
+    trace.enable(origin=time.time())
+
+
+def load_spans(path: Path) -> list[tuple[str, str, str]]:
+    data = json.loads(path.read_text())
+    events: list[dict[str, Any]] = data["traceEvents"]
+    tracks = {
+        event["tid"]: event["args"]["name"] for event in events if event["name"] == "thread_name"
+    }
+    return sorted(
+        (tracks[event["tid"]], event["cat"], event["name"])
+        for event in events
+        if event["ph"] == "X"
+    )
+
+
+def test_disabled(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(trace, "_TRACER", None)
+    with trace.span("ignored", "test"):
+        pass
+    trace.write(tmp_path / "trace.json")
+    assert not (tmp_path / "trace.json").exists()
+
+
+def test_lanes() -> None:
+    lanes = trace.Lanes("slot")
+    assert 1 == lanes.acquire()
+    assert 2 == lanes.acquire()
+    assert 3 == lanes.acquire()
+    lanes.release(2)
+    lanes.release(1)
+    assert 1 == lanes.acquire()
+    assert 2 == lanes.acquire()
+    assert 4 == lanes.acquire()
+
+
+def test_invocation(tmp_path: Path) -> None:
+    def command(name: str) -> Command:
+        return Command(name, args=(sys.executable, "-c", "import time; time.sleep(0.1)"))
+
+    with trace.span("startup", "dev-cmd"):
+        pass
+    checks = Task("checks", steps=Group(members=(Group(members=(command("a"), command("b"))),)))
+    invocation = Invocation.create(checks, skips=(), grace_period=1.0, console=Console(quiet=True))
+    asyncio.run(invocation.invoke())
+
+    trace_file = tmp_path / "trace.json"
+    trace.write(trace_file)
+    spans = load_spans(trace_file)
+    assert ("dev-cmd", "dev-cmd", "startup") in spans
+    assert ("steps 1", "task", "checks") in spans
+    assert ("steps 2", "parallel group", "*checks") in spans
+    assert {("slot 1", "command"), ("slot 2", "command")} == {
+        (track, category) for track, category, _ in spans if category == "command"
+    }
@@ -0,0 +1,739 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from textwrap import dedent
+from typing import Any
+
+import pytest
+from filelock import FileLock
+from packaging.markers import default_environment
+from pytest import MonkeyPatch
+
+from dev_cmd import memo, venv
+from dev_cmd.console import Console
+from dev_cmd.errors import DevCmdError
+from dev_cmd.model import CacheKeyInputs, Command, Python, PythonConfig, VenvConfig
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / ".dev-cmd"
+    monkeypatch.setenv("DEV_CMD_WORKSPACE_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(memo, "_ENTRIES", {})
+    return cache_dir
+
+
+@pytest.fixture
+def bin_dir(monkeypatch: MonkeyPatch, tmp_path: Path) -> Path:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", os.pathsep.join((str(bin_dir), os.environ.get("PATH", os.defpath))))
+    return bin_dir
+
+
+def write_stub(bin_dir: Path, name: str, script: str) -> None:
+    stub = bin_dir / name
+    stub.write_text(f"#!{sys.executable}\n{dedent(script)}")
+    stub.chmod(0o755)
+
+
+@pytest.fixture
+def pex3(bin_dir: Path) -> None:
+    write_stub(
+        bin_dir,
+        "pex3",
+        """
+        import signal
+        import sys
+        import time
+
+        mode = sys.argv[1]
+        if mode == "hang":
+            def terminated(*_):
+                open(sys.argv[3], "w").close()
+                sys.exit(1)
+
+            signal.signal(signal.SIGTERM, terminated)
+            open(sys.argv[2], "w").close()
+            time.sleep(60)
+        print("out", flush=True)
+        print("err", file=sys.stderr, flush=True)
+        sys.exit(42 if mode == "fail" else 0)
+        """,
+    )
+
+
+@pytest.mark.usefixtures("pex3")
+def test_output_ordered_after_console(capfd: pytest.CaptureFixture[str]) -> None:
+    async def run() -> None:
+        console = Console()
+        await console.aprint("queued 1", use_stderr=True)
+        venv._progress("test", "Working")
+        await console.aprint("queued 2", use_stderr=True)
+        await venv._execute(["pex3", "ok"])
+        await console.aflush()
+
+    asyncio.run(run())
+    assert ("", "queued 1\n[test] Working...\nqueued 2\nout\nerr\n") == capfd.readouterr()
+
+
+@pytest.mark.usefixtures("pex3")
+def test_execute(capfd: pytest.CaptureFixture[str]) -> None:
+    assert b"" == asyncio.run(venv._execute(["pex3", "ok"]))
+    assert ("", "out\nerr\n") == capfd.readouterr()
+
+    assert b"out\n" == asyncio.run(venv._execute(["pex3", "ok"], capture=True))
+    assert ("", "err\n") == capfd.readouterr()
+
+    assert b"out\nerr\n" == asyncio.run(venv._execute(["pex3", "ok"], quiet=True))
+    assert ("", "") == capfd.readouterr()
+
+    assert b"out\nerr\n" == asyncio.run(venv._execute(["pex3", "ok"], capture=True, quiet=True))
+    assert ("", "") == capfd.readouterr()
+
+
+@pytest.mark.usefixtures("pex3")
+def test_execute_failure(capfd: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        asyncio.run(venv._execute(["pex3", "fail"], quiet=True))
+    assert 42 == exc_info.value.returncode
+    assert b"out\nerr\n" == exc_info.value.output
+    assert ("", "out\nerr\n") == capfd.readouterr()
+
+    # N.B.: Output captured for the caller is the caller's to show.
+    with pytest.raises(subprocess.CalledProcessError):
+        asyncio.run(venv._execute(["pex3", "fail"], capture=True, quiet=True))
+    assert ("", "") == capfd.readouterr()
+
+
+@pytest.mark.usefixtures("pex3")
+def test_execute_cancelled(tmp_path: Path) -> None:
+    started = tmp_path / "started"
+    terminated = tmp_path / "terminated"
+
+    async def cancel() -> None:
+        task = asyncio.ensure_future(
+            venv._execute(["pex3", "hang", str(started), str(terminated)], quiet=True)
+        )
+        while not started.exists():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(cancel(), timeout=10.0))
+    for _ in range(100):
+        if terminated.exists():
+            break
+        time.sleep(0.05)
+    assert terminated.exists()
+
+
+def test_file_lock(tmp_path: Path) -> None:
+    lock = str(tmp_path / "lock")
+    events: list[tuple[str, int]] = []
+
+    async def hold(holder: int) -> None:
+        async with venv._file_lock(lock):
+            events.append(("acquired", holder))
+            await asyncio.sleep(0.2)
+            events.append(("released", holder))
+
+    async def contend() -> None:
+        await asyncio.gather(*(hold(holder) for holder in range(3)))
+
+    asyncio.run(contend())
+    assert 6 == len(events)
+    for acquired, released in zip(events[::2], events[1::2]):
+        assert "acquired" == acquired[0]
+        assert ("released", acquired[1]) == released
+
+
+def test_marker_environment(monkeypatch: MonkeyPatch, cache_dir: Path) -> None:
+    python = Python(sys.executable)
+    assert default_environment() == venv.marker_environment(python)
+
+    interpreter = os.path.realpath(sys.executable)
+    index_file = cache_dir / "interpreters" / "markers.json"
+    index = json.loads(index_file.read_bytes())
+    assert [interpreter] == list(index)
+
+    # N.B.: An index entry is trusted as long as the interpreter is unchanged.
+    index[interpreter]["marker-environment"] = {"python_version": "0.1"}
+    index_file.write_text(json.dumps(index))
+    monkeypatch.setattr(memo, "_ENTRIES", {})
+    assert {"python_version": "0.1"} == venv.marker_environment(python)
+
+    index[interpreter]["key"][-1] -= 1
+    index_file.write_text(json.dumps(index))
+    monkeypatch.setattr(memo, "_ENTRIES", {})
+    assert default_environment() == venv.marker_environment(python)
+
+
+def test_marker_environment_missing_python(tmp_path: Path) -> None:
+    with pytest.raises(
+        DevCmdError, match=r"^Could not find a Python interpreter for --python python0\.1\.$"
+    ):
+        venv.marker_environment(Python("python0.1"))
+    with pytest.raises(DevCmdError):
+        venv.marker_environment(Python(str(tmp_path / "python")))
+
+
+def test_gc(cache_dir: Path) -> None:
+    venvs_dir = cache_dir / "venvs"
+
+    def create_venv(name: str, size: int, last_used: int) -> Path:
+        venv_dir = venvs_dir / name
+        venv_dir.mkdir(parents=True)
+        (venv_dir / ".dev-cmd-venv-layout.json").write_text(json.dumps({"size": size}))
+        last_used_file = venvs_dir / f"{name}.last-used"
+        last_used_file.touch()
+        os.utime(last_used_file, (last_used, last_used))
+        return venv_dir
+
+    oldest = create_venv("oldest", size=10, last_used=1)
+    in_use = create_venv("in-use", size=10, last_used=2)
+    stale_user = create_venv("stale-user", size=10, last_used=3)
+    newest = create_venv("newest", size=10, last_used=4)
+    (venvs_dir / "building.work").mkdir()
+    build_lock = FileLock(venvs_dir / "building.lck")
+    build_lock.acquire()
+    (venvs_dir / "abandoned.work").mkdir()
+
+    (venvs_dir / "in-use.users").mkdir()
+    user_lock = FileLock(venvs_dir / "in-use.users" / "1.lck")
+    user_lock.acquire()
+    (venvs_dir / "stale-user.users").mkdir()
+    (venvs_dir / "stale-user.users" / "2.lck").touch()
+
+    assert () == venv.gc(max_size=40)
+    try:
+        assert [oldest, stale_user] == [
+            cached_venv.dir for cached_venv in venv.gc(max_size=20, max_count=3)
+        ]
+    finally:
+        user_lock.release()
+        build_lock.release()
+    assert (venvs_dir / "building.work").is_dir()
+    assert not (venvs_dir / "abandoned.work").exists()
+    assert {"in-use", "in-use.last-used", "in-use.users", "newest", "newest.last-used"} == {
+        path.name for path in venvs_dir.iterdir() if not path.name.endswith((".lck", ".work"))
+    }
+
+    assert [in_use] == [cached_venv.dir for cached_venv in venv.gc(max_count=1)]
+    assert newest.is_dir()
+
+
+def test_export_requirements(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.chdir(tmp_path)
+    exports_log = tmp_path / "exports.log"
+    python_config = PythonConfig(
+        when=None,
+        cache_key_inputs=CacheKeyInputs(pyproject_data={}, envs={}, paths=()),
+        thirdparty_export_command=Command(
+            "export",
+            args=(
+                sys.executable,
+                "-c",
+                dedent(
+                    f"""\
+                    import sys
+
+                    with open({str(exports_log)!r}, "a") as fp:
+                        print(sys.argv[2], file=fp)
+                    with open(sys.argv[1], "w") as fp:
+                        print("six", file=fp)
+                    """
+                ),
+                "{requirements.txt}",
+                "{dependency-group:dev}",
+            ),
+        ),
+        thirdparty_pip_install_opts=(),
+        pip_requirement="pip",
+        extra_requirements=(),
+        extra_requirements_pip_install_opts=(),
+        finalize_command=None,
+    )
+
+    def export(venv_config: VenvConfig, **input_paths: str) -> Path:
+        return asyncio.run(
+            venv._export_requirements(
+                venv_config, python_config, input_paths, env_description="test", quiet=True
+            )
+        )
+
+    def exported_groups() -> list[str]:
+        return exports_log.read_text().splitlines()
+
+    py312 = VenvConfig(Python("3.12"))
+    exported = export(py312)
+    assert "six\n" == exported.read_text()
+    assert ["dev"] == exported_groups()
+
+    # N.B.: Venvs for different Pythons export the same requirements.
+    assert exported == export(VenvConfig(Python("3.13")))
+    assert ["dev"] == exported_groups()
+
+    test_group_exported = export(VenvConfig(Python("3.12"), dependency_group="test"))
+    assert exported != test_group_exported
+    assert ["dev", "test"] == exported_groups()
+
+    cache_keys_changed_exported = export(py312, reqs="changed")
+    assert cache_keys_changed_exported not in (exported, test_group_exported)
+    assert ["dev", "test", "dev"] == exported_groups()
+    assert cache_keys_changed_exported == export(py312, reqs="changed")
+    assert ["dev", "test", "dev"] == exported_groups()
+
+    assert exported == export(py312)
+    assert ["dev", "test", "dev"] == exported_groups()
+
+
+def test_gc_exports(cache_dir: Path) -> None:
+    venvs_dir = cache_dir / "venvs"
+    venvs_dir.mkdir(parents=True)
+    exports_dir = cache_dir / "3rdparty-exports"
+    exports_dir.mkdir(parents=True)
+
+    def create_venv(name: str, export: str, last_used: int) -> None:
+        venv_dir = venvs_dir / name
+        venv_dir.mkdir()
+        (venv_dir / ".dev-cmd-venv-layout.json").write_text(
+            json.dumps({"size": 10, "requirements-export": f"{export}.txt"})
+        )
+        last_used_file = venvs_dir / f"{name}.last-used"
+        last_used_file.touch()
+        os.utime(last_used_file, (last_used, last_used))
+
+    def create_export(name: str) -> None:
+        (exports_dir / f"{name}.txt").touch()
+        (exports_dir / f"{name}.txt.lck").touch()
+
+    def exports() -> set[str]:
+        return {path.name for path in exports_dir.iterdir()}
+
+    create_venv("old", export="a", last_used=1)
+    create_venv("new", export="b", last_used=2)
+    create_export("a")
+    create_export("b")
+    create_export("unused")
+    (exports_dir / "failed.txt.lck").touch()
+
+    assert [venvs_dir / "old"] == [cached_venv.dir for cached_venv in venv.gc(max_count=1)]
+    assert {"b.txt", "b.txt.lck"} == exports()
+
+    # N.B.: A venv being built may not have recorded the export it uses yet.
+    create_export("building")
+    build_lock = FileLock(venvs_dir / "building.lck")
+    build_lock.acquire()
+    try:
+        assert () == venv.gc()
+        assert {"b.txt", "b.txt.lck", "building.txt", "building.txt.lck"} == exports()
+    finally:
+        build_lock.release()
+    assert () == venv.gc()
+    assert {"b.txt", "b.txt.lck"} == exports()
+
+
+@pytest.fixture
+def pex3_inspect(bin_dir: Path) -> None:
+    write_stub(
+        bin_dir,
+        "pex3",
+        """
+        import json
+        import os
+        import sys
+
+        venv_dir = sys.argv[-1]
+        json.dump(
+            {
+                "interpreter": {"binary": os.path.join(venv_dir, "bin", "python")},
+                "site_packages": os.path.join(venv_dir, "lib", "site-packages"),
+            },
+            sys.stdout,
+        )
+        """,
+    )
+
+
+@pytest.fixture
+def uv_log(bin_dir: Path, tmp_path: Path) -> Path:
+    uv_log = tmp_path / "uv.log"
+    write_stub(
+        bin_dir,
+        "uv",
+        f"""
+        import json
+        import os
+        import sys
+
+        args = sys.argv[1:]
+        requirements = {{
+            path: open(path).read() for flag, path in zip(args, args[1:]) if flag == "-r"
+        }}
+        with open({str(uv_log)!r}, "a") as fp:
+            print(json.dumps({{"args": args, "requirements": requirements}}), file=fp)
+        if args[0] == "venv":
+            venv_dir = args[-1]
+            os.makedirs(os.path.join(venv_dir, "bin"))
+            with open(os.path.join(venv_dir, "pyvenv.cfg"), "w") as fp:
+                fp.write("home = {{}}\\n".format(os.path.dirname(sys.executable)))
+            python = os.path.join(venv_dir, "bin", "python")
+            with open(python, "w") as fp:
+                site_packages_dir = os.path.join(venv_dir, "lib", "site-packages")
+                fp.write("#!{{}}\\nprint({{!r}})\\n".format(sys.executable, site_packages_dir))
+            os.chmod(python, 0o755)
+        """,
+    )
+    return uv_log
+
+
+def test_uv_installer(uv_log: Path, tmp_path: Path) -> None:
+    def uv_invocations() -> list[dict[str, Any]]:
+        invocations = [json.loads(line) for line in uv_log.read_text().splitlines()]
+        uv_log.unlink()
+        return invocations
+
+    installer = venv._UvInstaller()
+    work_dir = tmp_path / "venv.work"
+    venv_layout = asyncio.run(installer.create("3.13", str(work_dir)))
+    assert str(work_dir / "bin" / "python") == venv_layout.python
+    assert str(work_dir / "lib" / "site-packages") == venv_layout.site_packages_dir
+    assert [
+        {"args": ["venv", "--quiet", "--python", "3.13", str(work_dir)], "requirements": {}}
+    ] == uv_invocations()
+
+    requirements_file = tmp_path / "requirements.txt"
+    requirements_file.write_text("six\n")
+    python_config = PythonConfig(
+        when=None,
+        cache_key_inputs=CacheKeyInputs(pyproject_data={}, envs={}, paths=()),
+        thirdparty_export_command=Command("export", args=("export", "{requirements.txt}")),
+        thirdparty_pip_install_opts=("--no-deps",),
+        pip_requirement="pip==25.0",
+        extra_requirements="idna\n",
+        extra_requirements_pip_install_opts=("--index-url", "https://example.org/simple"),
+        finalize_command=None,
+    )
+    asyncio.run(
+        installer.install(
+            venv_layout,
+            python_config,
+            requirements_file,
+            work_dir,
+            env_description="test",
+            quiet=True,
+            track=None,
+        )
+    )
+    (invocation,) = uv_invocations()
+    args = invocation["args"]
+    extra_requirements_file = args[-1]
+    assert [
+        "pip",
+        "install",
+        "--python",
+        venv_layout.python,
+        "--no-deps",
+        "pip==25.0",
+        "-r",
+        str(requirements_file),
+        "--index-url",
+        "https://example.org/simple",
+        "-r",
+        extra_requirements_file,
+    ] == args
+    assert {
+        str(requirements_file): "six\n",
+        extra_requirements_file: "idna\n",
+    } == invocation["requirements"]
+
+    # N.B.: The extra requirements are written to a temporary file that does not survive the
+    # install.
+    assert not os.path.exists(extra_requirements_file)
+    assert ["bin", "pyvenv.cfg"] == sorted(os.listdir(work_dir))
+
+    asyncio.run(
+        installer.update(
+            venv_layout,
+            dataclasses.replace(python_config, extra_requirements=()),
+            ["cowsay", "idna"],
+            requirements_file,
+            work_dir,
+            env_description="test",
+            quiet=True,
+            track=None,
+        )
+    )
+    assert [
+        {
+            "args": ["pip", "uninstall", "--python", venv_layout.python, "cowsay", "idna"],
+            "requirements": {},
+        },
+        {
+            "args": [
+                "pip",
+                "install",
+                "--python",
+                venv_layout.python,
+                "--no-deps",
+                "-r",
+                str(requirements_file),
+            ],
+            "requirements": {str(requirements_file): "six\n"},
+        },
+    ] == uv_invocations()
+
+
+def test_gc_measures_size_once(cache_dir: Path) -> None:
+    venv_dir = cache_dir / "venvs" / "unsized"
+    venv_dir.mkdir(parents=True)
+    layout_file = venv_dir / ".dev-cmd-venv-layout.json"
+    layout_file.write_text(json.dumps({"lineage": "unsized"}))
+    (venv_dir / "data").write_bytes(b"x" * 1000)
+
+    assert () == venv.gc(max_count=1)
+    layout = json.loads(layout_file.read_text())
+    assert "unsized" == layout["lineage"]
+    assert layout["size"] >= 1000
+
+    # N.B.: The recorded size is trusted from here on out.
+    layout["size"] = 1
+    layout_file.write_text(json.dumps(layout))
+    assert [1] == [cached_venv.size for cached_venv in venv._iter_cached_venvs(venv_dir.parent)]
+
+
+def test_requirements_load(tmp_path: Path) -> None:
+    requirements_file = tmp_path / "requirements.txt"
+
+    def load(content: str) -> venv._Requirements | None:
+        requirements_file.write_text(dedent(content))
+        return venv._Requirements.load(requirements_file)
+
+    requirements = load(
+        """\
+        # A comment.
+        --index-url https://example.org/simple
+        Foo_Bar.baz==1.0 \\
+            --hash=sha256:abc  # Pinned.
+        six==1.16.0
+        typing-extensions==4.12.2; python_version < "3.11"
+        typing_extensions==4.13.0; python_version >= "3.11"
+        """
+    )
+    assert requirements is not None
+    assert ("--index-url https://example.org/simple",) == requirements.options
+    assert {
+        "foo-bar-baz": ("Foo_Bar.baz==1.0 --hash=sha256:abc",),
+        "six": ("six==1.16.0",),
+        "typing-extensions": (
+            'typing-extensions==4.12.2; python_version < "3.11"',
+            'typing_extensions==4.13.0; python_version >= "3.11"',
+        ),
+    } == requirements.requirements
+
+    for opaque in (
+        "-r other.txt",
+        "--requirement=other.txt",
+        "-c constraints.txt",
+        "--constraint constraints.txt",
+        "--find-links ./wheels",
+        "-e .",
+        "--editable ./pkg",
+        "./pkg",
+        "foo @ file:///wheels/foo-1.0-py3-none-any.whl",
+        "https://example.org/foo-1.0.tar.gz",
+        "foo-1.0-py3-none-any.whl",
+    ):
+        assert load(f"six==1.16.0\n{opaque}\n") is None, opaque
+
+    requirements_file.unlink()
+    assert venv._Requirements.load(requirements_file) is None
+
+
+def test_requirements_diff() -> None:
+    base = venv._Requirements(
+        options=(),
+        requirements={
+            "six": ("six==1.16.0",),
+            "idna": ("idna==3.9",),
+            "cowsay": ("cowsay==6.1",),
+        },
+    )
+    requirements = venv._Requirements(
+        options=(),
+        requirements={
+            "six": ("six==1.16.0",),
+            "idna": ("idna==3.10",),
+            "ansicolors": ("ansicolors==1.1.8",),
+        },
+    )
+    assert ["cowsay"] == requirements.removed(base)
+    assert ["ansicolors==1.1.8", "idna==3.10"] == requirements.changed(base)
+    assert [] == base.removed(base)
+    assert [] == base.changed(base)
+
+
+def test_find_base_venv(tmp_path: Path) -> None:
+    def cached_venv(name: str, last_used: float, *requirements: str) -> venv.CachedVenv:
+        venv_dir = tmp_path / name
+        venv_dir.mkdir()
+        (venv_dir / ".dev-cmd-requirements.txt").write_text(
+            "".join(f"{requirement}\n" for requirement in requirements)
+        )
+        return venv.CachedVenv(dir=venv_dir, last_used=last_used, size=1)
+
+    requirements = venv._Requirements(
+        options=(),
+        requirements={
+            "certifi": ("certifi==2025.1.31",),
+            "idna": ("idna==3.10",),
+            "six": ("six==1.16.0",),
+            "urllib3": ("urllib3==2.3.0",),
+        },
+    )
+    far = cached_venv("far", 3, "certifi==2025.1.31", "idna==3.9", "six==1.15.0", "urllib3==2.3.0")
+    near_old = cached_venv("near-old", 1, "certifi==2025.1.31", "idna==3.9", "six==1.16.0")
+    near_new = cached_venv(
+        "near-new", 2, "certifi==2025.1.31", "idna==3.9", "six==1.16.0", "urllib3==2.3.0"
+    )
+    other_options = cached_venv(
+        "other-options", 4, "--no-index", "certifi==2025.1.31", "idna==3.10", "six==1.16.0"
+    )
+    opaque = cached_venv("opaque", 5, "-e .", "certifi==2025.1.31", "idna==3.10", "six==1.16.0")
+
+    base = venv._find_base_venv([far, near_old, near_new, other_options, opaque], requirements)
+    assert base is not None
+    base_venv_dir, base_requirements = base
+    assert near_new.dir == base_venv_dir
+    assert {
+        "certifi": ("certifi==2025.1.31",),
+        "idna": ("idna==3.9",),
+        "six": ("six==1.16.0",),
+        "urllib3": ("urllib3==2.3.0",),
+    } == base_requirements.requirements
+
+    assert venv._find_base_venv([other_options, opaque], requirements) is None
+
+    # N.B.: A venv that differs in more than half the requirements is not worth cloning.
+    too_far = cached_venv("too-far", 6, "certifi==2024.12.14", "idna==3.9", "six==1.15.0")
+    assert venv._find_base_venv([too_far], requirements) is None
+    base = venv._find_base_venv([far, too_far], requirements)
+    assert base is not None
+    assert far.dir == base[0]
+
+
+class FakeInstaller:
+    def __init__(self, fail_update: bool = False) -> None:
+        self.fail_update = fail_update
+        self.calls: list[str] = []
+
+    async def create(self, python: str, venv_dir: str) -> venv._VenvLayout:
+        self.calls.append("create")
+        bin_dir = Path(venv_dir) / "bin"
+        bin_dir.mkdir(parents=True)
+        (bin_dir / "python").symlink_to(sys.executable)
+        return venv._VenvLayout(
+            python=str(bin_dir / "python"), site_packages_dir=str(Path(venv_dir) / "lib")
+        )
+
+    async def install(self, *args: Any, **kwargs: Any) -> None:
+        self.calls.append("install")
+
+    async def update(self, *args: Any, **kwargs: Any) -> None:
+        self.calls.append("update")
+        if self.fail_update:
+            raise subprocess.CalledProcessError(1, ["update"])
+
+
+@pytest.mark.usefixtures("pex3_inspect")
+def test_build_incrementally(monkeypatch: MonkeyPatch, tmp_path: Path, cache_dir: Path) -> None:
+    monkeypatch.chdir(tmp_path)
+    requirements = tmp_path / "requirements.txt"
+    python_config = PythonConfig(
+        when=None,
+        cache_key_inputs=CacheKeyInputs(pyproject_data={}, envs={}, paths=("requirements.txt",)),
+        thirdparty_export_command=Command(
+            "export",
+            args=(
+                sys.executable,
+                "-c",
+                "import shutil, sys; shutil.copy(sys.argv[1], sys.argv[2])",
+                str(requirements),
+                "{requirements.txt}",
+            ),
+        ),
+        thirdparty_pip_install_opts=(),
+        pip_requirement="pip",
+        extra_requirements=(),
+        extra_requirements_pip_install_opts=(),
+        finalize_command=None,
+    )
+    venv_config = VenvConfig(Python(sys.executable))
+
+    def build(
+        name: str,
+        content: str,
+        installer: FakeInstaller,
+        python_config: PythonConfig = python_config,
+    ) -> list[str]:
+        requirements.write_text(content)
+        monkeypatch.setitem(venv._INSTALLERS, python_config.installer, installer)
+        venv_dir = cache_dir / "venvs" / name
+        venv_dir.parent.mkdir(parents=True, exist_ok=True)
+        asyncio.run(
+            venv._build(
+                venv_config,
+                python_config,
+                input_paths={"requirements.txt": content},
+                venv_dir=venv_dir,
+                layout_file=venv_dir / ".dev-cmd-venv-layout.json",
+                quiet=True,
+                track=None,
+            )
+        )
+        assert content == (venv_dir / ".dev-cmd-requirements.txt").read_text()
+        return installer.calls
+
+    base = "certifi==2025.1.31\nidna==3.10\nsix==1.16.0\n"
+    assert ["create", "install"] == build("base", base, FakeInstaller())
+    assert ["update"] == build(
+        "bumped", base.replace("six==1.16.0", "six==1.17.0"), FakeInstaller()
+    )
+
+    # N.B.: A failed update of a clone falls back to a build from scratch.
+    assert ["update", "create", "install"] == build(
+        "failed", base.replace("six==1.16.0", "six==1.15.0"), FakeInstaller(fail_update=True)
+    )
+
+    # N.B.: Reworking most of a clone costs about as much as building from scratch.
+    assert ["create", "install"] == build(
+        "overhauled", "certifi==2024.12.14\nidna==3.9\nsix==1.16.0\n", FakeInstaller()
+    )
+
+    # N.B.: Local projects can change without their requirement lines changing.
+    assert ["create", "install"] == build("local", f"{base}-e .\n", FakeInstaller())
+
+    # N.B.: Env cache keys can feed into a venv in ways its requirements don't reveal.
+    assert ["create", "install"] == build(
+        "env",
+        base.replace("six==1.16.0", "six==1.14.0"),
+        FakeInstaller(),
+        python_config=dataclasses.replace(
+            python_config,
+            cache_key_inputs=CacheKeyInputs(
+                pyproject_data={}, envs={"WHEELS": "new"}, paths=("requirements.txt",)
+            ),
+        ),
+    )
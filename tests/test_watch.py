@@ -0,0 +1,117 @@
+# Copyright 2025 John Sirois.
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from dev_cmd import watch
+from dev_cmd.model import Command, Inputs
+from dev_cmd.watch import Watcher
+
+
+def test_roots(tmp_path: Path) -> None:
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "tests").mkdir()
+
+    def command(*globs: str) -> Command:
+        return Command(
+            "cmd",
+            args=(),
+            inputs=Inputs(paths=tuple((tmp_path / glob).as_posix() for glob in globs)),
+        )
+
+    assert (tmp_path / "src", tmp_path / "tests") == watch.roots(
+        [command("src/**/*.py", "src/pkg"), command("tests/missing/*.py")], tmp_path
+    )
+    assert (tmp_path,) == watch.roots([command("src/**/*.py"), Command("other", args=())], tmp_path)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "poll"])
+def test_wait(tmp_path: Path, use_inotify: bool) -> None:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "__pycache__").mkdir()
+    existing = tmp_path / "src" / "existing.py"
+    existing.write_text("old")
+
+    async def change(*paths: Path) -> None:
+        await asyncio.sleep(0.1)
+        for path in paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("new")
+
+    async def run(*paths: Path) -> frozenset[Path]:
+        watcher = Watcher.create([tmp_path / "src"], use_inotify=use_inotify)
+        try:
+            changed, _ = await asyncio.gather(watcher.wait(), change(*paths))
+            return changed
+        finally:
+            watcher.close()
+
+    new_dir = tmp_path / "src" / "pkg"
+    changed = asyncio.run(
+        run(
+            existing,
+            tmp_path / "src" / "__pycache__" / "existing.pyc",
+            tmp_path / "src" / ".git" / "index",
+            tmp_path / "src" / ".ruff.toml",
+            new_dir / "new.py",
+        )
+    )
+    # N.B.: Whether the new directory itself is reported depends on the watch mechanism.
+    assert {existing, tmp_path / "src" / ".ruff.toml", new_dir / "new.py"} == changed - {new_dir}
+
+
+def test_input_matcher(tmp_path: Path) -> None:
+    def command(*globs: str) -> Command:
+        return Command(
+            "cmd",
+            args=(),
+            inputs=Inputs(paths=tuple((tmp_path / glob).as_posix() for glob in globs)),
+        )
+
+    relevant = watch.input_matcher(
+        [command("src/**/*.py", ".ruff.toml"), command("docs", ".github/**")]
+    )
+    for path in (
+        "src/main.py",
+        "src/pkg/module.py",
+        ".ruff.toml",
+        "docs/index.md",
+        "docs/.hidden/page.md",
+        ".github/workflows/ci.yml",
+    ):
+        assert relevant(tmp_path / path), path
+    for path in ("src/data.txt", "src/.hidden.py", "src/.hidden/module.py", "setup.cfg"):
+        assert not relevant(tmp_path / path), path
+
+    relevant = watch.input_matcher([command("src/**/*.py"), Command("other", args=())])
+    assert relevant(tmp_path / "setup.cfg")
+
+
+@pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "poll"])
+def test_wait_relevant(tmp_path: Path, use_inotify: bool) -> None:
+    (tmp_path / "src").mkdir()
+    relevant = watch.input_matcher(
+        [Command("cmd", args=(), inputs=Inputs(paths=((tmp_path / "src" / "*.py").as_posix(),)))]
+    )
+
+    async def change(*paths: Path) -> None:
+        for path in paths:
+            await asyncio.sleep(0.1)
+            path.write_text("new")
+
+    async def run(*paths: Path) -> frozenset[Path]:
+        watcher = Watcher.create([tmp_path / "src"], use_inotify=use_inotify, relevant=relevant)
+        try:
+            changed, _ = await asyncio.gather(watcher.wait(), change(*paths))
+            return changed
+        finally:
+            watcher.close()
+
+    assert {tmp_path / "src" / "main.py"} == asyncio.run(
+        run(tmp_path / "src" / "notes.txt", tmp_path / "src" / "main.py")
+    )